@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AdvertisementappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'advertisementApp'
+
+    def ready(self):
+        import advertisementApp.signals  # Import signals
+        from backend.response_cache import track_model_versions
+        track_model_versions(self.get_model('Advertisement'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from advertisementApp.media import move_legacy_media
+from advertisementApp.models import Advertisement
+
+
+class Command(BaseCommand):
+    help = 'Move advertisement media out of the image column into file storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Number of blobs loaded per query (they can be large videos)',
+        )
+
+    def handle(self, *args, **options):
+        pending = Advertisement.objects.filter(image__isnull=False).order_by('id')
+        moved = 0
+        last_id = 0
+        while True:
+            # Only the blob and what is needed to store it
+            batch = list(
+                pending.filter(id__gt=last_id)
+                .only('id', 'image', 'media_type')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            for ad in batch:
+                move_legacy_media(ad)
+                moved += 1
+                self.stdout.write(f'Moved media of advertisement {ad.id} ({ad.media_size} bytes) to {ad.media_file}')
+            last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f'Moved media of {moved} advertisements'))
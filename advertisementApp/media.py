@@ -0,0 +1,218 @@
+"""
+Advertisement media in file storage.
+
+Files are content-addressed: the name is derived from the SHA-256 of the
+bytes, so identical uploads share one file and a URL carrying the hash never
+changes meaning, which lets clients and proxies cache it for a year.
+"""
+import hashlib
+import re
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import parse_etags
+from backend.response_cache import bump_version
+from .models import Advertisement
+
+
+MEDIA_DIRECTORY = 'advertisements'
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Leading bytes of the formats accepted for advertisements
+SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', '.png'),
+    (b'GIF87a', 'image/gif', '.gif'),
+    (b'GIF89a', 'image/gif', '.gif'),
+    (b'\x1aE\xdf\xa3', 'video/webm', '.webm'),
+]
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def sniff_content_type(head, media_type='image'):
+    """
+    Returns: (content type, file extension) guessed from the first bytes
+    """
+    for signature, content_type, extension in SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp', '.webp'
+    if head[4:8] == b'ftyp':
+        return ('video/quicktime', '.mov') if head[8:10] == b'qt' else ('video/mp4', '.mp4')
+    if media_type == 'video':
+        return 'video/mp4', '.mp4'
+    return 'application/octet-stream', ''
+
+
+def _chunks(source):
+    if isinstance(source, (bytes, bytearray)):
+        for start in range(0, len(source), CHUNK_SIZE):
+            yield bytes(source[start:start + CHUNK_SIZE])
+    else:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        for chunk in source.chunks(CHUNK_SIZE):
+            yield chunk
+
+
+def store_media(source, media_type='image'):
+    """
+    Copy media bytes (bytes or an uploaded file) into storage, hashing them on
+    the way so nothing larger than one chunk is held in memory.
+    Returns: dict with media_file, media_hash, media_content_type, media_size
+    """
+    digest = hashlib.sha256()
+    size = 0
+    head = b''
+    with tempfile.TemporaryFile() as spool:
+        for chunk in _chunks(source):
+            if len(head) < 16:
+                head += chunk[:16 - len(head)]
+            digest.update(chunk)
+            size += len(chunk)
+            spool.write(chunk)
+
+        media_hash = digest.hexdigest()
+        content_type, extension = sniff_content_type(head, media_type)
+        name = f'{MEDIA_DIRECTORY}/{media_hash[:2]}/{media_hash}{extension}'
+        if not default_storage.exists(name):
+            spool.seek(0)
+            name = default_storage.save(name, File(spool))
+
+    return {
+        'media_file': name,
+        'media_hash': media_hash,
+        'media_content_type': content_type,
+        'media_size': size,
+    }
+
+
+def release_media(name, exclude_pk=None):
+    """
+    Delete a stored file unless another advertisement still points at it
+    """
+    if not name:
+        return
+    others = Advertisement.objects.filter(media_file=name)
+    if exclude_pk is not None:
+        others = others.exclude(pk=exclude_pk)
+    if not others.exists():
+        default_storage.delete(name)
+
+
+def move_legacy_media(ad):
+    """
+    Move the bytes of the deprecated image column of ad into storage
+    """
+    fields = store_media(bytes(ad.image), ad.media_type)
+    Advertisement.objects.filter(pk=ad.pk).update(image=None, updated_at=timezone.now(), **fields)
+    # queryset.update() sends no post_save; cached lists must pick up the new URL
+    bump_version(Advertisement)
+    for field, value in fields.items():
+        setattr(ad, field, value)
+    ad.image = None
+    return ad
+
+
+def with_media_flags(queryset):
+    """
+    Skip loading the legacy image blobs; only whether one exists
+    """
+    return queryset.defer('image').annotate(
+        has_legacy_media=ExpressionWrapper(Q(image__isnull=False), output_field=BooleanField())
+    )
+
+
+def media_url(ad, request=None):
+    url = reverse('advertisement_media', args=[ad.pk])
+    if ad.media_hash:
+        url = f'{url}?v={ad.media_hash}'
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def _parse_range(header, size):
+    """
+    Returns: (start, end) inclusive for a single satisfiable byte range,
+    None when there is no usable Range header, or False when unsatisfiable
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            # Syntactically invalid (RFC 9110 14.1.1): ignore the header
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(0, size - int(last))
+        end = size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(name, start, end):
+    with default_storage.open(name, 'rb') as stream:
+        stream.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = stream.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def media_response(request, ad):
+    """
+    Stream the media of ad with single-range support, validators and cache headers
+    """
+    etag = f'"{ad.media_hash}"'
+    immutable = request.GET.get('v') == ad.media_hash
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else 'no-cache',
+    }
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and ('*' in parse_etags(if_none_match) or etag in parse_etags(if_none_match)):
+        response = HttpResponse(status=304)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    size = ad.media_size
+    byte_range = _parse_range(request.META.get('HTTP_RANGE'), size)
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag:
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    response = StreamingHttpResponse(
+        _read_range(ad.media_file.name, start, end),
+        status=206 if byte_range else 200,
+        content_type=ad.media_content_type or 'application/octet-stream',
+    )
+    response['Content-Length'] = str(end - start + 1 if size else 0)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    for header, value in headers.items():
+        response[header] = value
+    return response
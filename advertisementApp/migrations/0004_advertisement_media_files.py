@@ -0,0 +1,33 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advertisementApp', '0003_advertisement_media_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='advertisement',
+            name='media_content_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='advertisement',
+            name='media_file',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='advertisement',
+            name='media_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='advertisement',
+            name='media_size',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
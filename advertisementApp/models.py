@@ -17,8 +17,14 @@ class Advertisement(models.Model):
     created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='advertisement')
     title = models.CharField(max_length=200)
     description = models.TextField()
+    # Deprecated: media blobs are moved to media_file by the move_advertisement_media command
     image = models.BinaryField(blank=True, null=True)
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPE_CHOICES, default='image')
+    # Content-addressed file in default storage, named after media_hash (see media.py)
+    media_file = models.FileField(max_length=255, blank=True, null=True)
+    media_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    media_content_type = models.CharField(max_length=100, blank=True, default='')
+    media_size = models.PositiveBigIntegerField(default=0)
     contact_info = models.CharField(max_length=100)
     price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     start_date = models.DateField()
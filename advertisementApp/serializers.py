@@ -1,4 +1,5 @@
 import base64
+from .media import media_url, release_media, store_media
 from django.utils import timezone
 from django.db.models import Q
 from rest_framework import serializers
@@ -18,20 +19,35 @@ class AdvertisementSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Advertisement
-        fields = '__all__'
+        exclude = ['image', 'media_file']
+        read_only_fields = ['media_hash', 'media_content_type', 'media_size']
         
     def get_media(self, obj):
-        if obj.image:
-            try:
-                media_base64 = base64.b64encode(obj.image).decode('utf-8')
-                media_type = obj.media_type if hasattr(obj, 'media_type') else 'image'
-                return {
-                    'content': media_base64,
-                    'type': media_type
-                }
-            except Exception as e:
-                print(f"Error encoding media: {str(e)}")
-                return None
+        # Legacy rows still holding a blob are served (and moved) by the media endpoint;
+        # list querysets flag them through with_media_flags instead of loading the blob
+        has_legacy_media = getattr(obj, 'has_legacy_media', None)
+        if has_legacy_media is None:
+            has_legacy_media = Advertisement.objects.filter(pk=obj.pk, image__isnull=False).exists()
+        if obj.media_file or has_legacy_media:
+            return {
+                'url': media_url(obj, self.context.get('request')),
+                'type': obj.media_type,
+                'content_type': obj.media_content_type,
+                'size': obj.media_size,
+            }
+        return None
+    
+    def get_media_source(self):
+        """
+        Uploaded media: a multipart file under 'image', or base64 content in 'image'
+        """
+        request = self.context['request']
+        upload = request.FILES.get('image') if hasattr(request, 'FILES') else None
+        if upload is not None:
+            return upload
+        media_data = request.data.get('image')
+        if media_data:
+            return self.validate_media_content(media_data, None)
         return None
     
     def validate_media_content(self, media_data, media_type):
@@ -49,11 +65,10 @@ class AdvertisementSerializer(serializers.ModelSerializer):
             # Extract and remove media_type from validated data if present
             media_type = validated_data.pop('media_type', 'image')
             
-            # Process media data
-            media_data = self.context['request'].data.get('image')
-            if media_data:
-                # Validate and decode the media
-                validated_data['image'] = self.validate_media_content(media_data, media_type)
+            # Store the media file
+            media_source = self.get_media_source()
+            if media_source is not None:
+                validated_data.update(store_media(media_source, media_type))
                 validated_data['media_type'] = media_type
                     
             validated_data['created_by'] = self.context['request'].user
@@ -67,14 +82,18 @@ class AdvertisementSerializer(serializers.ModelSerializer):
             # Extract and remove media_type from validated data if present
             media_type = validated_data.pop('media_type', getattr(instance, 'media_type', 'image'))
             
-            # Process media data
-            media_data = self.context['request'].data.get('image')
-            if media_data:
-                # Validate and decode the media
-                validated_data['image'] = self.validate_media_content(media_data, media_type)
+            # Store the new media file and drop the one it replaces
+            previous_file = instance.media_file.name if instance.media_file else None
+            media_source = self.get_media_source()
+            if media_source is not None:
+                validated_data.update(store_media(media_source, media_type))
                 validated_data['media_type'] = media_type
+                validated_data['image'] = None
                 
-            return super().update(instance, validated_data)
+            instance = super().update(instance, validated_data)
+            if previous_file and previous_file != instance.media_file.name:
+                release_media(previous_file, exclude_pk=instance.pk)
+            return instance
         except Exception as e:
             print(f"Error updating advertisement: {str(e)}")
             raise
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .media import release_media
+from .models import Advertisement
+
+
+@receiver(post_delete, sender=Advertisement)
+def delete_advertisement_media(sender, instance, **kwargs):
+    """
+    Remove the media file once the deletion is committed, unless shared with another ad
+    """
+    if instance.media_file:
+        name = instance.media_file.name
+        transaction.on_commit(lambda: release_media(name))
@@ -1,3 +1,85 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from userApp.models import CustomUser
+from .media import _parse_range, store_media
+from .models import Advertisement
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = {
+            'bytes=0-99': (0, 99),
+            'bytes=100-': (100, 999),
+            'bytes=900-5000': (900, 999),
+            'bytes=-100': (900, 999),
+            'bytes=-5000': (0, 999),
+            ' bytes=0-0 ': (0, 0),
+            'bytes=1000-': False,
+            'bytes=-0': False,
+            None: None,
+            '': None,
+            'bytes=-': None,
+            'bytes=5-3': None,
+            'bytes=0-1,5-9': None,
+            'items=0-9': None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(_parse_range(header, 1000), expected)
+
+
+class MediaResponseTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.data = b'GIF89a' + bytes(range(256)) * 4
+        user = CustomUser.objects.create_user(phone_number='0780000800', role='job_offer')
+        today = timezone.now().date()
+        self.ad = Advertisement.objects.create(
+            created_by=user, title='Ad', description='Ad', contact_info='0780000800',
+            start_date=today, end_date=today + timedelta(days=7), **store_media(self.data),
+        )
+        self.url = reverse('advertisement_media', args=[self.ad.pk])
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_body(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.data)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Content-Length'], str(len(self.data)))
+
+    def test_partial_content(self):
+        response, body = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.data[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.data)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get(HTTP_RANGE=f'bytes={len(self.data)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+    def test_stale_if_range_sends_everything(self):
+        response, body = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"other"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.data)
+
+    def test_not_modified(self):
+        response, _ = self.get(HTTP_IF_NONE_MATCH=f'"{self.ad.media_hash}"')
+        self.assertEqual(response.status_code, 304)
@@ -5,13 +5,20 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from .models import Advertisement
 from .serializers import AdvertisementSerializer
 from django.core.exceptions import ObjectDoesNotExist
+from backend.response_cache import cached_response
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_safe
+from .media import media_response, move_legacy_media, with_media_flags
+from userApp.models import CustomUser
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('advertisements', [Advertisement, CustomUser])
 def get_all_advertisements(request):
     print(f"[INFO] Attempting to fetch all advertisements...")
     try:
-        ads = Advertisement.objects.all()
+        ads = with_media_flags(Advertisement.objects.select_related('created_by'))
         print(f"[INFO] Successfully retrieved {ads.count()} advertisements")
         serializer = AdvertisementSerializer(ads, many=True, context={'request': request})
         print(f"[INFO] Serialized all advertisements data")
@@ -118,7 +125,7 @@ def delete_advertisement(request, pk):
 def get_advertisements_by_contact(request, contact_info):
     print(f"[INFO] Attempting to fetch advertisements with contact info: {contact_info}")
     try:
-        ads = Advertisement.objects.filter(contact_info__iexact=contact_info)
+        ads = with_media_flags(Advertisement.objects.filter(contact_info__iexact=contact_info))
         print(f"[INFO] Successfully retrieved {ads.count()} advertisements with matching contact info")
         serializer = AdvertisementSerializer(ads, many=True, context={'request': request})
         print(f"[INFO] Serialized all matching advertisements data")
@@ -127,4 +134,19 @@ def get_advertisements_by_contact(request, contact_info):
         print(f"[ERROR] Error fetching advertisements by contact: {str(e)}")
         import traceback
         traceback.print_exc()
-        return Response({'message': 'An error occurred while fetching advertisements'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({'message': 'An error occurred while fetching advertisements'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_safe
+def get_advertisement_media(request, pk):
+    """
+    Stream the image or video of an advertisement. Supports Range requests for
+    video seeking; with ?v=<media_hash> the response is cacheable for a year.
+    """
+    ad = get_object_or_404(with_media_flags(Advertisement.objects.all()), pk=pk)
+    if not ad.media_file and ad.has_legacy_media:
+        # Not moved out of the table yet, do it now
+        ad = move_legacy_media(Advertisement.objects.get(pk=pk))
+    if not ad.media_file:
+        raise Http404("Advertisement has no media")
+    return media_response(request, ad)
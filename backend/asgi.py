@@ -1,3 +1,14 @@
+"""
+ASGI entry point, serving HTTP through Django and WebSockets through Channels.
+
+Run it with an ASGI server, e.g.:
+
+    daphne -b 0.0.0.0 -p $PORT backend.asgi:application
+
+Every process holds its own WebSocket connections; run several processes
+behind the load balancer and set REDIS_URL so group messages reach
+consumers in all of them (see CHANNEL_LAYERS in settings).
+"""
 
 import os
 
@@ -5,4 +16,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+# Load the apps before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from backend.websocket_auth import JWTAuthMiddleware  # noqa: E402
+from chatApp.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': JWTAuthMiddleware(URLRouter(websocket_urlpatterns)),
+})
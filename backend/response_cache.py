@@ -0,0 +1,308 @@
+"""
+Versioned response cache for public read endpoints.
+
+Every tracked model has a version number stored in the cache. The model's
+post_save / post_delete signals bump it once the transaction commits (a
+reader racing an earlier bump could store uncommitted-looking data under the
+new version), and cached responses are keyed by the versions of all the
+models they were built from, so a write makes every dependent entry
+unreachable at once. A model tracked with fields is only bumped when one of
+those fields changes. Versions expire after
+RESPONSE_CACHE_TIMEOUT like the responses themselves, which bounds how long a
+write that sent no signal (queryset.update(), call bump_version after those)
+can go unnoticed.
+
+The same versions give every cached response a strong ETag, so clients that
+send If-None-Match get a 304 without any query or serialization.
+
+Versions only work when every process sees the same ones. While the default
+cache is process-local (LocMem, the default without REDIS_URL, or dummy) the
+stamp is read from the database instead: the latest updated_at and the row
+count of each model, which every process derives alike and any save or
+delete moves. That costs one small aggregate per model and request, still
+far less than building the response.
+"""
+import functools
+import hashlib
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+
+VERSION_KEY_PREFIX = 'model_version'
+RESPONSE_KEY_PREFIX = 'response'
+
+# Saves touching only these fields do not change any public representation
+IGNORED_UPDATE_FIELDS = {'last_login'}
+
+# Backends that keep entries in the process that wrote them
+PROCESS_LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def shared_cache():
+    """
+    True when the default cache is shared by every process, so a version bumped
+    by one worker or management command is seen by all the others
+    """
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def _model_label(model):
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def _version_key(model):
+    return f'{VERSION_KEY_PREFIX}:{_model_label(model)}'
+
+
+def _new_version():
+    # Time based so a flushed or restarted cache never hands out an old version
+    return int(time.time() * 1000)
+
+
+def get_versions(models):
+    """
+    Current version of each model, read in one cache round trip.
+    Returns: [int] in the order of models
+    """
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        cache.add(key, _new_version(), settings.RESPONSE_CACHE_TIMEOUT)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def database_stamp(models):
+    """
+    (latest updated_at, row count) of each model, as one string.
+    Every tracked model has an auto_now updated_at.
+    """
+    parts = []
+    for model in models:
+        if isinstance(model, str):
+            model = apps.get_model(model)
+        stamp = model._default_manager.order_by().aggregate(latest=Max('updated_at'), count=Count('pk'))
+        latest = stamp['latest']
+        parts.append(f"{int(latest.timestamp() * 1000000) if latest else 0}.{stamp['count']}")
+    return '-'.join(parts)
+
+
+def version_stamp(models):
+    """
+    Stamp of the current data of models: cached versions with a shared cache,
+    database_stamp otherwise
+    """
+    if not shared_cache():
+        return database_stamp(models)
+    return '-'.join(str(version) for version in get_versions(models))
+
+
+def bump_version(model):
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def _tracked_values(instance, fields):
+    # File fields are compared by name; the FieldFile itself may be changed in place
+    values = {field: instance.__dict__.get(field) for field in fields}
+    return {field: getattr(value, 'name', value) for field, value in values.items()}
+
+
+def _bump_on_commit(label):
+    # With a process-local cache the stamp comes from the database, nothing to bump
+    if shared_cache():
+        transaction.on_commit(lambda: bump_version(label))
+
+
+def track_model_versions(*models, fields=None):
+    """
+    Bump the version of each model whenever one of its rows is saved or
+    deleted, once the transaction commits.
+    fields: when given, a save only bumps if it creates the row or changes
+    one of these fields (those the cached responses show)
+    """
+    for model in models:
+        label = _model_label(model)
+
+        def bump(sender, instance, created=False, update_fields=None, label=label, **kwargs):
+            if update_fields and set(update_fields) <= IGNORED_UPDATE_FIELDS:
+                return
+            if fields is not None and not created:
+                if update_fields is not None and not set(update_fields) & set(fields):
+                    return
+                values = _tracked_values(instance, fields)
+                changed = values != getattr(instance, '_response_cache_values', None)
+                instance._response_cache_values = values
+                if not changed:
+                    return
+            _bump_on_commit(label)
+
+        def bump_on_delete(sender, label=label, **kwargs):
+            _bump_on_commit(label)
+
+        post_save.connect(bump, sender=model, weak=False, dispatch_uid=f'response_cache_save:{label}')
+        post_delete.connect(bump_on_delete, sender=model, weak=False, dispatch_uid=f'response_cache_delete:{label}')
+
+        if fields is not None:
+            def remember(sender, instance, **kwargs):
+                instance._response_cache_values = _tracked_values(instance, fields)
+
+            post_init.connect(remember, sender=model, weak=False, dispatch_uid=f'response_cache_init:{label}')
+
+
+class EndpointStats:
+    """
+    Per-process hit / miss counters and latency totals for each cached endpoint
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, name, outcome, seconds):
+        """
+        outcome: 'hit', 'miss' or 'not_modified'
+        """
+        with self.lock:
+            stats = self.endpoints.setdefault(name, {
+                'hit': 0, 'miss': 0, 'not_modified': 0,
+                'hit_seconds': 0.0, 'miss_seconds': 0.0, 'not_modified_seconds': 0.0,
+            })
+            stats[outcome] += 1
+            stats[f'{outcome}_seconds'] += seconds
+
+    def snapshot(self):
+        with self.lock:
+            endpoints = {name: dict(stats) for name, stats in self.endpoints.items()}
+
+        def average_ms(stats, outcome):
+            if not stats[outcome]:
+                return None
+            return round(stats[f'{outcome}_seconds'] * 1000 / stats[outcome], 3)
+
+        result = {}
+        for name, stats in endpoints.items():
+            requests = stats['hit'] + stats['miss'] + stats['not_modified']
+            result[name] = {
+                'requests': requests,
+                'hits': stats['hit'],
+                'misses': stats['miss'],
+                'not_modified': stats['not_modified'],
+                # A 304 is served without touching the response cache, it counts as a hit
+                'hit_ratio': round((stats['hit'] + stats['not_modified']) / requests, 4) if requests else 0.0,
+                'avg_hit_ms': average_ms(stats, 'hit'),
+                'avg_miss_ms': average_ms(stats, 'miss'),
+                'avg_not_modified_ms': average_ms(stats, 'not_modified'),
+            }
+        return result
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+
+
+endpoint_stats = EndpointStats()
+
+
+def request_digest(request, *args, **kwargs):
+    """
+    Hash of everything besides the model versions that shapes the response:
+    query parameters, URL arguments and the negotiated media type
+    """
+    params = sorted((key, request.query_params.getlist(key)) for key in request.query_params)
+    media_type = getattr(request, 'accepted_media_type', '')
+    return hashlib.md5(repr((params, args, sorted(kwargs.items()), media_type)).encode('utf-8')).hexdigest()
+
+
+def response_etag(name, stamp, digest):
+    """
+    Strong ETag: the body is fully determined by the model versions and the request
+    """
+    return '"%s"' % hashlib.md5(f'{name}:{stamp}:{digest}'.encode('utf-8')).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in etags
+
+
+def cached_response(name, models):
+    """
+    Cache the data of successful responses of a DRF function view and answer
+    conditional GETs. Apply it below @api_view / @permission_classes so it
+    wraps the view body.
+
+    The ETag is derived from version_stamp, so a request whose If-None-Match
+    still matches gets a 304 before the cache or the serializer is touched.
+    Responses live as long as the versions they were keyed by
+    (RESPONSE_CACHE_TIMEOUT), so a body is never rebuilt under an ETag that
+    outlived it. With a process-local cache each process keeps its own copy,
+    keyed by the database stamp every process agrees on.
+
+    name: endpoint name used in cache keys and stats
+    models: every model whose rows appear in the response
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            started = time.perf_counter()
+            stamp = version_stamp(models)
+            digest = request_digest(request, *args, **kwargs)
+            etag = response_etag(name, stamp, digest)
+            headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+            if etag_matches(request, etag):
+                endpoint_stats.record(name, 'not_modified', time.perf_counter() - started)
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            key = f'{RESPONSE_KEY_PREFIX}:{name}:{stamp}:{digest}'
+            data = cache.get(key)
+            if data is not None:
+                endpoint_stats.record(name, 'hit', time.perf_counter() - started)
+                return Response(data, headers=headers)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+                for header, value in headers.items():
+                    response[header] = value
+            endpoint_stats.record(name, 'miss', time.perf_counter() - started)
+            return response
+        return wrapper
+    return decorator
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def response_cache_stats(request):
+    """
+    Hit ratio and average latency per cached endpoint, for this process.
+    Pass ?reset=1 to clear the counters after reading them.
+    """
+    data = endpoint_stats.snapshot()
+    if request.query_params.get('reset'):
+        endpoint_stats.reset()
+    return Response(data)
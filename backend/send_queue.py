@@ -0,0 +1,240 @@
+"""
+Bounded outbound queues for WebSocket consumers.
+
+Frames a consumer sends with send_frame() go into a per-connection queue of at
+most WEBSOCKET_SEND_QUEUE_SIZE frames, written to the socket by one task in
+order. Group handlers therefore return immediately and the consumer keeps
+draining its channel-layer inbox even while the client is slow to read.
+
+When the queue is full the frame's policy decides what happens:
+- drop: the frame is discarded (heartbeats, anything the client can refetch)
+- coalesce: a queued frame with the same type and coalesce key is replaced
+  by the new one, so a slow client sees only the latest state; a frame with
+  a new key is dropped
+- disconnect: the socket is closed with OVERFLOW_CLOSE_CODE (chat messages,
+  acks); the client reconnects and resumes from its last sequence
+
+Daphne buffers every write in Twisted and its send never waits, so the time a
+send takes says nothing about a slow client. The backlog is measured from the
+client instead: it reports how many frames it has read with
+{"type": "frames_received", "count": n}. Once it has, at most the queue size of
+frames are on the wire unconfirmed; further frames wait in the queue, where
+the policies above apply. A client that never reports is only bounded by the
+queue, which under daphne stays near empty.
+"""
+import asyncio
+import json
+import threading
+import weakref
+from collections import Counter, deque
+
+from django.conf import settings
+
+
+DROP = 'drop'
+COALESCE = 'coalesce'
+DISCONNECT = 'disconnect'
+
+# Application close code (4000-4999) telling the client it fell too far behind
+OVERFLOW_CLOSE_CODE = 4008
+
+
+class SendQueueStats:
+    """
+    Per-process counters of the outbound queues
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queues = weakref.WeakSet()
+        self.reset()
+
+    def reset(self):
+        self.sent = 0
+        self.peak_depth = 0
+        self.dropped = Counter()
+        self.coalesced = Counter()
+        self.overflow_disconnects = Counter()
+
+    def register(self, queue):
+        with self.lock:
+            self.queues.add(queue)
+
+    def unregister(self, queue):
+        with self.lock:
+            self.queues.discard(queue)
+
+    def record(self, counter, frame_type):
+        with self.lock:
+            counter[frame_type] += 1
+
+    def record_depth(self, depth):
+        with self.lock:
+            self.peak_depth = max(self.peak_depth, depth)
+
+    def record_sent(self):
+        with self.lock:
+            self.sent += 1
+
+    def snapshot(self):
+        with self.lock:
+            queues = list(self.queues)
+            depths = [len(queue.frames) for queue in queues]
+            return {
+                'send_queues': len(depths),
+                'frames_unconfirmed': sum(queue.unconfirmed() for queue in queues),
+                'send_queue_depth': sum(depths),
+                'send_queue_max_depth': max(depths, default=0),
+                'send_queue_peak_depth': self.peak_depth,
+                'frames_sent': self.sent,
+                'frames_dropped': dict(self.dropped),
+                'frames_coalesced': dict(self.coalesced),
+                'overflow_disconnects': dict(self.overflow_disconnects),
+            }
+
+
+send_queue_stats = SendQueueStats()
+
+
+class OutboundQueue:
+    """
+    Frames waiting to be written to one socket
+    send: async callable taking the JSON text of a frame
+    close: async callable taking a close code
+    policies: {frame type: DROP | COALESCE | DISCONNECT}
+    """
+
+    def __init__(self, send, close, policies, default_policy=DISCONNECT,
+                 coalesce_fields=('user_id',), size=None):
+        self.send = send
+        self.close = close
+        self.policies = policies
+        self.default_policy = default_policy
+        self.coalesce_fields = coalesce_fields
+        self.size = size or settings.WEBSOCKET_SEND_QUEUE_SIZE
+        # [coalesce key or None, payload] slots, oldest first
+        self.frames = deque()
+        self.coalescing = {}
+        self.ready = asyncio.Event()
+        self.task = None
+        self.closed = False
+        # Frames written, and the count the client confirmed (None until it reports)
+        self.written = 0
+        self.confirmed = None
+        send_queue_stats.register(self)
+
+    def unconfirmed(self):
+        """
+        Frames written that the client has not confirmed reading
+        """
+        return 0 if self.confirmed is None else self.written - self.confirmed
+
+    def confirm(self, count):
+        """
+        Record the client's frames_received count; returns False when invalid
+        """
+        try:
+            count = int(count)
+        except (TypeError, ValueError):
+            return False
+        if count < (self.confirmed or 0) or count > self.written:
+            return False
+        self.confirmed = count
+        self.ready.set()
+        return True
+
+    async def put(self, payload):
+        """
+        Queue a frame.
+        Returns: False when it was dropped or overflowed the queue
+        """
+        if self.closed:
+            return False
+        frame_type = payload.get('type')
+        policy = self.policies.get(frame_type, self.default_policy)
+
+        key = None
+        if policy == COALESCE:
+            key = (frame_type,) + tuple(payload.get(field) for field in self.coalesce_fields)
+            slot = self.coalescing.get(key)
+            if slot is not None:
+                slot[1] = payload
+                send_queue_stats.record(send_queue_stats.coalesced, frame_type)
+                return True
+
+        if len(self.frames) >= self.size:
+            if policy == DISCONNECT:
+                send_queue_stats.record(send_queue_stats.overflow_disconnects, frame_type)
+                self.stop()
+                await self.close(OVERFLOW_CLOSE_CODE)
+            else:
+                send_queue_stats.record(send_queue_stats.dropped, frame_type)
+            return False
+
+        slot = [key, payload]
+        self.frames.append(slot)
+        if key is not None:
+            self.coalescing[key] = slot
+        send_queue_stats.record_depth(len(self.frames))
+        self.ready.set()
+        if self.task is None:
+            self.task = asyncio.ensure_future(self._drain())
+        return True
+
+    async def _drain(self):
+        while True:
+            while not self.frames or self.unconfirmed() >= self.size:
+                self.ready.clear()
+                await self.ready.wait()
+            key, payload = self.frames.popleft()
+            if key is not None:
+                self.coalescing.pop(key, None)
+            await self.send(json.dumps(payload))
+            self.written += 1
+            send_queue_stats.record_sent()
+
+    def stop(self):
+        """
+        Discard queued frames and stop writing
+        """
+        self.closed = True
+        self.frames.clear()
+        self.coalescing.clear()
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        send_queue_stats.unregister(self)
+
+
+class BoundedSendMixin:
+    """
+    AsyncWebsocketConsumer mixin sending JSON frames through an OutboundQueue.
+    send_policies maps frame types to DROP, COALESCE or DISCONNECT; other
+    types use default_send_policy. Consumers pass the client's frames_received
+    messages to frames_received().
+    """
+    send_policies = {}
+    default_send_policy = DISCONNECT
+    coalesce_fields = ('user_id',)
+
+    async def send_frame(self, payload):
+        queue = getattr(self, 'outbound', None)
+        if queue is None:
+            queue = self.outbound = OutboundQueue(
+                lambda text: self.send(text_data=text),
+                lambda code: self.close(code=code),
+                self.send_policies,
+                default_policy=self.default_send_policy,
+                coalesce_fields=self.coalesce_fields,
+            )
+        return await queue.put(payload)
+
+    def frames_received(self, count):
+        queue = getattr(self, 'outbound', None)
+        return queue is not None and queue.confirm(count)
+
+    async def websocket_disconnect(self, message):
+        queue = getattr(self, 'outbound', None)
+        if queue is not None:
+            queue.stop()
+        await super().websocket_disconnect(message)
@@ -31,6 +31,7 @@ CSRF_TRUSTED_ORIGINS = ['https://anaweza-backend.up.railway.app', 'https://anawe
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',
     'corsheaders',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'channels',
     # "csp",
     'userApp',
     'job_offer_app',
@@ -48,6 +50,7 @@ INSTALLED_APPS = [
     'jobApplication_App',
     'testimonialApp',
     'chatApp',
+    'mailApp',
    
 ]
 
@@ -101,7 +104,7 @@ ROOT_URLCONF = 'backend.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -115,6 +118,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
 
 
 
@@ -197,8 +201,75 @@ REST_FRAMEWORK = {
 }
 
 
+# Cache: local memory per process by default, shared Redis when REDIS_URL is set
+REDIS_URL = env('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'anaweza',
+        }
+    }
+
+# Channel layer for WebSocket groups: in-memory within one process by default,
+# Redis when REDIS_URL is set so group_send reaches consumers in every process
+CHANNEL_REDIS_URL = env('CHANNEL_REDIS_URL', default=REDIS_URL)
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [CHANNEL_REDIS_URL],
+                'capacity': env.int('CHANNEL_LAYER_CAPACITY', default=1000),
+                'expiry': 30,
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+            'CONFIG': {
+                'capacity': env.int('CHANNEL_LAYER_CAPACITY', default=1000),
+            },
+        }
+    }
+
+# Frames queued per WebSocket before the per-type overflow policy applies, and frames a
+# client reporting frames_received may leave unread (see backend/send_queue.py)
+WEBSOCKET_SEND_QUEUE_SIZE = env.int('WEBSOCKET_SEND_QUEUE_SIZE', default=100)
+
+# Seconds a WebSocket stays "online" after its last heartbeat (see chatApp/presence.py)
+PRESENCE_TTL = env.int('PRESENCE_TTL', default=60)
+
+# WebSocket chat messages are written in batches of up to CHAT_WRITE_BATCH_SIZE,
+# at most CHAT_WRITE_INTERVAL seconds after they arrive (see chatApp/message_writer.py)
+CHAT_WRITE_BATCH_SIZE = env.int('CHAT_WRITE_BATCH_SIZE', default=100)
+CHAT_WRITE_INTERVAL = env.float('CHAT_WRITE_INTERVAL', default=0.05)
+
+# Chat notifications are saved at once and pushed in batches every CHAT_NOTIFICATION_WINDOW
+# seconds; messages within the window are coalesced (see chatApp/notifications.py). 0 pushes immediately
+CHAT_NOTIFICATION_WINDOW = env.float('CHAT_NOTIFICATION_WINDOW', default=1.0)
+
+# Lifetime of cached public responses and of the model versions that key them; writes invalidate
+# them immediately. Without a shared cache (REDIS_URL) responses are keyed by a database stamp
+# instead of versions, see backend/response_cache.py
+RESPONSE_CACHE_TIMEOUT = env.int('RESPONSE_CACHE_TIMEOUT', default=600)
+
+
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Emails are queued and sent by the send_queued_emails worker (see mailApp/mail_queue.py).
+# Locally, EMAIL_BACKEND=django.core.mail.backends.console.EmailBackend prints them, or
+# django.core.mail.backends.filebased.EmailBackend writes them under EMAIL_FILE_PATH
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = env('EMAIL_FILE_PATH', default=os.path.join(BASE_DIR, 'sent_emails'))
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -3,6 +3,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from backend.response_cache import response_cache_stats
+from backend.websocket_auth import websocket_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,6 +16,8 @@ urlpatterns = [
     path('application/', include('jobApplication_App.urls')),
     path('testimony/', include('testimonialApp.urls')),
     path('chat/', include('chatApp.urls')),
+    path('cache-stats/', response_cache_stats, name='response_cache_stats'),
+    path('websocket-stats/', websocket_stats, name='websocket_stats'),
 ]
 
 # This will serve both static and media files in development
@@ -0,0 +1,197 @@
+"""
+JWT authentication for WebSocket connections.
+
+Browsers cannot set headers on a WebSocket handshake, so clients pass the
+simplejwt access token as ?token=<access token> (an "Authorization: Bearer"
+header is accepted too). The middleware puts the user, or AnonymousUser, in
+scope['user'] before the consumer runs.
+
+Validated tokens are cached per process until they expire, bounded to
+TOKEN_CACHE_SIZE entries. A client that reconnects with the same token
+therefore skips signature checking and the user query. The cached user is
+re-read after TOKEN_CACHE_SECONDS so deactivations still take effect.
+"""
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .send_queue import send_queue_stats
+
+
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_SECONDS = 300
+
+
+def token_from_scope(scope):
+    """
+    Returns: the raw access token of a WebSocket handshake, or None
+    """
+    params = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    token = (params.get('token') or [None])[0]
+    if token:
+        return token
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            scheme, _, credentials = value.decode('latin-1').partition(' ')
+            if scheme.lower() == 'bearer' and credentials:
+                return credentials.strip()
+    return None
+
+
+class TokenCache:
+    """
+    LRU of token -> (user, valid until)
+    """
+
+    def __init__(self, size=TOKEN_CACHE_SIZE):
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token):
+        with self.lock:
+            entry = self.entries.get(token)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self.entries[token]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, token, user, valid_until):
+        with self.lock:
+            self.entries[token] = (user, valid_until)
+            self.entries.move_to_end(token)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache()
+
+
+@database_sync_to_async
+def _load_user(user_id):
+    from userApp.models import CustomUser
+    return CustomUser.objects.filter(id=user_id, is_active=True).first()
+
+
+async def get_user_for_token(token):
+    """
+    Returns: the active user the access token belongs to, or None
+    """
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    try:
+        access_token = AccessToken(token)
+    except TokenError:
+        return None
+    user = await _load_user(access_token['user_id'])
+    if user is not None:
+        valid_until = min(access_token['exp'], time.time() + TOKEN_CACHE_SECONDS)
+        token_cache.set(token, user, valid_until)
+    return user
+
+
+class ConnectionStats:
+    """
+    Per-process WebSocket connection counters
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.total = 0
+        self.open = 0
+        self.peak = 0
+        self.anonymous = 0
+
+    def opened(self, authenticated):
+        with self.lock:
+            self.total += 1
+            self.open += 1
+            self.peak = max(self.peak, self.open)
+            if not authenticated:
+                self.anonymous += 1
+
+    def closed(self):
+        with self.lock:
+            self.open -= 1
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            return {
+                'open_connections': self.open,
+                'peak_connections': self.peak,
+                'total_connections': self.total,
+                'anonymous_connections': self.anonymous,
+                'connections_per_second': round(self.total / elapsed, 3),
+                'token_cache_size': len(token_cache.entries),
+                'token_cache_hits': token_cache.hits,
+                'token_cache_misses': token_cache.misses,
+            }
+
+
+connection_stats = ConnectionStats()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Populate scope['user'] from the access token of a WebSocket handshake
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'websocket':
+            return await super().__call__(scope, receive, send)
+
+        token = token_from_scope(scope)
+        user = await get_user_for_token(token) if token else None
+        scope = dict(scope, user=user or AnonymousUser())
+
+        connection_stats.opened(user is not None)
+        try:
+            return await super().__call__(scope, receive, send)
+        finally:
+            connection_stats.closed()
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def websocket_stats(request):
+    """
+    WebSocket connection and outbound queue counters of the process serving
+    the request. Pass ?reset=1 to restart the counters after reading them.
+    """
+    data = connection_stats.snapshot()
+    data.update(send_queue_stats.snapshot())
+    if request.query_params.get('reset'):
+        with send_queue_stats.lock:
+            send_queue_stats.reset()
+        with connection_stats.lock:
+            open_connections = connection_stats.open
+            connection_stats.reset()
+            connection_stats.open = open_connections
+            connection_stats.peak = open_connections
+    return Response(data)
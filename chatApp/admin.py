@@ -1,6 +1,6 @@
 # chatApp/admin.py
 from django.contrib import admin
-from .models import ChatRoom, Message, MessageReadStatus, ChatNotification
+from .models import ChatRoom, Message, MessageReadStatus, ReadWatermark, ChatNotification
 
 
 @admin.register(ChatRoom)
@@ -76,6 +76,16 @@ class MessageReadStatusAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('message', 'user')
 
 
+@admin.register(ReadWatermark)
+class ReadWatermarkAdmin(admin.ModelAdmin):
+    list_display = ['user', 'chat_room', 'last_read_sequence', 'read_at']
+    search_fields = ['user__phone_number']
+    readonly_fields = ['read_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'chat_room')
+
+
 @admin.register(ChatNotification)
 class ChatNotificationAdmin(admin.ModelAdmin):
     list_display = ['id', 'recipient', 'sender', 'notification_type', 'title', 'is_read', 'created_at']
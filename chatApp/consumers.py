@@ -1,58 +1,116 @@
 # chatApp/consumers.py
+import asyncio
 import json
+import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
 from django.shortcuts import get_object_or_404
 from asgiref.sync import sync_to_async
 
+from django.db.models import Q
+
+from backend.send_queue import COALESCE, DROP, BoundedSendMixin
+
+from . import presence
+from .history import messages_after
+from .message_writer import build_message, get_message_writer
+from .notifications import notify
+from .typing_indicator import TypingIndicator
 from .models import ChatRoom, Message, ChatNotification
 from .serializers import MessageSerializer
 from userApp.models import CustomUser
 
+logger = logging.getLogger(__name__)
 
-from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
-from django.contrib.auth.models import AnonymousUser
-from rest_framework.authtoken.models import Token
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatConsumer(BoundedSendMixin, AsyncWebsocketConsumer):
+    # Frames a slow client may lose; anything else (messages, acks, resume
+    # pages) closes the socket on overflow so the client resumes instead
+    send_policies = {
+        'presence': COALESCE,
+        'presence_status': COALESCE,
+        'typing_status': COALESCE,
+        'heartbeat': DROP,
+    }
+
     async def connect(self):
         self.room_name = self.scope['url_route']['kwargs']['chat_room_id']
         self.room_group_name = f'chat_{self.room_name}'
         
-        # Authenticate user
-        try:
-            token = self.scope['query_string'].decode().split('=')[1]
-            user = await self.get_user(token)
-            
-            if not user or user.is_anonymous:
-                await self.close()
-                return
-                
-            self.scope['user'] = user
-            await self.accept()
-            
-            # Join room group
-            await self.channel_layer.group_add(
+        # scope['user'] is set by backend.websocket_auth.JWTAuthMiddleware
+        user = self.scope.get('user')
+        chat_room = await self.get_chat_room(user) if user and not user.is_anonymous else None
+        if chat_room is None:
+            await self.close()
+            return
+
+        self.chat_room_id = chat_room.id
+        self.typing = TypingIndicator(self.publish_typing)
+        self.participant_ids = {chat_room.job_seeker.user_id, chat_room.other_user_id}
+        if chat_room.application:
+            self.notification_title = f'New message about {chat_room.application.job_offer.title}'
+        else:
+            self.notification_title = f'New message in {chat_room.get_display_title()}'
+        self.pending_writes = set()
+        await self.accept()
+
+        # Join room group
+        await self.channel_layer.group_add(
+            self.room_group_name,
+            self.channel_name
+        )
+
+        if await presence.aconnect(user.id, self.channel_name, self.chat_room_id):
+            await self.channel_layer.group_send(
                 self.room_group_name,
-                self.channel_name
+                {'type': 'presence_status', 'user_id': user.id, 'online': True}
             )
-            
-        except Exception as e:
-            print(f"WebSocket connection error: {e}")
-            await self.close()
+        await self.send_frame({
+            'type': 'presence',
+            'online_users': await presence.aroom_users(self.chat_room_id)
+        })
 
     @database_sync_to_async
-    def get_user(self, token):
-        try:
-            from rest_framework_simplejwt.tokens import AccessToken
-            access_token = AccessToken(token)
-            from userApp.models import CustomUser
-            return CustomUser.objects.get(id=access_token['user_id'])
-        except Exception as e:
-            print(f"Token validation error: {e}")
+    def get_chat_room(self, user):
+        """
+        Returns: the room of this socket when the user takes part in it, else None
+        """
+        if not self.room_name.isdigit():
             return None
+        return ChatRoom.objects.select_related('job_seeker', 'application__job_offer').filter(
+            Q(job_seeker__user=user) | Q(other_user=user),
+            id=int(self.room_name),
+            is_active=True,
+        ).first()
+
+    async def publish_typing(self, is_typing):
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                'type': 'typing_status',
+                'user_id': self.scope['user'].id,
+                'is_typing': is_typing
+            }
+        )
+
+    @database_sync_to_async
+    def notify_participants(self):
+        sender = self.scope['user']
+        for recipient_id in self.participant_ids - {sender.id}:
+            notify(
+                recipient=recipient_id,
+                sender=sender,
+                chat_room=self.chat_room_id,
+                notification_type='new_message',
+                title=self.notification_title,
+                message=f'{sender.phone_number} sent you a message'
+            )
+
+    @database_sync_to_async
+    def missed_messages(self, last_sequence):
+        messages, has_more = messages_after(self.chat_room_id, last_sequence)
+        return MessageSerializer(messages, many=True).data, has_more
 
     async def disconnect(self, close_code):
         # Leave room group
@@ -61,23 +119,41 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
+        if hasattr(self, 'chat_room_id'):
+            await self.typing.stop()
+            user_id = self.scope['user'].id
+            if await presence.adisconnect(user_id, self.channel_name, self.chat_room_id):
+                await self.channel_layer.group_send(
+                    self.room_group_name,
+                    {'type': 'presence_status', 'user_id': user_id, 'online': False}
+                )
+
     async def receive(self, text_data):
         try:
             data = json.loads(text_data)
             
             # Handle different message types
             if data.get('type') == 'chat_message':
-                message = data['message']
-                
-                # Send message to room group
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {
-                        'type': 'chat_message',
-                        'message': message,
-                        'sender_id': self.scope['user'].id
-                    }
+                content = data.get('message')
+                if isinstance(content, dict):
+                    content = content.get('content')
+                if not isinstance(content, str) or not content.strip():
+                    await self.send_frame({
+                        'type': 'message_error',
+                        'client_id': data.get('client_id'),
+                        'error': 'Message content is required'
+                    })
+                    return
+
+                await self.typing.stop()
+
+                # Persisted by the write-behind buffer; broadcast and ack once committed
+                future = get_message_writer().submit(
+                    build_message(self.chat_room_id, self.scope['user'], content)
                 )
+                task = asyncio.ensure_future(self.deliver_message(future, data.get('client_id')))
+                self.pending_writes.add(task)
+                task.add_done_callback(self.pending_writes.discard)
             elif data.get('type') == 'video_call_offer':
                 # Forward video call offer to the room group
                 await self.channel_layer.group_send(
@@ -89,15 +165,29 @@ class ChatConsumer(AsyncWebsocketConsumer):
                     }
                 )
             elif data.get('type') == 'typing':
-                # Handle typing notifications
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {
-                        'type': 'typing_status',
-                        'user_id': self.scope['user'].id,
-                        'is_typing': data.get('is_typing')
-                    }
-                )
+                # Only start/stop edges reach the room (see chatApp/typing_indicator.py)
+                await self.typing.update(bool(data.get('is_typing')))
+            elif data.get('type') == 'resume':
+                # Reconnecting client: send only what it missed since its last seen sequence.
+                # Live messages may arrive while this is sent; clients drop sequences they already have.
+                try:
+                    last_sequence = max(0, int(data.get('last_sequence') or 0))
+                except (TypeError, ValueError):
+                    last_sequence = 0
+                messages, has_more = await self.missed_messages(last_sequence)
+                await self.send_frame({
+                    'type': 'resume',
+                    'messages': messages,
+                    'has_more': has_more,
+                    'last_sequence': messages[-1]['sequence'] if messages else last_sequence
+                })
+            elif data.get('type') == 'heartbeat':
+                # Keeps this socket's presence entry alive
+                await presence.aconnect(self.scope['user'].id, self.channel_name, self.chat_room_id)
+                await self.send_frame({'type': 'heartbeat'})
+            elif data.get('type') == 'frames_received':
+                # Frames this client has read; paces the outbound queue (see backend/send_queue.py)
+                self.frames_received(data.get('count'))
             elif data.get('type') == 'join':
                 # Handle user joining
                 pass  # You might want to handle this case
@@ -105,42 +195,89 @@ class ChatConsumer(AsyncWebsocketConsumer):
         except json.JSONDecodeError:
             pass
 
+    async def deliver_message(self, future, client_id):
+        try:
+            message = await future
+        except Exception:
+            logger.exception("Error saving chat message")
+            await self.send_frame({
+                'type': 'message_error',
+                'client_id': client_id,
+                'error': 'Message could not be saved'
+            })
+            return
+
+        await self.send_frame({
+            'type': 'message_ack',
+            'client_id': client_id,
+            'id': message['id'],
+            'sequence': message['sequence'],
+            'created_at': message['created_at']
+        })
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                'type': 'chat_message',
+                'message': message,
+                'sender_id': message['sender']['id']
+            }
+        )
+        await self.notify_participants()
+
     # Handler for chat messages
     async def chat_message(self, event):
         """Send message to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send_frame({
             'type': 'chat_message',
             'message': event['message'],
-            'sender_id': event['sender_id']
-        }))
+            'sender_id': event.get('sender_id')
+        })
 
     # Handler for video call offers
     async def video_call_offer(self, event):
         """Send video call offer to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send_frame({
             'type': 'video_call_offer',
             'chat_room_id': event['chat_room_id'],
             'caller_id': event['caller_id'],
             'caller_name': event.get('caller_name', 'User'),
             'call_type': event.get('call_type', 'video')  # Add call type
-        }))
+        })
+
+    # Handler for presence changes of the other participants
+    async def presence_status(self, event):
+        if event['user_id'] == self.scope['user'].id:
+            return
+        await self.send_frame({
+            'type': 'presence_status',
+            'user_id': event['user_id'],
+            'online': event['online']
+        })
 
     # Handler for typing status
     async def typing_status(self, event):
         """Send typing status to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send_frame({
             'type': 'typing_status',
             'user_id': event['user_id'],
             'is_typing': event['is_typing']
-        }))
+        })
 
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+class NotificationConsumer(BoundedSendMixin, AsyncWebsocketConsumer):
     """WebSocket consumer for real-time notifications"""
+    # Notifications are stored and listed by the API, so a slow client only
+    # loses the push, never the notification
+    send_policies = {
+        'notification_message': DROP,
+        'chat_room_created': DROP,
+        'heartbeat': DROP,
+        'error': DROP,
+    }
     
     async def connect(self):
         # Check if user is authenticated
-        if self.scope['user'] == AnonymousUser():
+        if self.scope['user'].is_anonymous:
             await self.close()
             return
         
@@ -154,6 +291,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         )
         
         await self.accept()
+        await presence.aconnect(self.scope['user'].id, self.channel_name)
     
     async def disconnect(self, close_code):
         # Leave user group
@@ -162,6 +300,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 self.user_group_name,
                 self.channel_name
             )
+            await presence.adisconnect(self.scope['user'].id, self.channel_name)
     
     async def receive(self, text_data):
         try:
@@ -171,16 +310,25 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             if message_type == 'mark_notification_read':
                 notification_id = data.get('notification_id')
                 await self.mark_notification_read(notification_id)
+            elif message_type == 'heartbeat':
+                await presence.aconnect(self.scope['user'].id, self.channel_name)
+                await self.send_frame({'type': 'heartbeat'})
+            elif message_type == 'frames_received':
+                self.frames_received(data.get('count'))
                 
         except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({
+            await self.send_frame({
                 'type': 'error',
                 'message': 'Invalid JSON'
-            }))
+            })
     
     # WebSocket message handlers
     async def notification_message(self, event):
-        await self.send(text_data=json.dumps(event))
+        await self.send_frame(event)
+    
+    # Sent by chatApp.signals.publish_chat_room_created
+    async def chat_room_created(self, event):
+        await self.send_frame(event)
     
     @database_sync_to_async
     def mark_notification_read(self, notification_id):
@@ -0,0 +1,99 @@
+"""
+Message history pages keyed by per-room sequence numbers.
+
+A page holds the newest messages before a sequence (scrolling back) or the
+oldest after one (catching up), always returned oldest first. Every page is
+a range scan on the (chat_room, is_deleted, sequence) index, whatever its depth.
+"""
+from job_offer_app.pagination import InvalidCursor, get_page_size
+from .models import Message
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _parse_sequence(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        sequence = int(value)
+    except (TypeError, ValueError):
+        raise InvalidCursor(f"{name} must be a message sequence number.")
+    if sequence < 0:
+        raise InvalidCursor(f"{name} must be a message sequence number.")
+    return sequence
+
+
+def _sequence_of_message(chat_room, params, name):
+    message_id = params.get(name)
+    if message_id in (None, ''):
+        return None
+    try:
+        sequence = Message.objects.filter(chat_room=chat_room, id=int(message_id)).values_list('sequence', flat=True).first()
+    except (TypeError, ValueError):
+        sequence = None
+    if sequence is None:
+        raise InvalidCursor(f"{name} must be the id of a message in this chat room.")
+    return sequence
+
+
+def message_page(chat_room, params, queryset=None):
+    """
+    One page of the room's messages.
+
+    Query parameters:
+    - before / before_id: messages older than this sequence / message id
+    - after / after_id: messages newer than this sequence / message id
+    - page_size: number of messages (default 50, max 200)
+    Without before or after, the newest messages are returned.
+
+    Returns: (messages oldest first, older cursor, newer cursor, page_size).
+    A cursor is the sequence to pass as before / after for the next page in
+    that direction, or None when there is nothing more.
+    """
+    page_size = get_page_size(params, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE)
+    before = _parse_sequence(params, 'before')
+    if before is None:
+        before = _sequence_of_message(chat_room, params, 'before_id')
+    after = _parse_sequence(params, 'after')
+    if after is None:
+        after = _sequence_of_message(chat_room, params, 'after_id')
+
+    if queryset is None:
+        queryset = Message.objects.all()
+    queryset = queryset.filter(chat_room=chat_room, is_deleted=False)
+
+    if after is not None:
+        if before is not None:
+            queryset = queryset.filter(sequence__lt=before)
+        # Fetch one extra row to know whether another page exists
+        rows = list(queryset.filter(sequence__gt=after).order_by('sequence')[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        newer = rows[-1].sequence if has_more else None
+        older = rows[0].sequence if rows and after > 0 else None
+        return rows, older, newer, page_size
+
+    if before is not None:
+        queryset = queryset.filter(sequence__lt=before)
+    rows = list(queryset.order_by('-sequence')[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    rows.reverse()
+    older = rows[0].sequence if has_more else None
+    newer = rows[-1].sequence if rows and before is not None else None
+    return rows, older, newer, page_size
+
+
+def messages_after(chat_room_id, sequence, limit=MAX_PAGE_SIZE):
+    """
+    Messages a client missed, oldest first
+    Returns: (messages, whether more follow)
+    """
+    rows = list(
+        Message.objects.filter(chat_room_id=chat_room_id, is_deleted=False, sequence__gt=sequence)
+        .select_related('sender').order_by('sequence')[:limit + 1]
+    )
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,198 @@
+import asyncio
+import time
+import tracemalloc
+
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+from chatApp.simulation import create_chat_room, simulation_environment
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of values, or None when there are none
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def format_ms(seconds):
+    return '-' if seconds is None else f'{seconds * 1000:.1f}ms'
+
+
+class LoadClient:
+    """
+    One socket of the load test and what it observed
+    """
+
+    def __init__(self, application, path, token):
+        self.communicator = WebsocketCommunicator(application, f'{path}?token={token}')
+        self.connect_latency = None
+        self.connected = False
+        self.chat_messages = 0
+        self.typing_frames = 0
+        self.notifications = 0
+        self.latencies = []
+
+    async def connect(self, timeout):
+        started = time.perf_counter()
+        self.connected, _ = await self.communicator.connect(timeout=timeout)
+        self.connect_latency = time.perf_counter() - started
+        return self.connected
+
+    async def read(self, deadline, expected_messages=0, expected_notifications=0):
+        """
+        Receive frames until the expected chat messages and notifications
+        arrived or the deadline passed
+        """
+        loop = asyncio.get_running_loop()
+        while self.chat_messages < expected_messages or self.notifications < expected_notifications:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                frame = await self.communicator.receive_json_from(timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+            if frame.get('type') == 'chat_message':
+                self.chat_messages += 1
+                # Content is "<index> <perf_counter at send>", see Command.drive_room
+                sent_at = float(frame['message']['content'].split()[1])
+                self.latencies.append(time.perf_counter() - sent_at)
+            elif frame.get('type') == 'typing_status':
+                self.typing_frames += 1
+            elif frame.get('type') == 'notification_message':
+                self.notifications += len(frame.get('notifications') or [frame])
+
+    async def disconnect(self):
+        if self.connected:
+            try:
+                await self.communicator.disconnect(timeout=5)
+            except asyncio.TimeoutError:
+                pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test ChatConsumer and NotificationConsumer in this process: N rooms x M chat '
+        'sockets exchanging messages and typing events. Reports connect latency, delivery '
+        'latency percentiles, messages per second and memory per connection. Runs against '
+        'a throwaway test database and an in-memory channel layer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=10, help='Chat rooms')
+        parser.add_argument('--clients', type=int, default=10, help='Chat sockets per room')
+        parser.add_argument('--messages', type=int, default=50, help='Messages sent into each room')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0.01,
+            help='Seconds between two messages of the same room',
+        )
+        parser.add_argument(
+            '--notifications',
+            action='store_true',
+            help='Also open a notification socket for the job seeker of every room',
+        )
+        parser.add_argument('--timeout', type=float, default=60.0, help='Seconds to wait for delivery')
+
+    def handle(self, *args, **options):
+        with simulation_environment(CHAT_NOTIFICATION_WINDOW=0):
+            rooms = [create_chat_room(index) for index in range(options['rooms'])]
+            asyncio.run(self.run(rooms, options))
+
+    async def run(self, rooms, options):
+        from backend.asgi import application
+
+        room_clients = []
+        notification_clients = []
+        for chat_room, employer, job_seeker in rooms:
+            tokens = [str(AccessToken.for_user(employer)), str(AccessToken.for_user(job_seeker))]
+            path = f'/ws/chat/{chat_room.id}/'
+            # Sockets alternate between the two participants; the first one sends
+            room_clients.append([
+                LoadClient(application, path, tokens[i % 2]) for i in range(options['clients'])
+            ])
+            if options['notifications']:
+                notification_clients.append(LoadClient(application, '/ws/notifications/', tokens[1]))
+        clients = [client for group in room_clients for client in group] + notification_clients
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        await asyncio.gather(*(client.connect(options['timeout']) for client in clients))
+        connect_elapsed = time.perf_counter() - started
+        connected = [client for client in clients if client.connected]
+        memory = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + options['timeout']
+        messages = options['messages']
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(self.drive_room(group[0], messages, options['interval']) for group in room_clients),
+            *(client.read(deadline, expected_messages=messages)
+              for group in room_clients for client in group if client.connected),
+            *(client.read(deadline, expected_notifications=messages)
+              for client in notification_clients if client.connected),
+        )
+        elapsed = time.perf_counter() - started
+
+        await asyncio.gather(*(client.disconnect() for client in clients))
+        self.report(room_clients, notification_clients, connected, memory, connect_elapsed, elapsed, options)
+
+    async def drive_room(self, sender, messages, interval):
+        if not sender.connected:
+            return
+        for i in range(messages):
+            await sender.communicator.send_json_to({'type': 'typing', 'is_typing': True})
+            await sender.communicator.send_json_to({
+                'type': 'chat_message',
+                'message': f'{i} {time.perf_counter()}',
+                'client_id': str(i),
+            })
+            await asyncio.sleep(interval)
+
+    def report(self, room_clients, notification_clients, connected, memory, connect_elapsed, elapsed, options):
+        chat_clients = [client for group in room_clients for client in group]
+        connect_latencies = [client.connect_latency for client in connected]
+        latencies = [latency for client in chat_clients for latency in client.latencies]
+        delivered = sum(client.chat_messages for client in chat_clients)
+        expected = len(chat_clients) * options['messages']
+        sent = len(room_clients) * options['messages']
+
+        self.stdout.write(
+            f'Connections: {len(connected)} of {len(chat_clients) + len(notification_clients)} '
+            f'in {connect_elapsed:.2f}s'
+        )
+        self.stdout.write(
+            f'Connect latency: p50 {format_ms(percentile(connect_latencies, 50))}, '
+            f'p95 {format_ms(percentile(connect_latencies, 95))}, '
+            f'max {format_ms(max(connect_latencies, default=None))}'
+        )
+        if connected:
+            self.stdout.write(f'Memory per connection: {memory / len(connected) / 1024:.1f} KiB (Python heap)')
+        self.stdout.write(
+            f'Messages: {sent} sent, {delivered} of {expected} deliveries in {elapsed:.2f}s '
+            f'({sent / elapsed:.0f} msgs/s in, {delivered / elapsed:.0f} msgs/s out)'
+        )
+        self.stdout.write(
+            f'Delivery latency: p50 {format_ms(percentile(latencies, 50))}, '
+            f'p90 {format_ms(percentile(latencies, 90))}, '
+            f'p99 {format_ms(percentile(latencies, 99))}, '
+            f'max {format_ms(max(latencies, default=None))}'
+        )
+        self.stdout.write(f'Typing frames delivered: {sum(client.typing_frames for client in chat_clients)}')
+        if notification_clients:
+            self.stdout.write(
+                f'Notifications delivered: {sum(client.notifications for client in notification_clients)}'
+            )
+        if delivered < expected:
+            self.stderr.write(f'{expected - delivered} deliveries missing')
+        else:
+            self.stdout.write(self.style.SUCCESS('Every socket received every message'))
@@ -0,0 +1,163 @@
+import asyncio
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+from chatApp.simulation import create_chat_room, simulation_environment
+
+
+class SimulatedSocket:
+    """
+    WebSocket client driving the ASGI application directly. Every frame the
+    server sends takes `delay` seconds to write, like a client on a slow link
+    whose socket buffer is full.
+    """
+
+    def __init__(self, application, path, token, delay=0):
+        self.application = application
+        self.delay = delay
+        self.scope = {
+            'type': 'websocket',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': f'token={token}'.encode(),
+            'headers': [],
+            'subprotocols': [],
+            'client': ('127.0.0.1', 0),
+            'server': ('testserver', 80),
+        }
+        self.incoming = asyncio.Queue()
+        self.answered = asyncio.Event()
+        self.accepted = False
+        self.close_code = None
+        self.frames = Counter()
+        self.task = None
+
+    async def connect(self):
+        self.task = asyncio.ensure_future(self.application(self.scope, self.incoming.get, self._send))
+        await self.incoming.put({'type': 'websocket.connect'})
+        await self.answered.wait()
+        return self.accepted
+
+    async def _send(self, message):
+        if message['type'] == 'websocket.accept':
+            self.accepted = True
+            self.answered.set()
+        elif message['type'] == 'websocket.close':
+            if self.close_code is None:
+                self.close_code = message.get('code') or 1000
+                await self.incoming.put({'type': 'websocket.disconnect', 'code': self.close_code})
+            self.answered.set()
+        elif message['type'] == 'websocket.send' and self.close_code is None:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            self.frames[json.loads(message['text']).get('type')] += 1
+
+    async def send_json(self, payload):
+        await self.incoming.put({'type': 'websocket.receive', 'text': json.dumps(payload)})
+
+    async def disconnect(self):
+        if self.close_code is None:
+            self.close_code = 1000
+            await self.incoming.put({'type': 'websocket.disconnect', 'code': 1000})
+        try:
+            await asyncio.wait_for(self.task, timeout=5)
+        except asyncio.TimeoutError:
+            self.task.cancel()
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulate fast and slow WebSocket clients in one chat room and report how the '
+        'outbound send queues dropped, coalesced and disconnected. Runs against a '
+        'throwaway test database and an in-memory channel layer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fast', type=int, default=5, help='Clients that read everything immediately')
+        parser.add_argument('--slow', type=int, default=5, help='Clients that take --delay seconds per frame')
+        parser.add_argument('--delay', type=float, default=0.05, help='Seconds a slow client takes to read one frame')
+        parser.add_argument('--messages', type=int, default=300, help='Chat messages sent into the room')
+        parser.add_argument(
+            '--burst',
+            type=int,
+            default=50,
+            help='Messages sent before waiting for their acknowledgements',
+        )
+        parser.add_argument(
+            '--queue-size',
+            type=int,
+            default=settings.WEBSOCKET_SEND_QUEUE_SIZE,
+            help='Outbound queue size per socket',
+        )
+        parser.add_argument('--timeout', type=float, default=30.0, help='Seconds to wait for delivery')
+
+    def handle(self, *args, **options):
+        with simulation_environment(
+            CHAT_NOTIFICATION_WINDOW=0,
+            WEBSOCKET_SEND_QUEUE_SIZE=options['queue_size'],
+        ):
+            chat_room, employer, job_seeker = create_chat_room()
+            asyncio.run(self.simulate(chat_room, employer, job_seeker, options))
+
+    async def simulate(self, chat_room, employer, job_seeker, options):
+        from backend.asgi import application
+        from backend.send_queue import OVERFLOW_CLOSE_CODE, send_queue_stats
+
+        path = f'/ws/chat/{chat_room.id}/'
+        sender_token = str(AccessToken.for_user(employer))
+        reader_token = str(AccessToken.for_user(job_seeker))
+        send_queue_stats.reset()
+
+        sender = SimulatedSocket(application, path, sender_token)
+        fast = [SimulatedSocket(application, path, reader_token) for _ in range(options['fast'])]
+        slow = [SimulatedSocket(application, path, reader_token, options['delay']) for _ in range(options['slow'])]
+        for socket in [sender] + fast + slow:
+            if not await socket.connect():
+                self.stderr.write(f'Connection refused with close code {socket.close_code}')
+                return
+
+        messages = options['messages']
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + options['timeout']
+        for i in range(messages):
+            await sender.send_json({'type': 'typing', 'is_typing': True})
+            await sender.send_json({'type': 'chat_message', 'message': f'Message {i}', 'client_id': str(i)})
+            # Yield so the consumers interleave with the sender as real traffic would
+            await asyncio.sleep(0)
+            if (i + 1) % options['burst'] == 0:
+                # Bursts keep every inbox within the channel layer's capacity
+                while sender.frames['message_ack'] <= i and loop.time() < deadline:
+                    await asyncio.sleep(0.01)
+
+        while loop.time() < deadline:
+            if (sender.frames['message_ack'] >= messages
+                    and all(socket.frames['chat_message'] >= messages for socket in fast)):
+                break
+            await asyncio.sleep(0.05)
+        stats = send_queue_stats.snapshot()
+
+        for socket in [sender] + fast + slow:
+            await socket.disconnect()
+
+        self.stdout.write(f'Acknowledged {sender.frames["message_ack"]} of {messages} messages')
+        for label, sockets in (('fast', fast), ('slow', slow)):
+            if not sockets:
+                continue
+            received = [socket.frames['chat_message'] for socket in sockets]
+            typing = [socket.frames['typing_status'] for socket in sockets]
+            overflowed = sum(socket.close_code == OVERFLOW_CLOSE_CODE for socket in sockets)
+            self.stdout.write(
+                f'{label}: {len(sockets)} clients, chat messages received min {min(received)} '
+                f'max {max(received)}, typing frames max {max(typing)}, '
+                f'{overflowed} disconnected for overflow'
+            )
+        for key, value in stats.items():
+            self.stdout.write(f'{key}: {value}')
+
+        if any(socket.frames['chat_message'] < messages for socket in fast):
+            self.stderr.write('Some fast clients missed messages')
+        else:
+            self.stdout.write(self.style.SUCCESS('Every fast client received every message'))
@@ -0,0 +1,117 @@
+"""
+Write-behind persistence for messages received over WebSockets.
+
+Consumers hand messages to the writer of their event loop and get a future
+back. The writer buffers them and flushes when CHAT_WRITE_BATCH_SIZE
+messages are waiting or CHAT_WRITE_INTERVAL seconds after the first one
+arrived. A flush numbers the messages of every room in the batch, inserts the
+rows with one bulk_create and updates each room's summary and updated_at once,
+all in one transaction. Futures resolve only after that transaction commits,
+so a client may treat the acknowledgement as durable and should resend
+anything it has not seen acknowledged.
+"""
+import asyncio
+import weakref
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from .models import ChatRoom, Message
+from .serializers import MessageSerializer
+
+
+def persist_messages(messages):
+    """
+    Insert unsaved messages with per-room sequence numbers in one transaction.
+    Returns: the messages, with id, sequence and created_at set
+    """
+    with transaction.atomic():
+        rooms = ChatRoom.objects.allocate_sequences(messages)
+        Message.objects.bulk_create(messages)
+        ChatRoom.objects.record_messages(rooms, messages)
+    return messages
+
+
+class MessageWriter:
+    """
+    Buffer of messages waiting to be written, bound to one event loop
+    """
+
+    def __init__(self, batch_size=None, interval=None):
+        self.batch_size = batch_size or settings.CHAT_WRITE_BATCH_SIZE
+        self.interval = interval if interval is not None else settings.CHAT_WRITE_INTERVAL
+        self.pending = []
+        self.timer = None
+        self.flush_lock = asyncio.Lock()
+        self.flushes = 0
+        self.written = 0
+
+    def submit(self, message):
+        """
+        Queue an unsaved Message.
+        Returns: a future resolving to the serialized message once it is committed
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((message, future))
+        if len(self.pending) >= self.batch_size:
+            self._schedule(0)
+        elif self.timer is None:
+            self._schedule(self.interval)
+        return future
+
+    def _schedule(self, delay):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = asyncio.get_running_loop().call_later(
+            delay, lambda: asyncio.ensure_future(self.flush())
+        )
+
+    async def flush(self):
+        self.timer = None
+        # One flush at a time keeps sequence numbers in submission order
+        async with self.flush_lock:
+            batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            if self.pending:
+                self._schedule(0)
+            if not batch:
+                return
+            try:
+                data = await database_sync_to_async(self._write)([message for message, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            self.flushes += 1
+            self.written += len(batch)
+            for (_, future), item in zip(batch, data):
+                if not future.done():
+                    future.set_result(item)
+
+    @staticmethod
+    def _write(messages):
+        persist_messages(messages)
+        return [MessageSerializer(message).data for message in messages]
+
+
+_writers = weakref.WeakKeyDictionary()
+
+
+def get_message_writer():
+    """
+    Returns: the MessageWriter of the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    writer = _writers.get(loop)
+    if writer is None:
+        writer = _writers[loop] = MessageWriter()
+    return writer
+
+
+def build_message(chat_room_id, sender, content, message_type='text'):
+    return Message(
+        chat_room_id=chat_room_id,
+        sender=sender,
+        content=content,
+        message_type=message_type,
+    )
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:50
+
+from django.db import migrations, models
+
+
+def number_existing_messages(apps, schema_editor):
+    ChatRoom = apps.get_model('chatApp', 'ChatRoom')
+    Message = apps.get_model('chatApp', 'Message')
+    for room_id in ChatRoom.objects.values_list('id', flat=True).iterator():
+        messages = list(Message.objects.filter(chat_room_id=room_id).order_by('created_at', 'id').only('id'))
+        for sequence, message in enumerate(messages, start=1):
+            message.sequence = sequence
+        Message.objects.bulk_update(messages, ['sequence'], batch_size=500)
+        ChatRoom.objects.filter(id=room_id).update(last_sequence=len(messages))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_sequence',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='sequence',
+            field=models.PositiveBigIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(number_existing_messages, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='message',
+            constraint=models.UniqueConstraint(fields=('chat_room', 'sequence'), name='message_room_sequence_uniq'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def seed_watermarks(apps, schema_editor):
+    """
+    A participant has read up to the newest message of the other participant
+    that was flagged is_read
+    """
+    ChatRoom = apps.get_model('chatApp', 'ChatRoom')
+    Message = apps.get_model('chatApp', 'Message')
+    ReadWatermark = apps.get_model('chatApp', 'ReadWatermark')
+
+    participants = {
+        room_id: (job_seeker_user_id, other_user_id)
+        for room_id, job_seeker_user_id, other_user_id
+        in ChatRoom.objects.values_list('id', 'job_seeker__user_id', 'other_user_id').iterator()
+    }
+    read = (
+        Message.objects.filter(is_read=True, is_deleted=False).order_by()
+        .values('chat_room_id', 'sender_id').annotate(last=models.Max('sequence'))
+    )
+    watermarks = {}
+    for row in read:
+        for user_id in participants.get(row['chat_room_id'], ()):
+            if user_id != row['sender_id']:
+                key = (user_id, row['chat_room_id'])
+                watermarks[key] = max(watermarks.get(key, 0), row['last'] or 0)
+    ReadWatermark.objects.bulk_create(
+        [ReadWatermark(user_id=user_id, chat_room_id=room_id, last_read_sequence=sequence)
+         for (user_id, room_id), sequence in watermarks.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('chatApp', '0002_message_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_sequence', models.PositiveBigIntegerField(default=0)),
+                ('read_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('chat_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_watermarks', to='chatApp.chatroom')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_watermarks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Read Watermark',
+                'verbose_name_plural': 'Read Watermarks',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='readwatermark',
+            constraint=models.UniqueConstraint(fields=('user', 'chat_room'), name='readwatermark_user_room_uniq'),
+        ),
+        migrations.RunPython(seed_watermarks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+PREVIEW_LENGTH = 50
+
+
+def fill_room_summaries(apps, schema_editor):
+    ChatRoom = apps.get_model('chatApp', 'ChatRoom')
+    Message = apps.get_model('chatApp', 'Message')
+    ReadWatermark = apps.get_model('chatApp', 'ReadWatermark')
+
+    watermarks = {
+        (user_id, room_id): sequence for user_id, room_id, sequence
+        in ReadWatermark.objects.values_list('user_id', 'chat_room_id', 'last_read_sequence').iterator()
+    }
+    for room in ChatRoom.objects.select_related('job_seeker').iterator():
+        messages = Message.objects.filter(chat_room_id=room.id, is_deleted=False)
+        last = messages.order_by('-sequence', '-id').first()
+        if last is not None:
+            content = last.content
+            room.last_message_id = last.id
+            room.last_message_preview = content[:PREVIEW_LENGTH] + '...' if len(content) > PREVIEW_LENGTH else content
+            room.last_message_sender_id = last.sender_id
+            room.last_message_type = last.message_type
+            room.last_message_at = last.created_at
+        for user_id, field in ((room.job_seeker.user_id, 'job_seeker_unread_count'),
+                               (room.other_user_id, 'other_user_unread_count')):
+            read = watermarks.get((user_id, room.id), 0)
+            setattr(room, field, messages.filter(sequence__gt=read).exclude(sender_id=user_id).count())
+        ChatRoom.objects.filter(id=room.id).update(
+            last_message_id=room.last_message_id,
+            last_message_preview=room.last_message_preview,
+            last_message_sender_id=room.last_message_sender_id,
+            last_message_type=room.last_message_type,
+            last_message_at=room.last_message_at,
+            job_seeker_unread_count=room.job_seeker_unread_count,
+            other_user_unread_count=room.other_user_unread_count,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('chatApp', '0003_read_watermarks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='job_seeker_unread_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chatApp.message'),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message_preview',
+            field=models.CharField(blank=True, editable=False, max_length=53),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message_sender',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message_type',
+            field=models.CharField(blank=True, editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='other_user_unread_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_room_summaries, migrations.RunPython.noop),
+    ]
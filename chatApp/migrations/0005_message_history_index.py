@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatApp', '0004_room_summaries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat_room', 'is_deleted', 'sequence'], name='message_history_idx'),
+        ),
+    ]
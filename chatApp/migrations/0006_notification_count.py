@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-16 22:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatApp', '0005_message_history_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatnotification',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
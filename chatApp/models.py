@@ -1,11 +1,111 @@
 # chatApp/models.py
-from django.db import models
+from django.db import models, transaction
 from django.utils.timezone import now
 from userApp.models import CustomUser
 from jobApplication_App.models import Application
 from job_seeker.models import JobSeeker
 
 
+PREVIEW_LENGTH = 50
+
+
+def message_preview(content):
+    return content[:PREVIEW_LENGTH] + '...' if len(content) > PREVIEW_LENGTH else content
+
+
+class ChatRoomManager(models.Manager):
+    """
+    Custom manager for ChatRoom with useful methods
+    """
+    
+    def get_user_chat_rooms(self, user):
+        """Get all chat rooms for a user"""
+        if hasattr(user, 'job_seeker'):
+            return self.filter(job_seeker=user.job_seeker, is_active=True)
+        else:
+            return self.filter(other_user=user, is_active=True)
+    
+    def with_summary_relations(self):
+        """Chat rooms with everything ChatRoomSerializer reads loaded in the same query"""
+        return self.select_related(
+            'job_seeker__user', 'other_user', 'last_message_sender',
+            'application__job_offer', 'application__job_seeker', 'application__user',
+        )
+    
+    def get_application_chat_rooms(self, application):
+        """Get all chat rooms for a specific application"""
+        return self.filter(application=application, is_active=True)
+    
+    def allocate_sequences(self, messages):
+        """
+        Lock the chat rooms of unsaved messages and number the messages in
+        each room, with one locking read whatever the number of rooms. Call
+        inside transaction.atomic(), insert the messages, then pass the result
+        to record_messages in the same transaction.
+        Returns: {chat_room_id: {'last_sequence', 'job_seeker_user_id', 'other_user_id'}}
+        """
+        room_ids = {message.chat_room_id for message in messages}
+        rooms = {
+            row['id']: row for row in
+            self.select_for_update(of=('self',))
+            .filter(id__in=room_ids).order_by('id')
+            .values('id', 'last_sequence', 'job_seeker__user_id', 'other_user_id')
+        }
+        missing = room_ids - set(rooms)
+        if missing:
+            raise self.model.DoesNotExist(f"Chat rooms not found: {sorted(missing)}")
+        for message in messages:
+            rooms[message.chat_room_id]['last_sequence'] += 1
+            message.sequence = rooms[message.chat_room_id]['last_sequence']
+        return rooms
+    
+    def record_messages(self, rooms, messages):
+        """
+        After inserting messages numbered by allocate_sequences: store each
+        room's last sequence and last-message snapshot, add to the unread
+        counter of every participant but the sender and touch updated_at,
+        all with one UPDATE.
+        """
+        last = {}
+        unread = {room_id: [0, 0] for room_id in rooms}
+        for message in messages:
+            room = rooms[message.chat_room_id]
+            last[message.chat_room_id] = message
+            if message.sender_id != room['job_seeker__user_id']:
+                unread[message.chat_room_id][0] += 1
+            if message.sender_id != room['other_user_id']:
+                unread[message.chat_room_id][1] += 1
+
+        timestamp = now()
+        updates = []
+        for room_id, message in last.items():
+            job_seeker_unread, other_user_unread = unread[room_id]
+            updates.append(self.model(
+                id=room_id,
+                last_sequence=rooms[room_id]['last_sequence'],
+                last_message_id=message.id,
+                last_message_preview=message_preview(message.content),
+                last_message_sender_id=message.sender_id,
+                last_message_type=message.message_type,
+                last_message_at=message.created_at,
+                job_seeker_unread_count=models.F('job_seeker_unread_count') + job_seeker_unread,
+                other_user_unread_count=models.F('other_user_unread_count') + other_user_unread,
+                updated_at=timestamp,
+            ))
+        self.bulk_update(updates, [
+            'last_sequence', 'last_message', 'last_message_preview', 'last_message_sender',
+            'last_message_type', 'last_message_at', 'job_seeker_unread_count',
+            'other_user_unread_count', 'updated_at',
+        ])
+    
+    def get_general_chat_rooms(self, user):
+        """Get general chat rooms (not tied to applications)"""
+        if hasattr(user, 'job_seeker'):
+            return self.filter(job_seeker=user.job_seeker, application__isnull=True, is_active=True)
+        else:
+            return self.filter(other_user=user, application__isnull=True, is_active=True)
+
+
 class ChatRoom(models.Model):
     """
     Chat room for communication between job seekers and other users
@@ -48,9 +148,38 @@ class ChatRoom(models.Model):
         help_text="Optional title for the chat room"
     )
     is_active = models.BooleanField(default=True)
+    # Highest Message.sequence handed out in this room
+    last_sequence = models.PositiveBigIntegerField(default=0, editable=False)
+    
+    # Snapshot of the newest message, maintained by ChatRoomManager.record_messages
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    last_message_preview = models.CharField(max_length=PREVIEW_LENGTH + 3, blank=True, editable=False)
+    last_message_sender = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    last_message_type = models.CharField(max_length=10, blank=True, editable=False)
+    last_message_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    # Messages each participant has not read yet (see chatApp/read_tracking.py)
+    job_seeker_unread_count = models.PositiveIntegerField(default=0, editable=False)
+    other_user_unread_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=now)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ChatRoomManager()
+    
     class Meta:
         ordering = ['-updated_at']
         verbose_name = 'Chat Room'
@@ -136,6 +265,8 @@ class Message(models.Model):
     message_type = models.CharField(max_length=10, choices=MESSAGE_TYPES, default='text')
     content = models.TextField()
     attachment = models.FileField(upload_to='chat_attachments/', blank=True, null=True)
+    # Position of the message in its chat room, assigned when it is inserted
+    sequence = models.PositiveBigIntegerField(null=True, editable=False)
     
     # Message status
     is_read = models.BooleanField(default=False)
@@ -150,17 +281,34 @@ class Message(models.Model):
         ordering = ['created_at']
         verbose_name = 'Message'
         verbose_name_plural = 'Messages'
+        constraints = [
+            models.UniqueConstraint(fields=['chat_room', 'sequence'], name='message_room_sequence_uniq'),
+        ]
+        indexes = [
+            # History pages: range scans by sequence over a room's visible messages
+            models.Index(fields=['chat_room', 'is_deleted', 'sequence'], name='message_history_idx'),
+        ]
     
     def __str__(self):
         chat_info = f"App {self.chat_room.application.id}" if self.chat_room.application else "General Chat"
         return f"Message from {self.sender.phone_number} in {chat_info}"
     
-    def mark_as_read(self):
-        """Mark message as read"""
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = now()
-            self.save(update_fields=['is_read', 'read_at'])
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.sequence is None:
+            with transaction.atomic():
+                rooms = ChatRoom.objects.allocate_sequences([self])
+                super().save(*args, **kwargs)
+                ChatRoom.objects.record_messages(rooms, [self])
+            return
+        super().save(*args, **kwargs)
+    
+    def mark_as_read(self, user=None):
+        """Mark the room read up to this message for user (the recipient by default)"""
+        from .read_tracking import mark_room_read
+        if user is None:
+            user = self.chat_room.get_other_participant(self.sender)
+        if user is not None:
+            mark_room_read(user, self.chat_room, self.sequence)
     
     def can_user_access(self, user):
         """Check if user can access this message"""
@@ -192,6 +340,35 @@ class MessageReadStatus(models.Model):
         return f"{self.user.phone_number} read message at {self.read_at}"
 
 
+class ReadWatermark(models.Model):
+    """
+    Highest message sequence a user has read in a chat room.
+    Every message of the room up to last_read_sequence counts as read by the user.
+    """
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='read_watermarks'
+    )
+    chat_room = models.ForeignKey(
+        ChatRoom,
+        on_delete=models.CASCADE,
+        related_name='read_watermarks'
+    )
+    last_read_sequence = models.PositiveBigIntegerField(default=0)
+    read_at = models.DateTimeField(default=now)
+    
+    class Meta:
+        verbose_name = 'Read Watermark'
+        verbose_name_plural = 'Read Watermarks'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'chat_room'], name='readwatermark_user_room_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.phone_number} read up to {self.last_read_sequence} in room {self.chat_room_id}"
+
+
 class ChatNotification(models.Model):
     """
     Notifications for chat events
@@ -224,6 +401,8 @@ class ChatNotification(models.Model):
     notification_type = models.CharField(max_length=30, choices=NOTIFICATION_TYPES)
     title = models.CharField(max_length=200)
     message = models.TextField()
+    # Number of events folded into this notification (see chatApp/notifications.py)
+    count = models.PositiveIntegerField(default=1)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=now)
     
@@ -240,31 +419,3 @@ class ChatNotification(models.Model):
         if not self.is_read:
             self.is_read = True
             self.save(update_fields=['is_read'])
-
-
-class ChatRoomManager(models.Manager):
-    """
-    Custom manager for ChatRoom with useful methods
-    """
-    
-    def get_user_chat_rooms(self, user):
-        """Get all chat rooms for a user"""
-        if hasattr(user, 'job_seeker'):
-            return self.filter(job_seeker=user.job_seeker, is_active=True)
-        else:
-            return self.filter(other_user=user, is_active=True)
-    
-    def get_application_chat_rooms(self, application):
-        """Get all chat rooms for a specific application"""
-        return self.filter(application=application, is_active=True)
-    
-    def get_general_chat_rooms(self, user):
-        """Get general chat rooms (not tied to applications)"""
-        if hasattr(user, 'job_seeker'):
-            return self.filter(job_seeker=user.job_seeker, application__isnull=True, is_active=True)
-        else:
-            return self.filter(other_user=user, application__isnull=True, is_active=True)
-
-
-# Add the custom manager to ChatRoom
-ChatRoom.add_to_class('objects', ChatRoomManager())
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+Chat notifications, written at once and published in batches.
+
+notify() saves the ChatNotification in the caller's transaction, so a
+notification exists exactly when the change that caused it committed. A
+new_message notification is merged into the recipient's unread one from the
+same sender and room when that one is less than CHAT_NOTIFICATION_WINDOW
+seconds old ("5 new messages from X"), so a burst of messages does not flood
+the notification list.
+
+Only the realtime pushes are batched: once the transaction commits, the
+notification ids are queued and every CHAT_NOTIFICATION_WINDOW seconds each
+recipient gets a single channel-layer publish carrying all of their new or
+updated notifications. Pushes still queued when the process exits are sent
+on the way out; a process that dies within the window loses them, never the
+notifications, which clients pick up from the list endpoint.
+"""
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Cast, Concat
+from django.utils.timezone import now
+from .models import ChatNotification
+
+logger = logging.getLogger(__name__)
+
+COALESCED_TYPES = {'new_message'}
+
+
+def _pk(value):
+    return getattr(value, 'pk', value)
+
+
+def notification_payload(notification):
+    """
+    Push payload of a ChatNotification loaded with its sender and chat room
+    """
+    chat_room = notification.chat_room
+    application = chat_room.application
+    sender = notification.sender
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'count': notification.count,
+        'created_at': notification.created_at.isoformat(),
+        'chat_room_id': notification.chat_room_id,
+        'application_id': application.id if application else None,
+        'job_offer_title': application.job_offer.title if application else None,
+        'sender': {
+            'id': sender.id,
+            'phone_number': sender.phone_number,
+            'role': sender.role,
+        } if sender else None,
+    }
+
+
+class NotificationPublisher:
+    """
+    Per-process buffer of saved notifications waiting to be pushed
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()
+        self.timer = None
+        self.flushes = 0
+        self.published = 0
+
+    def get_window(self):
+        return settings.CHAT_NOTIFICATION_WINDOW if self.window is None else self.window
+
+    def add(self, notification_ids):
+        """
+        Queue pushes for committed notifications; sent within the window (immediately when it is 0)
+        """
+        with self.lock:
+            for notification_id in notification_ids:
+                # A notification updated twice within the window is pushed once
+                self.pending[notification_id] = None
+            window = self.get_window()
+            if window and self.timer is None:
+                self.timer = threading.Timer(window, self._flush_in_thread)
+                self.timer.daemon = True
+                self.timer.start()
+        if not window:
+            self.flush()
+
+    def _flush_in_thread(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Error flushing chat notifications")
+        finally:
+            # The timer thread opened its own connection; do not leak it
+            connections.close_all()
+
+    def flush(self):
+        """
+        Publish everything queued so far, one group_send per recipient.
+        Returns: the number of recipients published to
+        """
+        with self.lock:
+            pending, self.pending = self.pending, OrderedDict()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not pending:
+            return 0
+
+        notifications = ChatNotification.objects.select_related(
+            'sender', 'chat_room__application__job_offer'
+        ).in_bulk(list(pending))
+
+        by_recipient = OrderedDict()
+        for notification_id in pending:
+            notification = notifications.get(notification_id)
+            if notification is not None:
+                by_recipient.setdefault(notification.recipient_id, []).append(
+                    notification_payload(notification)
+                )
+
+        channel_layer = get_channel_layer()
+        for recipient_id, payloads in by_recipient.items():
+            try:
+                async_to_sync(channel_layer.group_send)(
+                    f"user_{recipient_id}",
+                    {
+                        'type': 'notification_message',
+                        # 'notification' (the newest) keeps the single-notification shape
+                        'notification': payloads[-1],
+                        'notifications': payloads,
+                    }
+                )
+            except Exception:
+                logger.exception("Error publishing notifications to user %s", recipient_id)
+
+        self.flushes += 1
+        self.published += len(by_recipient)
+        return len(by_recipient)
+
+
+publisher = NotificationPublisher()
+
+
+@atexit.register
+def _flush_at_exit():
+    # One-shot commands such as process_application_events exit before the timer fires
+    try:
+        publisher.flush()
+    except Exception:
+        logger.exception("Error flushing chat notifications at exit")
+
+
+def publish_on_commit(notification_ids):
+    notification_ids = list(notification_ids)
+    if notification_ids:
+        transaction.on_commit(lambda: publisher.add(notification_ids))
+
+
+def create_notifications(notifications):
+    """
+    Save unsaved ChatNotifications with one bulk_create and push them once the
+    current transaction commits. Nothing is coalesced.
+    Returns: the saved notifications
+    """
+    ChatNotification.objects.bulk_create(notifications)
+    publish_on_commit(notification.id for notification in notifications)
+    return notifications
+
+
+def _coalesce(recipient_id, chat_room_id, notification_type, sender, title):
+    """
+    Fold a notification into the recipient's recent unread one of the same kind.
+    Returns: the id of the updated notification, None when there is none to fold into
+    """
+    window = publisher.get_window()
+    if not window:
+        return None
+    notification_id = ChatNotification.objects.filter(
+        recipient_id=recipient_id,
+        chat_room_id=chat_room_id,
+        notification_type=notification_type,
+        sender_id=_pk(sender),
+        is_read=False,
+        created_at__gte=now() - timedelta(seconds=window),
+    ).order_by('-created_at').values_list('id', flat=True).first()
+    if notification_id is None:
+        return None
+
+    label = getattr(sender, 'phone_number', None) or 'the chat'
+    ChatNotification.objects.filter(id=notification_id).update(
+        count=F('count') + 1,
+        title=title,
+        message=Concat(Cast(F('count') + 1, CharField()), Value(f' new messages from {label}')),
+        created_at=now(),
+    )
+    return notification_id
+
+
+def notify(recipient, chat_room, notification_type, title, message, sender=None):
+    """
+    Save a ChatNotification and push it once the current transaction commits.
+    recipient, chat_room, sender: model instances or ids (pass the sender
+    instance so coalesced messages can name it)
+    Returns: the id of the created or updated notification
+    """
+    recipient_id, chat_room_id = _pk(recipient), _pk(chat_room)
+    if notification_type in COALESCED_TYPES:
+        notification_id = _coalesce(recipient_id, chat_room_id, notification_type, sender, title)
+        if notification_id is not None:
+            publish_on_commit([notification_id])
+            return notification_id
+
+    notification_id = ChatNotification.objects.create(
+        recipient_id=recipient_id,
+        sender_id=_pk(sender),
+        chat_room_id=chat_room_id,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+    ).id
+    publish_on_commit([notification_id])
+    return notification_id
@@ -0,0 +1,203 @@
+"""
+Who is connected right now, driven by the WebSocket consumers.
+
+Every socket registers itself on connect, refreshes its entry on each
+heartbeat and removes it on disconnect. Entries expire PRESENCE_TTL seconds
+after the last refresh, so a process that dies without running disconnect
+handlers cannot leave users online forever.
+
+A user is online while any of their sockets (chat or notifications) is alive,
+and present in a room while one of their chat sockets for that room is.
+Whenever the default channel layer is Redis-backed, entries live in that
+Redis so every process sees the same state. Otherwise they are kept in this
+process, which is exact for a single ASGI process.
+"""
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+class LocalPresence:
+    """
+    Presence in this process: {user_id: {channel: expires}} and
+    {room_id: {channel: (user_id, expires)}}
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = {}
+        self.rooms = {}
+
+    def _user_channels(self, user_id, now):
+        channels = self.users.get(user_id, {})
+        for channel in [channel for channel, expires in channels.items() if expires <= now]:
+            del channels[channel]
+        if not channels:
+            self.users.pop(user_id, None)
+        return channels
+
+    def _room_users(self, room_id, now):
+        channels = self.rooms.get(room_id, {})
+        for channel in [channel for channel, (_, expires) in channels.items() if expires <= now]:
+            del channels[channel]
+        if not channels:
+            self.rooms.pop(room_id, None)
+        return {user_id for user_id, _ in channels.values()}
+
+    def connect(self, user_id, channel, room_id=None, ttl=None):
+        now = time.time()
+        expires = now + (ttl or settings.PRESENCE_TTL)
+        with self.lock:
+            if room_id is None:
+                was_present = bool(self._user_channels(user_id, now))
+            else:
+                was_present = user_id in self._room_users(room_id, now)
+                self.rooms.setdefault(room_id, {})[channel] = (user_id, expires)
+            self.users.setdefault(user_id, {})[channel] = expires
+        return not was_present
+
+    def disconnect(self, user_id, channel, room_id=None):
+        now = time.time()
+        with self.lock:
+            self.users.get(user_id, {}).pop(channel, None)
+            if room_id is None:
+                return not self._user_channels(user_id, now)
+            self.rooms.get(room_id, {}).pop(channel, None)
+            return user_id not in self._room_users(room_id, now)
+
+    def online_users(self, user_ids):
+        now = time.time()
+        with self.lock:
+            return [user_id for user_id in user_ids if self._user_channels(user_id, now)]
+
+    def room_users(self, room_id):
+        with self.lock:
+            return sorted(self._room_users(room_id, time.time()))
+
+
+class RedisPresence:
+    """
+    Presence in Redis sorted sets scored by expiry time:
+    presence:user:<id> holds channel names, presence:room:<id> holds "<user id>:<channel>"
+    """
+
+    def __init__(self, url):
+        import redis
+        self.redis = redis.Redis.from_url(url)
+
+    def _room_users(self, room_id, now):
+        members = self.redis.zrangebyscore(f'presence:room:{room_id}', now, '+inf')
+        return {int(member.split(b':', 1)[0]) for member in members}
+
+    def connect(self, user_id, channel, room_id=None, ttl=None):
+        ttl = ttl or settings.PRESENCE_TTL
+        now = time.time()
+        if room_id is None:
+            was_present = self.redis.zcount(f'presence:user:{user_id}', now, '+inf') > 0
+        else:
+            was_present = user_id in self._room_users(room_id, now)
+        pipe = self.redis.pipeline()
+        user_key = f'presence:user:{user_id}'
+        pipe.zadd(user_key, {channel: now + ttl})
+        pipe.zremrangebyscore(user_key, '-inf', now)
+        pipe.expire(user_key, int(ttl) + 1)
+        if room_id is not None:
+            room_key = f'presence:room:{room_id}'
+            pipe.zadd(room_key, {f'{user_id}:{channel}': now + ttl})
+            pipe.zremrangebyscore(room_key, '-inf', now)
+            pipe.expire(room_key, int(ttl) + 1)
+        pipe.execute()
+        return not was_present
+
+    def disconnect(self, user_id, channel, room_id=None):
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.zrem(f'presence:user:{user_id}', channel)
+        if room_id is not None:
+            pipe.zrem(f'presence:room:{room_id}', f'{user_id}:{channel}')
+        pipe.execute()
+        if room_id is None:
+            return self.redis.zcount(f'presence:user:{user_id}', now, '+inf') == 0
+        return user_id not in self._room_users(room_id, now)
+
+    def online_users(self, user_ids):
+        user_ids = list(user_ids)
+        now = time.time()
+        pipe = self.redis.pipeline()
+        for user_id in user_ids:
+            pipe.zcount(f'presence:user:{user_id}', now, '+inf')
+        return [user_id for user_id, count in zip(user_ids, pipe.execute()) if count]
+
+    def room_users(self, room_id):
+        return sorted(self._room_users(room_id, time.time()))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def channel_layer_redis_url():
+    """
+    Returns: the URL of the first Redis host of the default channel layer, '' when it is not Redis-backed
+    """
+    layer = settings.CHANNEL_LAYERS.get('default', {})
+    if not layer.get('BACKEND', '').startswith('channels_redis.'):
+        return ''
+    hosts = layer.get('CONFIG', {}).get('hosts') or ['redis://localhost:6379']
+    host = hosts[0]
+    if isinstance(host, dict):
+        return host.get('address', '')
+    if isinstance(host, (list, tuple)):
+        return f'redis://{host[0]}:{host[1]}'
+    return host
+
+
+def get_presence():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                url = channel_layer_redis_url()
+                _backend = RedisPresence(url) if url else LocalPresence()
+    return _backend
+
+
+def connect(user_id, channel, room_id=None):
+    """
+    Register (or refresh) a socket.
+    Returns: True when the user was not present (in the room, or at all) before
+    """
+    return get_presence().connect(user_id, channel, room_id)
+
+
+def disconnect(user_id, channel, room_id=None):
+    """
+    Returns: True when the user is no longer present (in the room, or at all)
+    """
+    return get_presence().disconnect(user_id, channel, room_id)
+
+
+def online_users(user_ids):
+    """
+    Returns: the ids among user_ids with at least one live socket
+    """
+    return get_presence().online_users(user_ids)
+
+
+def is_online(user_id):
+    return bool(online_users([user_id]))
+
+
+def room_users(room_id):
+    """
+    Returns: sorted ids of users with a live chat socket in the room
+    """
+    return get_presence().room_users(room_id)
+
+
+# Consumers run on the event loop; Redis round trips go to a worker thread
+aconnect = sync_to_async(connect, thread_sensitive=False)
+adisconnect = sync_to_async(disconnect, thread_sensitive=False)
+aroom_users = sync_to_async(room_users, thread_sensitive=False)
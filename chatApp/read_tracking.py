@@ -0,0 +1,120 @@
+"""
+Read state of chat rooms, kept as one watermark per (user, room).
+
+Marking a room read is a single upsert that only ever moves the watermark
+forward, and unread counts are range counts over the (chat_room, sequence)
+index. ChatRoom keeps a per-participant unread counter that message inserts
+increment (ChatRoomManager.record_messages) and marking read recomputes from
+the watermark. Message.is_read is no longer written; serializers derive it from the
+watermarks (see read_sequences) so the API keeps its shape.
+"""
+from django.db import connection
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+from .models import ChatRoom, Message, ReadWatermark
+
+
+def advance_watermark(user_id, chat_room_id, sequence):
+    """
+    Record that the user read every message of the room up to sequence,
+    with one INSERT ... ON CONFLICT DO UPDATE that never moves it backwards
+    """
+    table = connection.ops.quote_name(ReadWatermark._meta.db_table)
+    sql = f"""
+        INSERT INTO {table} (user_id, chat_room_id, last_read_sequence, read_at)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (user_id, chat_room_id) DO UPDATE SET
+            last_read_sequence = CASE
+                WHEN excluded.last_read_sequence > {table}.last_read_sequence
+                THEN excluded.last_read_sequence ELSE {table}.last_read_sequence END,
+            read_at = excluded.read_at
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, chat_room_id, sequence or 0, now()])
+
+
+def unread_counter_field(chat_room, user):
+    """
+    Returns: the ChatRoom unread counter of user, or None when user is not a participant
+    """
+    if user.id == chat_room.job_seeker.user_id:
+        return 'job_seeker_unread_count'
+    if user.id == chat_room.other_user_id:
+        return 'other_user_unread_count'
+    return None
+
+
+def mark_room_read(user, chat_room, sequence=None):
+    """
+    Mark the room read up to sequence, or up to its newest message, and
+    recount the user's unread counter from the resulting watermark.
+    The newest sequence is read from the database rather than chat_room,
+    which may have been loaded before messages arrived.
+    """
+    newest = ChatRoom.objects.filter(pk=chat_room.pk).values_list('last_sequence', flat=True).first() or 0
+    advance_watermark(user.id, chat_room.id, newest if sequence is None else min(sequence, newest))
+
+    field = unread_counter_field(chat_room, user)
+    if field:
+        watermark = ReadWatermark.objects.filter(
+            user=user, chat_room=OuterRef(OuterRef('pk'))
+        ).values('last_read_sequence')[:1]
+        remaining = Message.objects.filter(
+            chat_room=OuterRef('pk'), is_deleted=False, sequence__gt=Subquery(watermark)
+        ).exclude(sender=user).order_by().values('chat_room').annotate(total=Count('id')).values('total')
+        ChatRoom.objects.filter(pk=chat_room.pk).update(**{field: Coalesce(Subquery(remaining), Value(0))})
+
+
+def read_sequences(chat_room):
+    """
+    Returns: {user_id: last read sequence} for the participants of the room
+    """
+    return dict(
+        ReadWatermark.objects.filter(chat_room=chat_room)
+        .values_list('user_id', 'last_read_sequence')
+    )
+
+
+def is_read_by_recipient(message, sequences):
+    """
+    Legacy is_read: whether a participant other than the sender has read the message
+    """
+    if message.sequence is None:
+        return message.is_read
+    return any(
+        sequence >= message.sequence
+        for user_id, sequence in sequences.items() if user_id != message.sender_id
+    )
+
+
+def unread_count(user, chat_room, sequence=None):
+    """
+    Messages of other participants after the user's watermark, counted from
+    the messages rather than the room's counters
+    sequence: the user's watermark when already known
+    """
+    if sequence is None:
+        sequence = (
+            ReadWatermark.objects.filter(user=user, chat_room=chat_room)
+            .values_list('last_read_sequence', flat=True).first()
+        ) or 0
+    return Message.objects.filter(
+        chat_room=chat_room, sequence__gt=sequence, is_deleted=False
+    ).exclude(sender=user).count()
+
+
+def unread_messages(user, chat_rooms):
+    """
+    Messages of other participants after the user's watermark, across chat_rooms
+    Returns: Message queryset
+    """
+    watermark = ReadWatermark.objects.filter(
+        user=user, chat_room=OuterRef('chat_room')
+    ).values('last_read_sequence')[:1]
+    return Message.objects.filter(
+        chat_room__in=chat_rooms, is_deleted=False
+    ).exclude(sender=user).filter(
+        sequence__gt=Coalesce(Subquery(watermark), Value(0))
+    )
+
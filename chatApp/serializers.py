@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from django.utils.timezone import now
 from .models import ChatRoom, Message, MessageReadStatus, ChatNotification
+from .read_tracking import is_read_by_recipient, unread_count, unread_counter_field
 from userApp.models import CustomUser
 from job_seeker.models import JobSeeker
 from jobApplication_App.models import Application
@@ -42,17 +43,25 @@ class ApplicationBasicSerializer(serializers.ModelSerializer):
 
 class MessageSerializer(serializers.ModelSerializer):
     sender = UserBasicSerializer(read_only=True)
+    is_read = serializers.SerializerMethodField()
     is_own_message = serializers.SerializerMethodField()
     formatted_time = serializers.SerializerMethodField()
     
     class Meta:
         model = Message
         fields = [
-            'id', 'sender', 'message_type', 'content', 'attachment',
+            'id', 'sequence', 'sender', 'message_type', 'content', 'attachment',
             'is_read', 'created_at', 'updated_at', 'is_own_message',
             'formatted_time'
         ]
-        read_only_fields = ['id', 'sender', 'created_at', 'updated_at', 'is_read']
+        read_only_fields = ['id', 'sequence', 'sender', 'created_at', 'updated_at', 'is_read']
+    
+    def get_is_read(self, obj):
+        # read_sequences: {user_id: last read sequence} of the room, from read_tracking.read_sequences
+        sequences = self.context.get('read_sequences')
+        if sequences is None:
+            return obj.is_read
+        return is_read_by_recipient(obj, sequences)
     
     def get_is_own_message(self, obj):
         request = self.context.get('request')
@@ -76,16 +85,13 @@ class MessageCreateSerializer(serializers.ModelSerializer):
             
         sender = self.context['request'].user
         
+        # Message.save() numbers the message and touches the chat room's updated_at
         message = Message.objects.create(
             chat_room=chat_room,
             sender=sender,
             **validated_data
         )
         
-        # Update chat room's updated_at timestamp
-        chat_room.updated_at = now()
-        chat_room.save(update_fields=['updated_at'])
-        
         return message
 
 
@@ -107,23 +113,24 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         ]
     
     def get_last_message(self, obj):
-        last_message = obj.messages.filter(is_deleted=False).last()
-        if last_message:
+        # Snapshot maintained by ChatRoomManager.record_messages
+        if obj.last_message_id:
             return {
-                'content': last_message.content[:50] + '...' if len(last_message.content) > 50 else last_message.content,
-                'sender': last_message.sender.phone_number,
-                'created_at': last_message.created_at,
-                'message_type': last_message.message_type
+                'id': obj.last_message_id,
+                'content': obj.last_message_preview,
+                'sender': obj.last_message_sender.phone_number if obj.last_message_sender else None,
+                'created_at': obj.last_message_at,
+                'message_type': obj.last_message_type
             }
         return None
     
     def get_unread_count(self, obj):
         request = self.context.get('request')
         if request and request.user:
-            return obj.messages.filter(
-                is_deleted=False,
-                is_read=False
-            ).exclude(sender=request.user).count()
+            field = unread_counter_field(obj, request.user)
+            if field:
+                return getattr(obj, field)
+            return unread_count(request.user, obj)
         return 0
     
     def get_other_participant(self, obj):
@@ -142,7 +149,7 @@ class ChatNotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChatNotification
         fields = [
-            'id', 'sender', 'notification_type', 'title', 'message',
+            'id', 'sender', 'notification_type', 'title', 'message', 'count',
             'is_read', 'created_at', 'application_info'
         ]
     
@@ -1,117 +1,175 @@
 # chatApp/signals.py
+from django.db import transaction
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
 from jobApplication_App.models import Application
+from jobApplication_App.outbox import application_events
+from .message_writer import build_message, persist_messages
 from .models import ChatRoom, ChatNotification
-from .utils import create_system_message
+from .notifications import create_notifications
+from .serializers import MessageSerializer
+from .utils import get_system_user
 
 
-@receiver(post_save, sender=Application)
-def handle_application_status_change(sender, instance, created, **kwargs):
+def _system_messages_and_notifications(application, chat_room, event, room_created, system_user):
     """
-    Handle application status changes and create notifications
+    The system messages and notifications of one application event
+    Returns: (unsaved Message instances, unsaved ChatNotification instances)
     """
-    if not created:
-        # Get or create chat room for this application
-        if instance.job_seeker:
-            chat_room, room_created = ChatRoom.get_or_create_chat_room(
-                job_seeker=instance.job_seeker,
-                other_user=instance.job_offer.created_by,
-                application=instance,
-                chat_type='application'
-            )
-            
-            if room_created:
-                # Create system message for new chat room
-                system_message = f"Chat room created for application to {instance.job_offer.title}"
-                create_system_message(chat_room, system_message)
-            
-            # Create notification about status change
-            status_display = dict(Application.STATUS_CHOICES).get(instance.status, instance.status)
-            
-            # Notify job seeker
-            ChatNotification.objects.create(
-                recipient=instance.job_seeker.user,
-                sender=instance.job_offer.created_by,
-                chat_room=chat_room,
-                notification_type='application_discussion',
-                title=f'Application status updated',
-                message=f'Your application for {instance.job_offer.title} has been {status_display}'
-            )
-            
-            # Create system message about status change
-            status_message = f"Application status changed to: {status_display}"
-            create_system_message(chat_room, status_message)
-
-
-@receiver(post_save, sender=Application)
-def create_chat_room_on_application(sender, instance, created, **kwargs):
-    """
-    Automatically create a chat room when an application is created
-    """
-    if created and instance.job_seeker:
-        chat_room, room_created = ChatRoom.get_or_create_chat_room(
-            job_seeker=instance.job_seeker,
-            other_user=instance.job_offer.created_by,
-            application=instance,
-            chat_type='application'
-        )
-        
+    job_offer = application.job_offer
+    job_seeker = application.job_seeker
+    messages = []
+    notifications = []
+    
+    if event.event_type == 'created':
         if room_created:
-            # Create system message
-            system_message = f"Application submitted for {instance.job_offer.title}. You can now communicate about this application."
-            create_system_message(chat_room, system_message)
-            
-            # Create notifications for both parties
-            ChatNotification.objects.create(
-                recipient=instance.job_seeker.user,
-                sender=instance.job_offer.created_by,
+            messages.append(build_message(
+                chat_room.id, system_user,
+                f"Application submitted for {job_offer.title}. You can now communicate about this application.",
+                'system'
+            ))
+            notifications.append(ChatNotification(
+                recipient_id=job_seeker.user_id,
+                sender_id=job_offer.created_by_id,
                 chat_room=chat_room,
                 notification_type='application_discussion',
                 title=f'Chat available for your application',
-                message=f'You can now chat about your application to {instance.job_offer.title}'
-            )
-            
-            ChatNotification.objects.create(
-                recipient=instance.job_offer.created_by,
-                sender=instance.job_seeker.user,
+                message=f'You can now chat about your application to {job_offer.title}'
+            ))
+            notifications.append(ChatNotification(
+                recipient_id=job_offer.created_by_id,
+                sender_id=job_seeker.user_id,
                 chat_room=chat_room,
                 notification_type='application_discussion',
                 title=f'New application with chat',
-                message=f'{instance.job_seeker.first_name} {instance.job_seeker.last_name} applied for {instance.job_offer.title}'
-            )
+                message=f'{job_seeker.first_name} {job_seeker.last_name} applied for {job_offer.title}'
+            ))
+    
+    elif event.event_type == 'status_changed':
+        if room_created:
+            messages.append(build_message(
+                chat_room.id, system_user,
+                f"Chat room created for application to {job_offer.title}", 'system'
+            ))
+        
+        new_status = event.payload.get('status', application.status)
+        status_display = dict(Application.STATUS_CHOICES).get(new_status, new_status)
+        notifications.append(ChatNotification(
+            recipient_id=job_seeker.user_id,
+            sender_id=job_offer.created_by_id,
+            chat_room=chat_room,
+            notification_type='application_discussion',
+            title=f'Application status updated',
+            message=f'Your application for {job_offer.title} has been {status_display}'
+        ))
+        messages.append(build_message(
+            chat_room.id, system_user, f"Application status changed to: {status_display}", 'system'
+        ))
+    
+    return messages, notifications
 
 
-@receiver(post_save, sender=ChatNotification)
-def send_realtime_notification(sender, instance, created, **kwargs):
+@receiver(application_events, sender=Application)
+def handle_application_events(sender, events, **kwargs):
     """
-    Send real-time notification via WebSocket when a new notification is created
+    Chat rooms, system messages and notifications for a batch of application
+    events (see jobApplication_App/outbox.py), with a fixed number of queries
+    per batch. Runs inside the worker's transaction, so the rooms, messages and
+    notifications commit with the events; pushes go out on commit.
     """
-    if created:
+    applications = Application.objects.select_related('job_offer__created_by', 'job_seeker__user').in_bulk(
+        {event.application_id for event in events}
+    )
+    applications = {
+        application_id: application for application_id, application in applications.items()
+        if application.job_seeker_id
+    }
+    if not applications:
+        return
+    
+    rooms = {}
+    for chat_room in ChatRoom.objects.filter(application_id__in=applications).order_by('id'):
+        application = applications[chat_room.application_id]
+        if (chat_room.job_seeker_id == application.job_seeker_id
+                and chat_room.other_user_id == application.job_offer.created_by_id):
+            rooms.setdefault(chat_room.application_id, chat_room)
+    
+    new_rooms = [
+        ChatRoom(
+            job_seeker=application.job_seeker,
+            other_user=application.job_offer.created_by,
+            application=application,
+            chat_type='application',
+            is_active=True,
+        )
+        for application_id, application in applications.items() if application_id not in rooms
+    ]
+    ChatRoom.objects.bulk_create(new_rooms)
+    rooms.update({chat_room.application_id: chat_room for chat_room in new_rooms})
+    
+    # The first event of an application whose room was just created announces it
+    announce = {chat_room.application_id for chat_room in new_rooms}
+    system_user = get_system_user()
+    messages = []
+    notifications = []
+    for event in events:
+        application = applications.get(event.application_id)
+        if application is None:
+            continue
+        event_messages, event_notifications = _system_messages_and_notifications(
+            application, rooms[application.id], event, application.id in announce, system_user
+        )
+        messages.extend(event_messages)
+        notifications.extend(event_notifications)
+        announce.discard(application.id)
+    
+    if messages:
+        persist_messages(messages)
+    if notifications:
+        create_notifications(notifications)
+    payloads = [
+        (message.chat_room_id, data)
+        for message, data in zip(messages, MessageSerializer(messages, many=True).data)
+    ]
+    
+    def publish():
         channel_layer = get_channel_layer()
-        
-        # Send to user's notification channel
+        for chat_room in new_rooms:
+            publish_chat_room_created(chat_room, channel_layer)
+        for chat_room_id, data in payloads:
+            async_to_sync(channel_layer.group_send)(
+                f"chat_{chat_room_id}",
+                {'type': 'chat_message', 'message': data}
+            )
+    
+    transaction.on_commit(publish)
+
+
+def publish_chat_room_created(chat_room, channel_layer=None):
+    """
+    Tell both participants of a new chat room about it
+    """
+    channel_layer = channel_layer or get_channel_layer()
+    for participant in chat_room.get_participants():
+        other_participant = chat_room.get_other_participant(participant)
         async_to_sync(channel_layer.group_send)(
-            f"user_{instance.recipient.id}",
+            f"user_{participant.id}",
             {
-                'type': 'notification_message',
-                'notification': {
-                    'id': instance.id,
-                    'title': instance.title,
-                    'message': instance.message,
-                    'notification_type': instance.notification_type,
-                    'created_at': instance.created_at.isoformat(),
-                    'chat_room_id': instance.chat_room.id,
-                    'application_id': instance.chat_room.application.id if instance.chat_room.application else None,
-                    'job_offer_title': instance.chat_room.application.job_offer.title if instance.chat_room.application else None,
-                    'sender': {
-                        'id': instance.sender.id,
-                        'phone_number': instance.sender.phone_number,
-                        'role': instance.sender.role
-                    } if instance.sender else None
+                'type': 'chat_room_created',
+                'chat_room': {
+                    'id': chat_room.id,
+                    'title': chat_room.get_display_title(),
+                    'chat_type': chat_room.chat_type,
+                    'application_id': chat_room.application_id,
+                    'created_at': chat_room.created_at.isoformat(),
+                    'other_participant': {
+                        'id': other_participant.id,
+                        'phone_number': other_participant.phone_number,
+                        'role': other_participant.role
+                    }
                 }
             }
         )
@@ -123,26 +181,4 @@ def send_chat_room_created_notification(sender, instance, created, **kwargs):
     Send notification when a new chat room is created
     """
     if created:
-        channel_layer = get_channel_layer()
-        
-        # Notify both participants
-        participants = instance.get_participants()
-        for participant in participants:
-            async_to_sync(channel_layer.group_send)(
-                f"user_{participant.id}",
-                {
-                    'type': 'chat_room_created',
-                    'chat_room': {
-                        'id': instance.id,
-                        'title': instance.get_display_title(),
-                        'chat_type': instance.chat_type,
-                        'application_id': instance.application.id if instance.application else None,
-                        'created_at': instance.created_at.isoformat(),
-                        'other_participant': {
-                            'id': instance.get_other_participant(participant).id,
-                            'phone_number': instance.get_other_participant(participant).phone_number,
-                            'role': instance.get_other_participant(participant).role
-                        }
-                    }
-                }
-            )
\ No newline at end of file
+        publish_chat_room_created(instance)
@@ -0,0 +1,55 @@
+"""
+Throwaway environment for the WebSocket simulation commands
+(simulate_slow_consumers, load_test_websockets).
+
+Everything runs in one process against a freshly created test database and
+an in-memory channel layer, so the commands need no Redis and leave the
+configured database untouched.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import override_settings
+
+
+@contextmanager
+def simulation_environment(**overrides):
+    """
+    Create a test database and switch channels and presence to in-memory
+    backends for the duration of the block; overrides are extra settings
+    """
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(
+            CHANNEL_LAYERS={'default': {
+                'BACKEND': 'channels.layers.InMemoryChannelLayer',
+                'CONFIG': {'capacity': 1000},
+            }},
+            CHANNEL_REDIS_URL='',
+            **overrides
+        ):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def create_chat_room(index=0):
+    """
+    An employer, a job seeker and an active chat room between them.
+    Passwords are left unusable: clients authenticate with access tokens and
+    hashing would dominate the setup time.
+    Returns: (chat room, employer user, job seeker user)
+    """
+    from job_seeker.models import JobSeeker
+    from userApp.models import CustomUser
+    from .models import ChatRoom
+
+    employer = CustomUser.objects.create_user(phone_number=f'07{2 * index + 1:08d}', role='job_offer')
+    job_seeker = CustomUser.objects.create_user(phone_number=f'07{2 * index + 2:08d}', role='job_seeker')
+    profile, _ = JobSeeker.objects.get_or_create(
+        user=job_seeker, defaults={'first_name': 'Load', 'last_name': f'Test {index}'}
+    )
+    chat_room = ChatRoom.objects.create(
+        job_seeker=profile, other_user=employer, chat_type='general', title=f'Simulation room {index}'
+    )
+    return chat_room, employer, job_seeker
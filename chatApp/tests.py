@@ -1,3 +1,344 @@
-from django.test import TestCase
+import asyncio
+from unittest import mock
 
-# Create your tests here.
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend.send_queue import OVERFLOW_CLOSE_CODE, OutboundQueue, send_queue_stats
+from mailApp.models import OutgoingEmail
+from userApp.models import CustomUser
+from . import presence
+from .consumers import NotificationConsumer
+from .models import ChatNotification, ChatRoom, Message, ReadWatermark
+from .notifications import notify, publisher
+from .read_tracking import mark_room_read
+from .signals import publish_chat_room_created
+from .utils import send_email_notification
+from .simulation import create_chat_room
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, CHAT_NOTIFICATION_WINDOW=60)
+class NotifyTests(TestCase):
+    def setUp(self):
+        self.chat_room, self.employer, self.job_seeker = create_chat_room()
+        publisher.flush()
+
+    def tearDown(self):
+        publisher.flush()
+
+    def send(self, title='New message'):
+        return notify(
+            recipient=self.job_seeker,
+            sender=self.employer,
+            chat_room=self.chat_room,
+            notification_type='new_message',
+            title=title,
+            message=f'{self.employer.phone_number} sent you a message',
+        )
+
+    def test_saved_before_the_window_flushes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send()
+        notification = ChatNotification.objects.get(recipient=self.job_seeker)
+        self.assertEqual(notification.count, 1)
+        self.assertEqual(list(publisher.pending), [notification.id])
+
+    def test_burst_of_messages_is_coalesced(self):
+        first = self.send()
+        self.send()
+        third = self.send(title='Latest')
+
+        self.assertEqual(first, third)
+        notification = ChatNotification.objects.get(recipient=self.job_seeker)
+        self.assertEqual(notification.count, 3)
+        self.assertEqual(notification.title, 'Latest')
+        self.assertEqual(notification.message, f'3 new messages from {self.employer.phone_number}')
+
+    def test_read_notification_is_not_reused(self):
+        first = self.send()
+        ChatNotification.objects.filter(id=first).update(is_read=True)
+        self.assertNotEqual(self.send(), first)
+
+    def test_other_types_are_not_coalesced(self):
+        for _ in range(2):
+            notify(self.job_seeker, self.chat_room, 'new_chat_room', 'Room', 'Created', sender=self.employer)
+        self.assertEqual(ChatNotification.objects.filter(notification_type='new_chat_room').count(), 2)
+
+    def test_one_push_per_recipient(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send()
+            notify(self.job_seeker, self.chat_room, 'new_chat_room', 'Room', 'Created', sender=self.employer)
+            notify(self.employer, self.chat_room, 'new_chat_room', 'Room', 'Created', sender=self.job_seeker)
+
+        with mock.patch('chatApp.notifications.get_channel_layer') as get_layer:
+            get_layer.return_value.group_send = mock.AsyncMock()
+            self.assertEqual(publisher.flush(), 2)
+
+        groups = {call.args[0]: call.args[1] for call in get_layer.return_value.group_send.call_args_list}
+        self.assertEqual(set(groups), {f'user_{self.job_seeker.id}', f'user_{self.employer.id}'})
+        self.assertEqual(len(groups[f'user_{self.job_seeker.id}']['notifications']), 2)
+
+    def test_push_waits_for_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.send()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(list(publisher.pending), [])
+
+    def test_messages_are_not_emailed(self):
+        self.job_seeker.email = 'seeker@example.com'
+        self.job_seeker.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send()
+        publisher.flush()
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+
+class SendEmailNotificationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(phone_number='0780000900', role='job_seeker')
+
+    def send(self):
+        return send_email_notification(
+            'seeker@example.com', 'Status update', 'emails/application_reviewing.txt',
+            {'job_title': 'Backend developer', 'feedback': ''}, recipient_id=self.user.id,
+        )
+
+    def test_offline_recipient_is_emailed(self):
+        self.assertTrue(self.send())
+        self.assertEqual(OutgoingEmail.objects.get().to, ['seeker@example.com'])
+
+    def test_online_recipient_is_skipped(self):
+        presence.connect(self.user.id, 'test-channel')
+        try:
+            self.assertFalse(self.send())
+        finally:
+            presence.disconnect(self.user.id, 'test-channel')
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+
+class PresenceBackendTests(TestCase):
+    def test_redis_url_follows_the_channel_layer(self):
+        redis_layer = {'BACKEND': 'channels_redis.core.RedisChannelLayer'}
+        for hosts, url in (
+            (['redis://cache:6379/1'], 'redis://cache:6379/1'),
+            ([('cache', 6380)], 'redis://cache:6380'),
+            ([{'address': 'redis://cache:6381'}], 'redis://cache:6381'),
+        ):
+            with override_settings(CHANNEL_LAYERS={'default': dict(redis_layer, CONFIG={'hosts': hosts})}):
+                self.assertEqual(presence.channel_layer_redis_url(), url)
+        with override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS):
+            self.assertEqual(presence.channel_layer_redis_url(), '')
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class ReadStateTests(TestCase):
+    def setUp(self):
+        self.chat_room, self.employer, self.job_seeker = create_chat_room()
+        for number in range(3):
+            Message.objects.create(chat_room=self.chat_room, sender=self.employer, content=f'Message {number}')
+        self.client = APIClient()
+        self.client.force_authenticate(self.job_seeker)
+
+    def tearDown(self):
+        publisher.flush()
+
+    def watermark(self):
+        return ReadWatermark.objects.filter(user=self.job_seeker, chat_room=self.chat_room).values_list(
+            'last_read_sequence', flat=True
+        ).first()
+
+    def mark_read(self, **data):
+        return self.client.post(reverse('mark-chat-room-read', args=[self.chat_room.id]), data, format='json')
+
+    def unread(self):
+        return ChatRoom.objects.values_list('job_seeker_unread_count', flat=True).get(id=self.chat_room.id)
+
+    def test_listing_does_not_mark_read(self):
+        response = self.client.get(reverse('message-list', args=[self.chat_room.id]))
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(self.watermark())
+        self.assertEqual(self.unread(), 3)
+
+    def test_mark_read_up_to_the_displayed_message(self):
+        self.assertEqual(self.mark_read(sequence=2).status_code, 200)
+        self.assertEqual(self.watermark(), 2)
+        self.assertEqual(self.unread(), 1)
+
+        self.mark_read(sequence=100)
+        self.assertEqual(self.watermark(), 3)
+        self.assertEqual(self.unread(), 0)
+
+    def test_newest_sequence_is_read_from_the_database(self):
+        stale_room = ChatRoom.objects.get(id=self.chat_room.id)
+        Message.objects.create(chat_room=self.chat_room, sender=self.employer, content='Late message')
+        mark_room_read(self.job_seeker, stale_room)
+        self.assertEqual(self.watermark(), 4)
+
+    def test_invalid_sequence(self):
+        for sequence in ('abc', -1):
+            with self.subTest(sequence=sequence):
+                self.assertEqual(self.mark_read(sequence=sequence).status_code, 400)
+        self.assertIsNone(self.watermark())
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class NotificationConsumerTests(TestCase):
+    def setUp(self):
+        self.chat_room, self.employer, self.job_seeker = create_chat_room()
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), '/ws/notifications/')
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_chat_room_created_is_delivered(self):
+        communicator = await self.connect(self.job_seeker)
+        try:
+            await get_channel_layer().group_send(f'user_{self.job_seeker.id}', {
+                'type': 'chat_room_created', 'chat_room': {'id': self.chat_room.id},
+            })
+            frame = await communicator.receive_json_from()
+            self.assertEqual(frame, {'type': 'chat_room_created', 'chat_room': {'id': self.chat_room.id}})
+
+            # The socket survives the event and keeps serving the client
+            await communicator.send_json_to({'type': 'heartbeat'})
+            self.assertEqual(await communicator.receive_json_from(), {'type': 'heartbeat'})
+        finally:
+            await communicator.disconnect()
+
+    async def test_publisher_reaches_both_participants(self):
+        seeker = await self.connect(self.job_seeker)
+        employer = await self.connect(self.employer)
+        try:
+            chat_room = await ChatRoom.objects.select_related('job_seeker__user', 'other_user').aget(id=self.chat_room.id)
+            await database_sync_to_async(publish_chat_room_created)(chat_room)
+            for communicator in (seeker, employer):
+                frame = await communicator.receive_json_from()
+                self.assertEqual(frame['type'], 'chat_room_created')
+                self.assertEqual(frame['chat_room']['id'], self.chat_room.id)
+        finally:
+            await seeker.disconnect()
+            await employer.disconnect()
+
+
+class OutboundQueueTests(SimpleTestCase):
+    """
+    The sends below return at once, as daphne's do: writes are buffered by the
+    server, so only the client's frames_received count shows a backlog.
+    """
+
+    def make_queue(self, policies=None):
+        self.written, self.closed = [], []
+
+        async def send(text):
+            self.written.append(text)
+
+        async def close(code):
+            self.closed.append(code)
+
+        return OutboundQueue(send, close, policies or {}, size=2)
+
+    async def settle(self):
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def test_buffered_sends_never_fill_the_queue_without_confirmations(self):
+        queue = self.make_queue()
+        for number in range(10):
+            self.assertTrue(await queue.put({'type': 'chat_message', 'number': number}))
+            await self.settle()
+        self.assertEqual(len(self.written), 10)
+        self.assertEqual(self.closed, [])
+        queue.stop()
+
+    async def test_unconfirmed_frames_hold_the_queue(self):
+        queue = self.make_queue()
+        self.assertTrue(queue.confirm(0))
+        for number in range(4):
+            self.assertTrue(await queue.put({'type': 'chat_message', 'number': number}))
+            await self.settle()
+        # Two on the wire unconfirmed, two waiting
+        self.assertEqual(len(self.written), 2)
+        self.assertEqual(len(queue.frames), 2)
+
+        self.assertTrue(queue.confirm(1))
+        await self.settle()
+        self.assertEqual(len(self.written), 3)
+
+        self.assertTrue(await queue.put({'type': 'chat_message', 'number': 4}))
+        self.assertFalse(await queue.put({'type': 'chat_message', 'number': 5}))
+        self.assertEqual(self.closed, [OVERFLOW_CLOSE_CODE])
+
+    async def test_invalid_confirmations_are_ignored(self):
+        queue = self.make_queue()
+        await queue.put({'type': 'chat_message'})
+        await self.settle()
+        for count in ('x', None, 2, -1):
+            with self.subTest(count=count):
+                self.assertFalse(queue.confirm(count))
+        self.assertTrue(queue.confirm(1))
+        self.assertFalse(queue.confirm(0))
+        self.assertEqual(queue.unconfirmed(), 0)
+        queue.stop()
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, WEBSOCKET_SEND_QUEUE_SIZE=2)
+class ConsumerBackpressureTests(TestCase):
+    """
+    WebsocketCommunicator buffers the consumer's sends like daphne does
+    """
+
+    def setUp(self):
+        self.chat_room, self.employer, self.job_seeker = create_chat_room()
+        send_queue_stats.reset()
+
+    async def notify(self, count):
+        for number in range(count):
+            await get_channel_layer().group_send(f'user_{self.job_seeker.id}', {
+                'type': 'notification_message', 'number': number,
+            })
+
+    async def test_confirming_client_is_paced_and_loses_droppable_frames(self):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), '/ws/notifications/')
+        communicator.scope['user'] = self.job_seeker
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        try:
+            await communicator.send_json_to({'type': 'heartbeat'})
+            self.assertEqual(await communicator.receive_json_from(), {'type': 'heartbeat'})
+            await communicator.send_json_to({'type': 'frames_received', 'count': 1})
+
+            await self.notify(10)
+            numbers = [(await communicator.receive_json_from())['number'] for _ in range(2)]
+            self.assertTrue(await communicator.receive_nothing())
+            self.assertEqual(numbers, [0, 1])
+
+            await communicator.send_json_to({'type': 'frames_received', 'count': 3})
+            numbers = [(await communicator.receive_json_from())['number'] for _ in range(2)]
+            self.assertTrue(await communicator.receive_nothing())
+            self.assertEqual(numbers, [2, 3])
+            self.assertEqual(send_queue_stats.snapshot()['frames_dropped'], {'notification_message': 6})
+        finally:
+            await communicator.disconnect()
+
+    async def test_client_without_confirmations_gets_every_frame(self):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), '/ws/notifications/')
+        communicator.scope['user'] = self.job_seeker
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        try:
+            await self.notify(10)
+            numbers = [(await communicator.receive_json_from())['number'] for _ in range(10)]
+            self.assertEqual(numbers, list(range(10)))
+            self.assertEqual(send_queue_stats.snapshot()['frames_dropped'], {})
+        finally:
+            await communicator.disconnect()
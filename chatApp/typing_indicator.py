@@ -0,0 +1,62 @@
+"""
+Server-side typing state for one chat socket.
+
+Clients send a typing frame on every keystroke, but the room only needs the
+start and stop edges. TypingIndicator publishes "started" once, turns further
+typing frames into timer resets, delays "stopped" by STOP_DELAY so a pause
+between words does not flap, and stops on its own TIMEOUT seconds after the
+last keystroke in case the client never says so.
+"""
+import asyncio
+
+
+TIMEOUT = 5.0
+STOP_DELAY = 1.0
+
+
+class TypingIndicator:
+    """
+    publish: coroutine function taking is_typing, called on edges only
+    """
+
+    def __init__(self, publish, timeout=TIMEOUT, stop_delay=STOP_DELAY):
+        self.publish = publish
+        self.timeout = timeout
+        self.stop_delay = stop_delay
+        self.typing = False
+        self.timer = None
+        self.frames = 0
+        self.edges = 0
+
+    def _arm(self, delay):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = asyncio.get_running_loop().call_later(
+            delay, lambda: asyncio.ensure_future(self.stop())
+        )
+
+    async def update(self, is_typing):
+        """
+        Handle a typing frame from the client
+        """
+        self.frames += 1
+        if is_typing:
+            self._arm(self.timeout)
+            if not self.typing:
+                self.typing = True
+                self.edges += 1
+                await self.publish(True)
+        elif self.typing:
+            self._arm(self.stop_delay)
+
+    async def stop(self):
+        """
+        Publish the stop edge now, e.g. when the user sends the message or leaves
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.typing:
+            self.typing = False
+            self.edges += 1
+            await self.publish(False)
@@ -26,4 +26,5 @@ urlpatterns = [
     
     
     path('ice-servers/', views.get_stream_token, name='stream-token'),
+    path('presence/', views.get_presence, name='chat-presence'),
 ]
\ No newline at end of file
@@ -1,14 +1,18 @@
 # chatApp/utils.py
+import logging
+
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
-from django.core.mail import send_mail
-from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
 from .models import ChatNotification
+from .notifications import notify
+from mailApp.mail_queue import enqueue_email
 from userApp.models import CustomUser
 
+logger = logging.getLogger(__name__)
+
 
 def send_notification_to_user(user_id, notification_data):
     """
@@ -24,44 +28,57 @@ def send_notification_to_user(user_id, notification_data):
     )
 
 
-def send_email_notification(recipient_email, subject, template_name, context):
+def send_email_notification(recipient_email, subject, template_name, context, recipient_id=None):
     """
-    Send email notification
+    Queue an email notification (sent by the send_queued_emails worker).
+    An .html template is also attached as the HTML alternative.
+    recipient_id: when given, nothing is sent while that user is online,
+    since they already got the notification over their WebSocket
+    Returns: True when an email was queued
     """
+    if recipient_id is not None:
+        from .presence import is_online
+        if is_online(recipient_id):
+            return False
     try:
-        html_message = render_to_string(template_name, context)
-        plain_message = strip_tags(html_message)
-        
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        body = render_to_string(template_name, context)
+        html_body = body if template_name.endswith('.html') else ''
+        enqueue_email(subject, strip_tags(body) if html_body else body, recipient_email, html_body=html_body)
         return True
-    except Exception as e:
-        print(f"Error sending email: {e}")
+    except Exception:
+        logger.exception("Error queueing email")
         return False
 
 
+_system_user = None
+
+
+def get_system_user():
+    """
+    The sender of system messages, created on first use and kept for the
+    lifetime of the process once it is known to be committed
+    """
+    global _system_user
+    if _system_user is None:
+        system_user = CustomUser.objects.filter(phone_number='system').first()
+        if system_user is None:
+            # Not kept yet: the surrounding transaction (an outbox batch) may roll back
+            return CustomUser.objects.create_user(
+                phone_number='system',
+                role='admin',
+                email='system@jobportal.com'
+            )
+        _system_user = system_user
+    return _system_user
+
+
 def create_system_message(chat_room, content):
     """
     Create a system message in a chat room
     """
     from .models import Message
     
-    # Get or create a system user
-    try:
-        system_user = CustomUser.objects.get(phone_number='system')
-    except CustomUser.DoesNotExist:
-        # Create system user if it doesn't exist
-        system_user = CustomUser.objects.create_user(
-            phone_number='system',
-            role='admin',
-            email='system@jobportal.com'
-        )
+    system_user = get_system_user()
     
     message = Message.objects.create(
         chat_room=chat_room,
@@ -97,6 +114,7 @@ def get_user_chat_stats(user):
     Get chat statistics for a user
     """
     from .models import ChatRoom, Message
+    from .read_tracking import unread_messages
     from job_seeker.models import JobSeeker
     
     stats = {
@@ -123,11 +141,7 @@ def get_user_chat_stats(user):
             sender=user,
             is_deleted=False
         ).count()
-        stats['unread_messages'] = Message.objects.filter(
-            chat_room__in=chat_rooms,
-            is_deleted=False,
-            is_read=False
-        ).exclude(sender=user).count()
+        stats['unread_messages'] = unread_messages(user, chat_rooms).count()
         stats['unread_notifications'] = ChatNotification.objects.filter(
             recipient=user,
             is_read=False
@@ -176,12 +190,10 @@ def format_chat_room_name(chat_room):
 
 def get_online_users(chat_room_id):
     """
-    Get list of online users in a chat room
-    This would require implementing user presence tracking
+    Get list of ids of users with the chat room open (see chatApp/presence.py)
     """
-    # This is a placeholder - you'd need to implement Redis-based presence tracking
-    # or use Django Channels' group management features
-    return []
+    from .presence import room_users
+    return room_users(chat_room_id)
 
 
 def create_chat_room_for_application(job_seeker, other_user, application):
@@ -203,7 +215,7 @@ def create_chat_room_for_application(job_seeker, other_user, application):
         create_system_message(chat_room, system_message)
         
         # Create notifications
-        ChatNotification.objects.create(
+        notify(
             recipient=job_seeker.user,
             sender=other_user,
             chat_room=chat_room,
@@ -212,7 +224,7 @@ def create_chat_room_for_application(job_seeker, other_user, application):
             message=f'Discussion started for your application to {application.job_offer.title}'
         )
         
-        ChatNotification.objects.create(
+        notify(
             recipient=other_user,
             sender=job_seeker.user,
             chat_room=chat_room,
@@ -245,7 +257,7 @@ def create_general_chat_room(job_seeker, other_user, chat_type='general', title=
         create_system_message(chat_room, system_message)
         
         # Create notifications
-        ChatNotification.objects.create(
+        notify(
             recipient=job_seeker.user,
             sender=other_user,
             chat_room=chat_room,
@@ -12,6 +12,10 @@ import jwt
 import datetime
 
 from .models import ChatRoom, Message, ChatNotification
+from . import presence
+from .notifications import notify
+from .history import message_page
+from .read_tracking import mark_room_read, read_sequences, unread_messages
 from .serializers import (
     ChatRoomSerializer, MessageSerializer, MessageCreateSerializer,
     ChatNotificationSerializer, ChatRoomCreateSerializer
@@ -20,6 +24,7 @@ from jobApplication_App.models import Application
 from job_seeker.models import JobSeeker
 from userApp.models import CustomUser
 from rest_framework.exceptions import PermissionDenied
+from job_offer_app.pagination import InvalidCursor
 
 
 class ChatRoomListView(generics.ListAPIView):
@@ -34,12 +39,12 @@ class ChatRoomListView(generics.ListAPIView):
             # Get chat rooms where user is the job seeker
             try:
                 job_seeker = user.job_seeker
-                return ChatRoom.objects.filter(job_seeker=job_seeker, is_active=True)
+                return ChatRoom.objects.with_summary_relations().filter(job_seeker=job_seeker, is_active=True)
             except JobSeeker.DoesNotExist:
                 return ChatRoom.objects.none()
         else:
             # Get chat rooms where user is the other participant (admin, employee, job_offer)
-            return ChatRoom.objects.filter(other_user=user, is_active=True)
+            return ChatRoom.objects.with_summary_relations().filter(other_user=user, is_active=True)
 
 
 class ChatRoomDetailView(generics.RetrieveAPIView):
@@ -53,36 +58,49 @@ class ChatRoomDetailView(generics.RetrieveAPIView):
         if user.role == 'job_seeker':
             try:
                 job_seeker = user.job_seeker
-                return ChatRoom.objects.filter(job_seeker=job_seeker, is_active=True)
+                return ChatRoom.objects.with_summary_relations().filter(job_seeker=job_seeker, is_active=True)
             except JobSeeker.DoesNotExist:
                 return ChatRoom.objects.none()
         else:
-            return ChatRoom.objects.filter(other_user=user, is_active=True)
+            return ChatRoom.objects.with_summary_relations().filter(other_user=user, is_active=True)
 
 
 class MessageListView(generics.ListAPIView):
-    """List messages in a chat room"""
+    """
+    List messages in a chat room, one page at a time.
+    Query parameters: before, after (sequence), before_id, after_id (message id), page_size.
+    See chatApp.history.message_page.
+    Listing does not mark anything read; clients POST the sequence of the
+    newest message they displayed to mark_chat_room_read.
+    """
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_queryset(self):
-        chat_room_id = self.kwargs.get('chat_room_id')
-        chat_room = get_object_or_404(ChatRoom, id=chat_room_id)
+    def list(self, request, *args, **kwargs):
+        chat_room = get_object_or_404(
+            ChatRoom.objects.select_related('job_seeker'), id=self.kwargs.get('chat_room_id')
+        )
         
         # Check if user has access to this chat room
-        if not chat_room.can_user_access(self.request.user):
-            return Message.objects.none()
+        if not chat_room.can_user_access(request.user):
+            return Response({'results': [], 'older_cursor': None, 'newer_cursor': None})
         
-        # Mark messages as read for the current user
-        unread_messages = chat_room.messages.filter(
-            is_deleted=False,
-            is_read=False
-        ).exclude(sender=self.request.user)
-        
-        for message in unread_messages:
-            message.mark_as_read()
+        try:
+            messages, older, newer, page_size = message_page(
+                chat_room, request.query_params, Message.objects.select_related('sender')
+            )
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return chat_room.messages.filter(is_deleted=False)
+        context = self.get_serializer_context()
+        context['read_sequences'] = read_sequences(chat_room)
+        serializer = MessageSerializer(messages, many=True, context=context)
+        return Response({
+            'results': serializer.data,
+            'older_cursor': older,
+            'newer_cursor': newer,
+            'page_size': page_size,
+        })
 
 
 class MessageCreateView(generics.CreateAPIView):
@@ -123,7 +141,7 @@ class MessageCreateView(generics.CreateAPIView):
             if chat_room.application:
                 notification_title = f'New message about {chat_room.application.job_offer.title}'
             
-            ChatNotification.objects.create(
+            notify(
                 recipient=recipient,
                 sender=user,
                 chat_room=chat_room,
@@ -225,7 +243,7 @@ def create_chat_room(request, application_id=None):
     
     # Notify job seeker
     if job_seeker.user != user:
-        ChatNotification.objects.create(
+        notify(
             recipient=job_seeker.user,
             sender=user,
             chat_room=chat_room,
@@ -236,7 +254,7 @@ def create_chat_room(request, application_id=None):
     
     # Notify other user
     if actual_other_user != user:
-        ChatNotification.objects.create(
+        notify(
             recipient=actual_other_user,
             sender=user,
             chat_room=chat_room,
@@ -328,7 +346,10 @@ def mark_all_notifications_read(request):
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def mark_chat_room_read(request, chat_room_id):
-    """Mark all messages in a chat room as read"""
+    """
+    Mark the messages of a chat room as read, up to the optional sequence in
+    the body (the newest message the client displayed) or up to the newest message
+    """
     chat_room = get_object_or_404(ChatRoom, id=chat_room_id)
     
     # Check access
@@ -338,14 +359,18 @@ def mark_chat_room_read(request, chat_room_id):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Mark all unread messages as read
-    unread_messages = chat_room.messages.filter(
-        is_deleted=False,
-        is_read=False
-    ).exclude(sender=request.user)
+    sequence = request.data.get('sequence')
+    if sequence not in (None, ''):
+        try:
+            sequence = int(sequence)
+        except (TypeError, ValueError):
+            sequence = -1
+        if sequence < 0:
+            return Response({'error': 'sequence must be a non-negative integer'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        sequence = None
     
-    for message in unread_messages:
-        message.mark_as_read()
+    mark_room_read(request.user, chat_room, sequence)
     
     return Response({'status': 'success'})
 
@@ -354,7 +379,7 @@ def mark_chat_room_read(request, chat_room_id):
 @permission_classes([permissions.IsAuthenticated])
 def mark_message_read(request, message_id):
     """Mark a specific message as read"""
-    message = get_object_or_404(Message, id=message_id)
+    message = get_object_or_404(Message.objects.select_related('chat_room__job_seeker'), id=message_id)
     
     # Check access
     if not message.can_user_access(request.user):
@@ -363,7 +388,7 @@ def mark_message_read(request, message_id):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    message.mark_as_read()
+    mark_room_read(request.user, message.chat_room, message.sequence)
     return Response({'status': 'success'})
 
 
@@ -383,11 +408,7 @@ def chat_stats(request):
         chat_rooms = ChatRoom.objects.filter(other_user=user, is_active=True)
     
     total_chats = chat_rooms.count()
-    unread_messages = Message.objects.filter(
-        chat_room__in=chat_rooms,
-        is_deleted=False,
-        is_read=False
-    ).exclude(sender=user).count()
+    unread_message_count = unread_messages(user, chat_rooms).count()
     
     unread_notifications = ChatNotification.objects.filter(
         recipient=user,
@@ -396,7 +417,7 @@ def chat_stats(request):
     
     return Response({
         'total_chat_rooms': total_chats,
-        'unread_messages': unread_messages,
+        'unread_messages': unread_message_count,
         'unread_notifications': unread_notifications
     })
 
@@ -453,11 +474,11 @@ def get_user_chat_rooms(request):
     if target_user.role == 'job_seeker':
         try:
             job_seeker = target_user.job_seeker
-            chat_rooms = ChatRoom.objects.filter(job_seeker=job_seeker, is_active=True)
+            chat_rooms = ChatRoom.objects.with_summary_relations().filter(job_seeker=job_seeker, is_active=True)
         except JobSeeker.DoesNotExist:
             chat_rooms = ChatRoom.objects.none()
     else:
-        chat_rooms = ChatRoom.objects.filter(other_user=target_user, is_active=True)
+        chat_rooms = ChatRoom.objects.with_summary_relations().filter(other_user=target_user, is_active=True)
     
     serializer = ChatRoomSerializer(chat_rooms, many=True, context={'request': request})
     return Response(serializer.data)
@@ -516,7 +537,7 @@ def create_support_chat(request):
     )
     
     # Notify support staff
-    ChatNotification.objects.create(
+    notify(
         recipient=support_user,
         sender=user,
         chat_room=chat_room,
@@ -526,4 +547,31 @@ def create_support_chat(request):
     )
     
     serializer = ChatRoomSerializer(chat_room, context={'request': request})
-    return Response(serializer.data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def get_presence(request):
+    """
+    Who is online.
+    Query parameters (one of):
+    - chat_room: id of a chat room the user takes part in; users with that room open
+    - user_ids: comma-separated user ids (max 100); users with any live socket
+    """
+    chat_room_id = request.query_params.get('chat_room')
+    if chat_room_id:
+        chat_room = get_object_or_404(ChatRoom.objects.select_related('job_seeker'), id=chat_room_id)
+        if not chat_room.can_user_access(request.user):
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'chat_room': chat_room.id, 'online_users': presence.room_users(chat_room.id)})
+    
+    try:
+        user_ids = [int(value) for value in request.query_params.get('user_ids', '').split(',') if value.strip()]
+    except ValueError:
+        return Response({'error': 'user_ids must be a comma-separated list of IDs'}, status=status.HTTP_400_BAD_REQUEST)
+    if not user_ids:
+        return Response({'error': 'chat_room or user_ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(user_ids) > 100:
+        return Response({'error': 'At most 100 user_ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'online_users': presence.online_users(user_ids)})
@@ -0,0 +1,55 @@
+"""
+The employer's applicant inbox: compact application rows, newest first,
+paged by (applied_at, id) keyset, with per-status counts from one grouped
+aggregate. Rows carry job_offer_id only; views put each job offer once in
+the response envelope.
+"""
+from django.db.models import Count
+from job_offer_app.pagination import paginate_keyset
+from .models import Application
+
+
+# Columns an inbox row needs; skips the job seeker's skills and fee columns
+INBOX_FIELDS = [
+    'id', 'job_offer_id', 'status', 'feedback', 'cover_letter', 'resume', 'additional_documents',
+    'applied_at', 'updated_at', 'reviewed_by_id', 'reviewed_at',
+    'user__id', 'user__phone_number', 'user__email',
+    'job_seeker__id', 'job_seeker__first_name', 'job_seeker__middle_name', 'job_seeker__last_name',
+    'job_seeker__gender', 'job_seeker__experience', 'job_seeker__education_level',
+    'job_seeker__education_sector', 'job_seeker__district', 'job_seeker__sector', 'job_seeker__resume',
+]
+
+
+def status_counts(applications):
+    """
+    Returns: {status: number of applications} for every status, plus 'total'
+    """
+    counts = {value: 0 for value, _ in Application.STATUS_CHOICES}
+    for row in applications.order_by().values('status').annotate(total=Count('id')):
+        counts[row['status']] = row['total']
+    counts['total'] = sum(counts.values())
+    return counts
+
+
+def inbox_page(applications, params):
+    """
+    One page of the inbox.
+
+    Query parameters:
+    - status: only applications with this status ('all' or absent for every status)
+    - cursor: value of next_cursor from the previous page
+    - page_size: number of applications (default 20, max 100)
+
+    Returns: (rows, next_cursor, page_size, counts, count). counts cover
+    every status of applications; count is the number matching the status filter.
+    """
+    counts = status_counts(applications)
+    status_filter = params.get('status')
+    count = counts['total']
+    if status_filter and status_filter.lower() != 'all':
+        applications = applications.filter(status=status_filter)
+        count = counts.get(status_filter, 0)
+
+    applications = applications.select_related('user', 'job_seeker').only(*INBOX_FIELDS)
+    rows, next_cursor, page_size = paginate_keyset(applications, params, field='applied_at')
+    return rows, next_cursor, page_size, counts, count
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from jobApplication_App.outbox import DEFAULT_BATCH_SIZE, MAX_ATTEMPTS, process_batch
+
+
+class Command(BaseCommand):
+    help = 'Run the side effects (chat rooms, system messages, notifications) of application changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Events handled per transaction',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='Mark an event failed after this many failed runs',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new events instead of exiting when the outbox is empty',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls with --loop',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = process_batch(options['batch_size'], options['max_attempts'])
+            total += processed
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'Handled {total} application events'))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.17 on 2026-10-16 21:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobApplication_App', '0002_application_event'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job_offer', '-applied_at', '-id'], name='application_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job_offer', 'status'], name='application_offer_status_idx'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 # models.py
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils.timezone import now
 from userApp.models import CustomUser
@@ -25,6 +25,8 @@ class Application(models.Model):
     additional_documents = models.JSONField(default=list, blank=True)  # Store information about additional documents
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Status before the last change; written by the same UPDATE as status (see transitions.py)
+    previous_status = models.CharField(max_length=20, choices=STATUS_CHOICES, blank=True, default='')
     feedback = models.TextField(blank=True, null=True)  # For providing feedback to applicants
     
     applied_at = models.DateTimeField(default=now)
@@ -44,15 +46,82 @@ class Application(models.Model):
         ordering = ['-applied_at']
         # Ensure one application per user per job offer
         unique_together = ('user', 'job_offer')
+        indexes = [
+            # Applicant inbox pages and its per-status counts
+            models.Index(fields=['job_offer', '-applied_at', '-id'], name='application_inbox_idx'),
+            models.Index(fields=['job_offer', 'status'], name='application_offer_status_idx'),
+        ]
     
     def __str__(self):
         return f"Application for {self.job_offer.title} by {self.user.phone_number}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status as loaded, so save() can tell a status change apart
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
     def save(self, *args, **kwargs):
         # If job_seeker is not provided but user has a job_seeker profile, use it
-        if not self.job_seeker:
+        if not self.job_seeker_id:
             try:
                 self.job_seeker = self.user.job_seeker
             except JobSeeker.DoesNotExist:
                 pass
-        super().save(*args, **kwargs)
\ No newline at end of file
+        
+        # Side effects (chat room, system messages, notifications) are recorded
+        # as outbox events in the same transaction, see jobApplication_App/outbox.py
+        created = self._state.adding
+        previous_status = getattr(self, '_loaded_status', None)
+        if not created and previous_status and self.status != previous_status:
+            self.previous_status = previous_status
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'previous_status'}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if created:
+                ApplicationEvent.objects.create(application=self, event_type='created')
+            elif self.status != previous_status:
+                ApplicationEvent.objects.create(
+                    application=self,
+                    event_type='status_changed',
+                    payload={'status': self.status, 'previous_status': previous_status},
+                )
+        self._loaded_status = self.status
+
+
+class ApplicationEvent(models.Model):
+    """
+    Outbox row for the side effects of an application change. Written in the
+    same transaction as the change and handled in batches by the
+    process_application_events management command.
+    """
+    EVENT_TYPES = [
+        ('created', 'Created'),
+        ('status_changed', 'Status changed'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='events')
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    payload = models.JSONField(default=dict, blank=True)
+    # 'failed' once attempts reached the worker's limit; retried while 'pending'
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.event_type} event for application {self.application_id} ({self.status})"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='applicationevent_status_idx'),
+        ]
\ No newline at end of file
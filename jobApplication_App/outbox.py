@@ -0,0 +1,99 @@
+"""
+Transactional outbox for the side effects of applications.
+
+Application.save() records an ApplicationEvent in the same transaction as the
+change, so an event exists exactly when the change committed and the request
+only pays for one extra INSERT. The process_application_events command claims
+pending events in id order and hands each batch to the receivers of the
+application_events signal (chatApp creates chat rooms, system messages and
+notifications there).
+
+A batch's database writes commit together with its events being marked done.
+Channel-layer pushes run after that commit, so a worker dying in between
+repeats them on the next run: delivery is at least once.
+
+Events of one application are handled in the order they were recorded. A
+batch leaves out applications whose earlier events another worker still
+holds, and a failing event holds back the later events of its application
+until it succeeds or runs out of attempts.
+"""
+import logging
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from .models import Application, ApplicationEvent
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+
+# Sent with sender=Application and events=[ApplicationEvent, ...] in id order
+application_events = Signal()
+
+
+def dispatch(events):
+    application_events.send(sender=Application, events=events)
+    ApplicationEvent.objects.filter(id__in=[event.id for event in events]).update(
+        status='done', processed_at=timezone.now()
+    )
+
+
+def record_failure(event, error, max_attempts):
+    event.attempts += 1
+    event.last_error = str(error)
+    if event.attempts >= max_attempts:
+        event.status = 'failed'
+    event.save(update_fields=['attempts', 'last_error', 'status'])
+
+
+def process_batch(batch_size=DEFAULT_BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Claim and handle up to batch_size pending events.
+    Returns: the number of events handled successfully
+    """
+    with transaction.atomic():
+        events = list(
+            ApplicationEvent.objects.select_for_update(skip_locked=True)
+            .filter(status='pending').order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        # Earlier events locked by another worker keep their application out of this batch
+        ids = [event.id for event in events]
+        held = set(
+            ApplicationEvent.objects.filter(
+                status='pending',
+                application_id__in={event.application_id for event in events},
+                id__lt=ids[-1],
+            ).exclude(id__in=ids).values_list('application_id', flat=True)
+        )
+        events = [event for event in events if event.application_id not in held]
+        if not events:
+            return 0
+
+        try:
+            with transaction.atomic():
+                dispatch(events)
+            return len(events)
+        except Exception as e:
+            logger.warning(f"Application event batch failed, retrying one by one: {e}")
+
+        # Isolate the failing events; the rest of the batch still goes through
+        failed_applications = set()
+        handled = 0
+        for event in events:
+            if event.application_id in failed_applications:
+                continue
+            try:
+                with transaction.atomic():
+                    dispatch([event])
+                handled += 1
+            except Exception as e:
+                logger.exception(f"Application event {event.id} failed: {e}")
+                failed_applications.add(event.application_id)
+                record_failure(event, e, max_attempts)
+        return handled
@@ -110,3 +110,38 @@ class ApplicationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user', 'applied_at', 'updated_at', 'reviewed_by', 'reviewed_at']
     
+
+
+class ApplicantUserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomUser
+        fields = ['id', 'phone_number', 'email']
+
+
+class ApplicantJobSeekerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobSeeker
+        fields = [
+            'id', 'first_name', 'middle_name', 'last_name', 'gender', 'experience',
+            'education_level', 'education_sector', 'district', 'sector', 'resume'
+        ]
+
+
+class ApplicationInboxSerializer(serializers.ModelSerializer):
+    """
+    Compact row of the employer's applicant inbox (see inbox.py). The job
+    offer is referenced by id; user and job_seeker must be loaded with
+    select_related.
+    """
+    user = ApplicantUserSerializer(read_only=True)
+    job_seeker = ApplicantJobSeekerSerializer(read_only=True)
+
+    class Meta:
+        model = Application
+        fields = [
+            'id', 'job_offer_id', 'user', 'job_seeker',
+            'cover_letter', 'resume', 'additional_documents',
+            'status', 'feedback', 'applied_at', 'updated_at',
+            'reviewed_by', 'reviewed_at'
+        ]
+        read_only_fields = fields
@@ -1,3 +1,335 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from chatApp import utils as chat_utils
+from chatApp.models import ChatNotification, ChatRoom, Message
+from jobCategoryApp.models import JobCategory, JobType
+from job_offer_app.models import JobOffer
+from job_seeker.models import JobSeeker
+from mailApp.models import OutgoingEmail
+from userApp.models import CustomUser
+from .models import Application, ApplicationEvent
+from .outbox import application_events, process_batch
+from .transitions import TransitionError, bulk_transition, transition
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def create_job_offer(employer, title='Backend developer'):
+    category, _ = JobCategory.objects.get_or_create(name='Engineering', defaults={'created_by': employer})
+    job_type, _ = JobType.objects.get_or_create(name='Full time', defaults={'created_by': employer})
+    return JobOffer.objects.create(
+        title=title,
+        location='Kigali',
+        job_type=job_type,
+        job_category=category,
+        experience_level='entry',
+        description='Build APIs',
+        deadline=timezone.now().date() + timedelta(days=30),
+        status='active',
+        created_by=employer,
+    )
+
+
+def create_application(job_offer, index):
+    user = CustomUser.objects.create_user(phone_number=f'0781{index:06d}', role='job_seeker')
+    JobSeeker.objects.create(user=user, first_name='Seeker', last_name=str(index), gender='female')
+    return Application.objects.create(user=user, job_offer=job_offer)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class OutboxTests(TestCase):
+    def setUp(self):
+        # The system user is kept per process; the one of an earlier test was rolled back
+        chat_utils._system_user = None
+        self.employer = CustomUser.objects.create_user(phone_number='0780000100', role='job_offer')
+        self.job_offer = create_job_offer(self.employer)
+
+    def test_side_effects_commit_with_the_events(self):
+        application = create_application(self.job_offer, 1)
+        application.status = 'reviewing'
+        application.save()
+
+        self.assertEqual(process_batch(), 2)
+        self.assertFalse(ApplicationEvent.objects.exclude(status='done').exists())
+        chat_room = ChatRoom.objects.get(application=application)
+        self.assertEqual(
+            list(Message.objects.filter(chat_room=chat_room).order_by('sequence').values_list('content', flat=True)),
+            [
+                f'Application submitted for {self.job_offer.title}. You can now communicate about this application.',
+                'Application status changed to: Reviewing',
+            ],
+        )
+        # Saved by the worker's transaction, not by a later push flush
+        self.assertEqual(ChatNotification.objects.filter(chat_room=chat_room).count(), 3)
+
+    def test_events_are_handed_over_in_order(self):
+        application = create_application(self.job_offer, 1)
+        for status in ('reviewing', 'shortlisted', 'accepted'):
+            application.status = status
+            application.save()
+
+        seen = []
+
+        def record(sender, events, **kwargs):
+            seen.extend((event.event_type, event.payload.get('status')) for event in events)
+
+        application_events.connect(record, sender=Application)
+        try:
+            process_batch()
+        finally:
+            application_events.disconnect(record, sender=Application)
+        self.assertEqual(seen, [
+            ('created', None),
+            ('status_changed', 'reviewing'),
+            ('status_changed', 'shortlisted'),
+            ('status_changed', 'accepted'),
+        ])
+
+    def test_failing_event_holds_back_its_application_only(self):
+        failing = create_application(self.job_offer, 1)
+        healthy = create_application(self.job_offer, 2)
+        failing.status = 'reviewing'
+        failing.save()
+
+        def fail(sender, events, **kwargs):
+            if any(event.application_id == failing.id for event in events):
+                raise RuntimeError('boom')
+
+        application_events.connect(fail, sender=Application)
+        try:
+            self.assertEqual(process_batch(max_attempts=2), 1)
+        finally:
+            application_events.disconnect(fail, sender=Application)
+
+        self.assertEqual(ApplicationEvent.objects.get(application=healthy).status, 'done')
+        created, changed = ApplicationEvent.objects.filter(application=failing).order_by('id')
+        self.assertEqual((created.status, created.attempts, created.last_error), ('pending', 1, 'boom'))
+        self.assertEqual((changed.status, changed.attempts), ('pending', 0))
+        self.assertFalse(ChatRoom.objects.filter(application=failing).exists())
+
+        # The retry handles both events of the application in order
+        self.assertEqual(process_batch(), 2)
+        self.assertFalse(ApplicationEvent.objects.exclude(status='done').exists())
+        self.assertTrue(ChatRoom.objects.filter(application=failing).exists())
+
+    def test_event_is_failed_after_max_attempts(self):
+        application = create_application(self.job_offer, 1)
+        handler = mock.Mock(side_effect=RuntimeError('boom'))
+        application_events.connect(handler, sender=Application)
+        try:
+            process_batch(max_attempts=2)
+            process_batch(max_attempts=2)
+        finally:
+            application_events.disconnect(handler, sender=Application)
+
+        event = ApplicationEvent.objects.get(application=application)
+        self.assertEqual((event.status, event.attempts), ('failed', 2))
+        self.assertEqual(process_batch(), 0)
+
+
+class TransitionTests(TestCase):
+    def setUp(self):
+        self.employer = CustomUser.objects.create_user(phone_number='0780000200', role='job_offer')
+        self.job_offer = create_job_offer(self.employer)
+        self.application = create_application(self.job_offer, 1)
+
+    def status_events(self):
+        return list(
+            ApplicationEvent.objects.filter(application=self.application, event_type='status_changed')
+            .order_by('id').values_list('payload', flat=True)
+        )
+
+    def test_event_carries_previous_status(self):
+        application = transition(self.application.id, 'reviewing', owner=self.employer, reviewer=self.employer)
+        transition(self.application.id, 'accepted', owner=self.employer, reviewer=self.employer)
+
+        self.assertEqual((application.status, application.previous_status), ('reviewing', 'pending'))
+        self.assertEqual(self.status_events(), [
+            {'status': 'reviewing', 'previous_status': 'pending'},
+            {'status': 'accepted', 'previous_status': 'reviewing'},
+        ])
+        self.application.refresh_from_db()
+        self.assertEqual((self.application.status, self.application.reviewed_by_id), ('accepted', self.employer.id))
+
+    def test_only_allowed_transitions(self):
+        transition(self.application.id, 'rejected', owner=self.employer)
+        with self.assertRaises(TransitionError) as raised:
+            transition(self.application.id, 'accepted', owner=self.employer)
+        self.assertEqual(raised.exception.status_code, 400)
+        self.assertEqual(len(self.status_events()), 1)
+
+    def test_callers_are_checked(self):
+        stranger = CustomUser.objects.create_user(phone_number='0780000201', role='job_offer')
+        for kwargs in ({'owner': stranger}, {'applicant': stranger}):
+            with self.assertRaises(TransitionError) as raised:
+                transition(self.application.id, 'withdrawn', **kwargs)
+            self.assertEqual(raised.exception.status_code, 403)
+        with self.assertRaises(TransitionError) as raised:
+            transition(self.application.id + 1000, 'reviewing')
+        self.assertEqual(raised.exception.status_code, 404)
+
+    def test_one_conditional_update_decides(self):
+        with CaptureQueriesContext(connection) as queries:
+            transition(self.application.id, 'reviewing', owner=self.employer)
+        statements = [query['sql'] for query in queries.captured_queries if 'SAVEPOINT' not in query['sql']]
+        self.assertTrue(statements[0].startswith('UPDATE'))
+        self.assertFalse(any('FOR UPDATE' in sql for sql in statements))
+
+    def test_lost_race_changes_nothing(self):
+        # Rejected by another reviewer between this one's read and its update
+        Application.objects.filter(id=self.application.id).update(status='rejected')
+        with self.assertRaises(TransitionError) as raised:
+            transition(self.application.id, 'accepted', owner=self.employer)
+
+        self.assertEqual(raised.exception.status_code, 400)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, 'rejected')
+        self.assertEqual(self.status_events(), [])
+
+
+class StatusViewTests(TestCase):
+    def setUp(self):
+        self.employer = CustomUser.objects.create_user(phone_number='0780000300', role='job_offer')
+        self.job_offer = create_job_offer(self.employer)
+        self.application = create_application(self.job_offer, 1)
+        self.application.user.email = 'seeker@example.com'
+        self.application.user.save()
+        self.client = APIClient()
+
+    def patch_status(self, user, data, url='/application/{}/status/'):
+        self.client.force_authenticate(user)
+        return self.client.patch(url.format(self.application.id), data, format='json')
+
+    def test_staff_roles_update_and_applicant_is_emailed(self):
+        for index, role in enumerate(('employee', 'admin')):
+            reviewer = CustomUser.objects.create_user(phone_number=f'078000031{index}', role=role)
+            new_status = ('reviewing', 'shortlisted')[index]
+            response = self.patch_status(reviewer, {'status': new_status, 'feedback': 'Great profile'})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((response.data['id'], response.data['status']), (self.application.id, new_status))
+            self.assertEqual(response.data['feedback'], 'Great profile')
+            self.assertEqual(response.data['reviewed_by'], reviewer.id)
+        self.assertEqual(
+            list(OutgoingEmail.objects.order_by('id').values_list('to', flat=True)),
+            [['seeker@example.com'], ['seeker@example.com']],
+        )
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.previous_status, 'reviewing')
+
+    def test_other_roles_are_refused_on_both_routes(self):
+        for user in (self.employer, self.application.user):
+            for url in ('/application/{}/status/', '/application/status/{}/'):
+                response = self.patch_status(user, {'status': 'withdrawn'}, url)
+                self.assertEqual(response.status_code, 403)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, 'pending')
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_disallowed_transition(self):
+        admin = CustomUser.objects.create_user(phone_number='0780000302', role='admin')
+        self.assertEqual(self.patch_status(admin, {'status': 'rejected'}).status_code, 200)
+        response = self.patch_status(admin, {'status': 'accepted'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'Cannot change status from rejected to accepted'})
+        self.assertEqual(self.patch_status(admin, {'status': 'accepted'}, '/application/0/status/').status_code, 404)
+
+
+class BulkTransitionTests(TestCase):
+    def setUp(self):
+        self.employer = CustomUser.objects.create_user(phone_number='0780000400', role='job_offer')
+        self.job_offer = create_job_offer(self.employer)
+        other_employer = CustomUser.objects.create_user(phone_number='0780000401', role='job_offer')
+        self.applications = [create_application(self.job_offer, index) for index in range(4)]
+        self.foreign = create_application(create_job_offer(other_employer, 'Designer'), 10)
+        for index, application in enumerate(self.applications):
+            application.user.email = f'seeker{index}@example.com'
+            application.user.save()
+
+    def test_results_per_id_in_request_order(self):
+        pending, reviewing, shortlisted, rejected = self.applications
+        for application, status in ((reviewing, 'reviewing'), (shortlisted, 'shortlisted'), (rejected, 'rejected')):
+            transition(application.id, status)
+
+        ids = [rejected.id, 999999, shortlisted.id, self.foreign.id, pending.id, reviewing.id]
+        results = bulk_transition(self.employer, ids, 'shortlisted', feedback='Next round')
+
+        self.assertEqual([result['id'] for result in results], ids)
+        self.assertEqual([result['result'] for result in results], [
+            'invalid_transition', 'not_found', 'unchanged', 'forbidden', 'updated', 'updated',
+        ])
+        self.assertEqual(results[0]['status'], 'rejected')
+        self.assertEqual(results[4]['previous_status'], 'pending')
+        self.assertEqual(results[5]['previous_status'], 'reviewing')
+
+        self.assertEqual(
+            set(Application.objects.filter(status='shortlisted').values_list('id', flat=True)),
+            {pending.id, reviewing.id, shortlisted.id},
+        )
+        self.assertEqual(
+            set(ApplicationEvent.objects.filter(event_type='status_changed', payload__status='shortlisted')
+                .values_list('application_id', flat=True)),
+            {pending.id, reviewing.id, shortlisted.id},
+        )
+        self.assertEqual(
+            sorted(email.to[0] for email in OutgoingEmail.objects.filter(subject__icontains='shortlisted')),
+            ['seeker0@example.com', 'seeker1@example.com'],
+        )
+
+    def test_rows_changed_before_the_update_are_not_reported(self):
+        raced, updated = self.applications[:2]
+        real_update = QuerySet.update
+
+        def racing_update(queryset, **changes):
+            # Another reviewer rejects one of the rows after bulk_transition read it
+            if 'previous_status' in changes:
+                real_update(Application.objects.filter(id=raced.id), status='rejected')
+            return real_update(queryset, **changes)
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=racing_update):
+            results = bulk_transition(self.employer, [raced.id, updated.id], 'shortlisted')
+
+        self.assertEqual(results, [
+            {'id': raced.id, 'result': 'invalid_transition', 'status': 'rejected',
+             'error': 'Cannot change status from rejected to shortlisted'},
+            {'id': updated.id, 'result': 'updated', 'status': 'shortlisted', 'previous_status': 'pending'},
+        ])
+        self.assertEqual(
+            list(ApplicationEvent.objects.filter(event_type='status_changed').values_list('application_id', flat=True)),
+            [updated.id],
+        )
+        self.assertEqual([email.to for email in OutgoingEmail.objects.all()], [['seeker1@example.com']])
+
+    def test_staff_may_change_any_application(self):
+        staff = CustomUser.objects.create_user(phone_number='0780000402', role='admin')
+        staff.is_staff = True
+        staff.save()
+        results = bulk_transition(staff, [self.foreign.id], 'reviewing')
+        self.assertEqual(results[0]['result'], 'updated')
+
+    def test_view_validates_the_request(self):
+        client = APIClient()
+        client.force_authenticate(self.employer)
+        for data in (
+            {'status': 'withdrawn', 'application_ids': [self.applications[0].id]},
+            {'status': 'accepted', 'application_ids': []},
+            {'status': 'accepted', 'application_ids': ['1']},
+        ):
+            self.assertEqual(client.post('/application/bulk-status/', data, format='json').status_code, 400)
+
+        response = client.post('/application/bulk-status/', {
+            'status': 'accepted',
+            'application_ids': [self.applications[0].id, self.applications[0].id, self.foreign.id],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual([result['result'] for result in response.data['results']], ['updated', 'forbidden'])
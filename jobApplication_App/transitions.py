@@ -0,0 +1,232 @@
+"""
+Application status transitions.
+
+TRANSITIONS declares which statuses an application may move to from each
+status. transition() applies one change with a single statement,
+
+    UPDATE ... SET status = ?, previous_status = status, <changed columns>
+    WHERE id = ? AND status IN <ALLOWED_FROM[status]> [AND <caller check>]
+
+whose affected-row count decides whether it happened, so two reviewers
+acting at once cannot both move the same application, and previous_status
+records the status that was actually replaced. The row is only read
+afterwards: to build the status_changed event and the email, or, when
+nothing was updated, to tell a missing application (404), someone else's
+(403) and a status that cannot be left that way (400) apart.
+
+bulk_transition moves many applications to one status with a fixed number
+of queries: one read that sorts out missing, foreign and ineligible rows,
+one conditional UPDATE of the rest, one read of the rows that UPDATE really
+changed (they carry its timestamp), one INSERT of outbox events (chat
+messages and notifications follow from jobApplication_App/outbox.py) and
+one INSERT of queued emails (see mailApp/mail_queue.py). Rows changed by
+someone else between the first read and the UPDATE are reported with
+their new status and get no event or email.
+
+Every status_changed event carries {'status', 'previous_status'}.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from job_offer_app.models import JobOffer
+from mailApp.mail_queue import enqueue_emails, new_template_email
+from .models import Application, ApplicationEvent
+
+
+MAX_BULK_APPLICATIONS = 500
+
+# status: the statuses it may move to. Accepted offers can still be turned
+# down; rejected and withdrawn applications are final.
+TRANSITIONS = {
+    'pending': ['reviewing', 'shortlisted', 'accepted', 'rejected', 'withdrawn'],
+    'reviewing': ['shortlisted', 'accepted', 'rejected', 'withdrawn'],
+    'shortlisted': ['accepted', 'rejected', 'withdrawn'],
+    'accepted': ['rejected'],
+    'rejected': [],
+    'withdrawn': [],
+}
+
+# status: the statuses it may be reached from (the IN list of the UPDATE)
+ALLOWED_FROM = {
+    target: [source for source, targets in TRANSITIONS.items() if target in targets]
+    for target, _ in Application.STATUS_CHOICES
+}
+
+# Statuses set by the employer (or staff); 'withdrawn' is set by the applicant
+EMPLOYER_STATUSES = ['reviewing', 'shortlisted', 'accepted', 'rejected']
+
+
+class TransitionError(Exception):
+    """
+    A transition that did not happen; status_code is the HTTP status to answer with
+    """
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Statuses the applicant is emailed about; bodies are in templates/emails/application_<status>.txt
+STATUS_EMAIL_SUBJECTS = {
+    'shortlisted': "Congratulations! You've been shortlisted for {job_title}",
+    'accepted': "Congratulations! Your application for {job_title} has been accepted",
+    'rejected': "Update on your application for {job_title}",
+    'reviewing': "Your application for {job_title} is being reviewed",
+}
+
+
+def status_email(application, new_status, feedback=''):
+    """
+    The unsaved email telling the applicant about new_status, or None.
+    application must have user and job_offer loaded.
+    """
+    email = application.user.email
+    if not email or new_status not in STATUS_EMAIL_SUBJECTS:
+        return None
+    job_title = application.job_offer.title
+    return new_template_email(
+        STATUS_EMAIL_SUBJECTS[new_status].format(job_title=job_title),
+        f'emails/application_{new_status}.txt',
+        {'job_title': job_title, 'feedback': feedback},
+        email,
+    )
+
+
+def transition(application_id, new_status, owner=None, applicant=None, reviewer=None, feedback=None):
+    """
+    Move one application to new_status.
+
+    owner: only if the application is for a job offer created by this user
+    applicant: only if the application belongs to this user
+    reviewer: recorded as reviewed_by, with reviewed_at
+    feedback: stored when not None
+
+    Returns: the updated application with user and job_offer loaded; its
+    previous_status is the status it had before
+    Raises: TransitionError when the application is missing, not the
+    caller's, or not in a status new_status can be reached from
+    """
+    current = timezone.now()
+    changes = {'status': new_status, 'previous_status': F('status'), 'updated_at': current}
+    if reviewer is not None:
+        changes.update(reviewed_by=reviewer, reviewed_at=current)
+    if feedback is not None:
+        changes['feedback'] = feedback
+
+    applications = Application.objects.filter(id=application_id, status__in=ALLOWED_FROM[new_status])
+    if owner is not None:
+        applications = applications.filter(job_offer_id__in=JobOffer.objects.filter(created_by=owner).values('id'))
+    if applicant is not None:
+        applications = applications.filter(user=applicant)
+
+    with transaction.atomic():
+        if applications.update(**changes):
+            application = Application.objects.select_related('user', 'job_offer').get(id=application_id)
+            ApplicationEvent.objects.create(
+                application_id=application_id,
+                event_type='status_changed',
+                payload={'status': new_status, 'previous_status': application.previous_status},
+            )
+            return application
+
+    application = Application.objects.select_related('job_offer').only(
+        'id', 'status', 'user_id', 'job_offer__created_by_id'
+    ).filter(id=application_id).first()
+    if application is None:
+        raise TransitionError('Application not found', 404)
+    if (owner is not None and application.job_offer.created_by_id != owner.id) or \
+            (applicant is not None and application.user_id != applicant.id):
+        raise TransitionError('You do not have permission to update this application status', 403)
+    raise TransitionError(f'Cannot change status from {application.status} to {new_status}', 400)
+
+
+def status_result(application_id, status, new_status):
+    """
+    bulk_transition result of an application left in status
+    """
+    if status == new_status:
+        return {'id': application_id, 'result': 'unchanged', 'status': status}
+    return {
+        'id': application_id,
+        'result': 'invalid_transition',
+        'status': status,
+        'error': f'Cannot change status from {status} to {new_status}',
+    }
+
+
+def bulk_transition(user, application_ids, new_status, feedback=None):
+    """
+    Move the given applications to new_status (one of EMPLOYER_STATUSES) on
+    behalf of user (the creator of their job offers, or staff).
+
+    feedback: stored on every updated application when not None
+
+    Returns: [{'id', 'result', ...}] in the order of application_ids, where
+    result is 'updated', 'unchanged', 'not_found', 'forbidden' or
+    'invalid_transition'
+    """
+    allowed_from = ALLOWED_FROM[new_status]
+    current = timezone.now()
+    results = {}
+
+    with transaction.atomic():
+        applications = Application.objects.select_related('job_offer').only(
+            'id', 'status', 'job_offer__created_by_id'
+        ).in_bulk(application_ids)
+
+        eligible = []
+        for application_id in application_ids:
+            application = applications.get(application_id)
+            if application is None:
+                results[application_id] = {'id': application_id, 'result': 'not_found'}
+            elif application.job_offer.created_by_id != user.id and not user.is_staff:
+                results[application_id] = {'id': application_id, 'result': 'forbidden'}
+            elif application.status not in allowed_from:
+                results[application_id] = status_result(application.id, application.status, new_status)
+            else:
+                eligible.append(application.id)
+
+        if eligible:
+            changes = {
+                'status': new_status, 'previous_status': F('status'),
+                'reviewed_by': user, 'reviewed_at': current, 'updated_at': current,
+            }
+            if feedback is not None:
+                changes['feedback'] = feedback
+            Application.objects.filter(id__in=eligible, status__in=allowed_from).update(**changes)
+
+            # The UPDATE skips rows another transaction moved in the meantime;
+            # only the rows carrying its timestamp were changed by it
+            current_rows = Application.objects.select_related('user', 'job_offer').only(
+                'id', 'status', 'previous_status', 'updated_at', 'reviewed_by_id',
+                'user__email', 'job_offer__title',
+            ).in_bulk(eligible)
+            updated = []
+            for application_id in eligible:
+                application = current_rows.get(application_id)
+                if application is None:
+                    results[application_id] = {'id': application_id, 'result': 'not_found'}
+                elif (application.status, application.updated_at, application.reviewed_by_id) == \
+                        (new_status, current, user.id):
+                    updated.append(application)
+                    results[application_id] = {
+                        'id': application_id,
+                        'result': 'updated',
+                        'status': new_status,
+                        'previous_status': application.previous_status,
+                    }
+                else:
+                    results[application_id] = status_result(application_id, application.status, new_status)
+
+            ApplicationEvent.objects.bulk_create([
+                ApplicationEvent(
+                    application_id=application.id,
+                    event_type='status_changed',
+                    payload={'status': new_status, 'previous_status': application.previous_status},
+                )
+                for application in updated
+            ])
+            emails = [status_email(application, new_status, feedback or '') for application in updated]
+            enqueue_emails([email for email in emails if email is not None])
+
+    return [results[application_id] for application_id in application_ids]
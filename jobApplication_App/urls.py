@@ -15,11 +15,12 @@ urlpatterns = [
     path('delete/<int:pk>/', views.delete_application, name='delete-application'),
     
     # Status management
-    path('status/<int:pk>/', views.update_application_status, name='update-application-status'),
+    path('status/<int:application_id>/', views.update_application_status, name='update-application-status'),
     path('accept/<int:pk>/', views.accept_application, name='accept-application'),
     path('reject/<int:pk>/', views.reject_application, name='reject-application'),
     path('shortlist/<int:pk>/', views.shortlist_application, name='shortlist-application'),
     path('withdraw/<int:pk>/', views.withdraw_application, name='withdraw-application'),
+    path('bulk-status/', views.bulk_update_application_status, name='bulk-update-application-status'),
     
     # User-specific endpoints
     path('my-applications/', views.get_my_applications, name='get-my-applications'),
@@ -25,8 +25,14 @@ import re
 
 from job_seeker.models import JobSeeker
 from job_offer_app.models import JobOffer
+from job_offer_app.pagination import InvalidCursor
+from job_offer_app.serializers import JobOfferFeedSerializer
+from .inbox import inbox_page
 from .models import Application
-from .serializers import ApplicationSerializer
+from .serializers import ApplicationSerializer, ApplicationInboxSerializer
+from .transitions import (
+    EMPLOYER_STATUSES, MAX_BULK_APPLICATIONS, TransitionError, bulk_transition, status_email, transition
+)
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -36,23 +42,18 @@ logger = logging.getLogger(__name__)
 def create_application(request):
     """Create a new application for a job offer"""
     try:
-        # Log the request
-        print(f"Application creation attempt by user {request.user.id}")
-        
         # Check if the user has a job seeker profile
         try:
             job_seeker = JobSeeker.objects.get(user=request.user)
             
             # Check if job seeker status is active
             if not job_seeker.status:
-                print(f"User {request.user.id} has an inactive job seeker profile")
                 return Response(
                     {'error': 'Only active job seekers can apply for jobs'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
                 
         except JobSeeker.DoesNotExist:
-            print(f"User {request.user.id} does not have a job seeker profile")
             return Response(
                 {'error': 'You must complete your job seeker profile before applying'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -60,9 +61,7 @@ def create_application(request):
             
         # Validate job offer ID - Check both job_offer and job_offer_id fields
         job_offer_id = request.data.get('job_offer') or request.data.get('job_offer_id')
-        print(f"\n\n Submitted Job Offer ID: {job_offer_id}\n\n")
         if not job_offer_id:
-            print("Missing job offer ID in request data")
             return Response(
                 {'error': 'Job offer ID is required'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -72,13 +71,11 @@ def create_application(request):
         try:
             job_offer = JobOffer.objects.get(id=job_offer_id)
         except JobOffer.DoesNotExist:
-            print(f"Job offer with ID {job_offer_id} does not exist")
             return Response(
                 {'error': f"Job offer with ID {job_offer_id} does not exist"},
                 status=status.HTTP_404_NOT_FOUND
             )
         except ValueError:
-            print(f"Invalid job offer ID format: {job_offer_id}")
             return Response(
                 {'error': f"Invalid job offer ID format: {job_offer_id}"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -86,7 +83,6 @@ def create_application(request):
         
         # Check job status
         if job_offer.status not in ['active', 'draft']:
-            print(f"Cannot apply to job with status '{job_offer.status}'")
             return Response(
                 {'error': f"Cannot apply to a job that is {job_offer.status}"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -96,7 +92,6 @@ def create_application(request):
         current_date = timezone.now().date()
         if job_offer.deadline < current_date:
             days_passed = (current_date - job_offer.deadline).days
-            print(f"Application deadline has passed for job offer {job_offer_id} ({days_passed} days ago)")
             return Response(
                 {'error': f"The application deadline for this job has passed {days_passed} days ago"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -105,37 +100,11 @@ def create_application(request):
         # Check if already applied
         existing_application = Application.objects.filter(user=request.user, job_offer=job_offer).first()
         if existing_application:
-            print(f"User {request.user.id} has already applied for job offer {job_offer_id} with status {existing_application.status}")
             return Response(
                 {'error': f"You have already applied for this job (Status: {existing_application.status})"},
                 status=status.HTTP_400_BAD_REQUEST
             )
             
-        # NEW VALIDATION: Check salary range compatibility
-        if job_offer.salary_range and job_seeker.salary_range:
-            try:
-                # Extract and compare salary ranges
-                # print(f"Comparing salary ranges - Job offer: {job_offer.salary_range}, Job seeker: {job_seeker.salary_range}")
-                
-                # Parse job offer salary range
-                offer_min, offer_max = _parse_salary_range(job_offer.salary_range)
-                
-                # Parse job seeker salary range
-                seeker_min, seeker_max = _parse_salary_range(job_seeker.salary_range)
-                
-                print(f"Parsed salary ranges - Job offer: {offer_min}-{offer_max}, Job seeker: {seeker_min}-{seeker_max}")
-                
-                # Check if job offer salary is higher than job seeker's expected range
-                # if offer_min > seeker_max:
-                #     print(f"Salary range mismatch: Job offer min ({offer_min}) exceeds job seeker's max ({seeker_max})")
-                #     return Response(
-                #         {'error': f"This job's salary range ({job_offer.salary_range}) exceeds your expected salary range ({job_seeker.salary_range})"},
-                #         status=status.HTTP_400_BAD_REQUEST
-                #     )
-            except (ValueError, TypeError) as e:
-                # Log the error but don't block the application if there's an issue parsing the salary ranges
-                print(f"Error comparing salary ranges: {str(e)}. Job offer: {job_offer.salary_range}, Job seeker: {job_seeker.salary_range}")
-        
         # Create the application directly without using serializer for validation
         with transaction.atomic():
             # Create application instance directly
@@ -158,9 +127,6 @@ def create_application(request):
             # Save the application with all fields
             application.save()
             
-            # Use serializer only for output formatting
-            serializer = ApplicationSerializer(application)
-            
             # Return a detailed success response
             return Response({
                 'id': application.id,
@@ -174,7 +140,7 @@ def create_application(request):
                  
     except IntegrityError as e:
         error_msg = str(e)
-        print(f"Database integrity error: {error_msg}")
+        logger.warning(f"Database integrity error creating application: {error_msg}")
         if "unique constraint" in error_msg.lower() or "duplicate key" in error_msg.lower():
             return Response(
                 {'error': "You have already applied for this job"},
@@ -185,81 +151,13 @@ def create_application(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
     except Exception as e:
-        print(f"Unexpected error in create_application: {str(e)}")
+        logger.exception(f"Unexpected error in create_application: {str(e)}")
         return Response(
             {'error': 'An unexpected error occurred'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
 
-def _parse_salary_range(salary_range_str):
-    """
-    Parse a salary range string into minimum and maximum values.
-    
-    Handles various formats:
-    - Fixed number: "1000", "1,000"
-    - Range with hyphen: "1000-2000", "1,000-100,000"
-    - Range with currency: "1000 frw", "1,000 frw - 100,000 frw"
-    - Mixed formats: "1000 - 100,000", "1,000frw-100,000frw"
-    
-    Returns:
-    tuple: (min_value, max_value) as floats
-    """
-    if not salary_range_str:
-        return (0, float('inf'))
-    
-    # Convert to lowercase for consistent processing
-    salary_str = salary_range_str.lower().strip()
-    
-    # Step 1: Remove all currency indicators (frw, $, €, £, etc.)
-    currency_patterns = ['frw', 'rwf', 'usd', '$', '€', '£', 'dollar', 'euros', 'pounds']
-    for pattern in currency_patterns:
-        salary_str = salary_str.replace(pattern, '')
-    
-    # Step 2: Remove all spaces
-    salary_str = salary_str.replace(' ', '')
-    
-    # Step 3: Remove all commas in numbers
-    salary_str = salary_str.replace(',', '')
-    
-    # Step 4: Check if it's a range (contains hyphen or dash)
-    if '-' in salary_str:
-        try:
-            # Split by hyphen
-            parts = salary_str.split('-')
-            
-            # Extract min and max values
-            min_str = parts[0].strip()
-            max_str = parts[1].strip()
-            
-            # Convert to float
-            min_value = float(min_str) if min_str else 0
-            max_value = float(max_str) if max_str else float('inf')
-            
-            return (min_value, max_value)
-        except (ValueError, IndexError) as e:
-            print(f"Error parsing salary range with hyphen: {salary_range_str}, error: {str(e)}")
-            # Fall back to using regex for more complex cases
-    
-    # Step 5: If not a clear range or the above parsing failed, try regex to extract numbers
-    number_pattern = r'\d+\.?\d*'
-    numbers = re.findall(number_pattern, salary_str)
-    
-    if len(numbers) == 0:
-        # No numbers found, return default
-        print(f"No numbers found in salary string: {salary_range_str}")
-        return (0, float('inf'))
-    elif len(numbers) == 1:
-        # Single number - use as min and max
-        value = float(numbers[0])
-        return (value, value)
-    else:
-        # Multiple numbers - assume first is min, last is max
-        min_value = float(numbers[0])
-        max_value = float(numbers[-1])
-        return (min_value, max_value)
-
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def get_all_applications(request):
@@ -476,96 +374,56 @@ def delete_application(request, pk):
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated])
 def update_application_status(request, application_id):
-    """Update application status"""
+    """
+    Update an application's status and send email notification to the applicant
+    if they have an email address.
+    """
     try:
-        # Get the application
-        try:
-            application = Application.objects.get(id=application_id)
-        except Application.DoesNotExist:
-            print(f"Application with ID {application_id} not found")
+        # Check if the user has permission to update application status
+        # Only admins and employees should be able to update application status
+        if request.user.role not in ['admin', 'employee']:
             return Response(
-                {'error': 'Application not found'},
-                status=status.HTTP_404_NOT_FOUND
+                {"error": "You don't have permission to update application status"},
+                status=status.HTTP_403_FORBIDDEN
             )
         
-        # Check authorization - only the job offer creator or admin can update status (except for withdraw)
-        job_offer = application.job_offer
-        is_job_creator = hasattr(job_offer, 'created_by') and job_offer.created_by == request.user
-        
+        # Get the new status from request data
         new_status = request.data.get('status')
         if not new_status:
-            print("Missing status in request data")
             return Response(
-                {'error': 'Status is required'},
+                {"error": "Status is required"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-            
-        # Applicants can only withdraw their applications
-        if application.user == request.user and new_status != 'withdrawn':
-            logger.warning(f"User {request.user.id} attempted to change their application {application_id} to status {new_status}")
-            return Response(
-                {'error': 'You can only withdraw your application, not change its status'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-            
-        # Job creators can update to any status except withdrawn
-        if not is_job_creator and not request.user.is_staff and application.user != request.user:
-            logger.warning(f"User {request.user.id} attempted to update status of application {application_id}")
-            return Response(
-                {'error': 'You do not have permission to update this application status'},
-                status=status.HTTP_403_FORBIDDEN
-            )
         
-        # Validate the new status
-        if new_status not in [choice[0] for choice in Application.STATUS_CHOICES]:
-            print(f"Invalid status: {new_status}")
+        # Validate the status
+        valid_statuses = [status[0] for status in Application.STATUS_CHOICES]
+        if new_status not in valid_statuses:
             return Response(
-                {'error': f"Invalid status. Must be one of {[choice[0] for choice in Application.STATUS_CHOICES]}"},
+                {"error": f"Invalid status. Allowed values are: {', '.join(valid_statuses)}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check for specific status transition validations
-        if application.status == 'withdrawn' and application.user != request.user:
-            print(f"Cannot change status of withdrawn application")
-            return Response(
-                {'error': 'Cannot change status of withdrawn application'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-            
-        if application.status == 'accepted' and new_status not in ['rejected', 'withdrawn']:
-            print(f"Cannot change status from accepted to {new_status}")
-            return Response(
-                {'error': f"Cannot change status from accepted to {new_status}"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        # Get optional feedback
+        feedback = request.data.get('feedback', '')
         
-        # Update application status
+        # Allowed moves are in transitions.TRANSITIONS. The email is queued in
+        # the same transaction and sent by the send_queued_emails worker.
         with transaction.atomic():
-            application.status = new_status
-            
-            # Record feedback if provided
-            if 'feedback' in request.data:
-                application.feedback = request.data['feedback']
-            
-            # Record reviewer info if job creator or admin
-            if is_job_creator or request.user.is_staff:
-                application.reviewed_by = request.user
-                application.reviewed_at = timezone.now()
-            
-            application.save()
-            
-        print(f"Application {application_id} status updated to {new_status} by user {request.user.id}")
-        
-        return Response({
-            'message': f'Application status updated to {new_status}',
-            'status': new_status,
-            'updated_at': application.updated_at
-        }, status=status.HTTP_200_OK)
+            application = transition(application_id, new_status, reviewer=request.user, feedback=feedback)
+            email = status_email(application, new_status, feedback)
+            if email:
+                email.save()
         
+        # Return the updated application
+        serializer = ApplicationSerializer(application)
+        return Response(serializer.data)
+    
+    except TransitionError as e:
+        return Response({"error": str(e)}, status=e.status_code)
     except Exception as e:
         logger.exception(f"Error updating application status: {str(e)}")
         return Response(
-            {'error': 'An error occurred while updating the application status'},
+            {"error": "An error occurred while updating the application status"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
@@ -575,48 +433,15 @@ def update_application_status(request, application_id):
 def accept_application(request, pk):
     """Accept an application"""
     try:
-        # Get the application
-        try:
-            application = Application.objects.get(id=pk)
-        except Application.DoesNotExist:
-            print(f"Application with ID {pk} not found")
-            return Response(
-                {'error': 'Application not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        # Check authorization - only the job offer creator or admin can accept application
-        job_offer = application.job_offer
-        is_job_creator = hasattr(job_offer, 'created_by') and job_offer.created_by == request.user
-        
-        if not is_job_creator and not request.user.is_staff:
-            logger.warning(f"User {request.user.id} attempted to accept application {pk}")
-            return Response(
-                {'error': 'You do not have permission to accept this application'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        # Check if application can be accepted (can't accept withdrawn applications)
-        if application.status == 'withdrawn':
-            print(f"Cannot accept withdrawn application")
-            return Response(
-                {'error': 'Cannot accept withdrawn application'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Update application status
-        with transaction.atomic():
-            application.status = 'accepted'
-            
-            # Record feedback if provided
-            if 'feedback' in request.data:
-                application.feedback = request.data['feedback']
-            
-            # Record reviewer info
-            application.reviewed_by = request.user
-            application.reviewed_at = timezone.now()
-            
-            application.save()
+        # Only the job offer creator or admin can accept the application, and only
+        # from a status listed in transitions.ALLOWED_FROM['accepted']
+        application = transition(
+            pk,
+            'accepted',
+            owner=None if request.user.is_staff else request.user,
+            reviewer=request.user,
+            feedback=request.data.get('feedback'),
+        )
             
         print(f"Application {pk} accepted by user {request.user.id}")
         
@@ -626,6 +451,9 @@ def accept_application(request, pk):
             'updated_at': application.updated_at
         }, status=status.HTTP_200_OK)
         
+    except TransitionError as e:
+        logger.warning(f"User {request.user.id} could not accept application {pk}: {e}")
+        return Response({'error': str(e)}, status=e.status_code)
     except Exception as e:
         logger.exception(f"Error accepting application: {str(e)}")
         return Response(
@@ -639,48 +467,15 @@ def accept_application(request, pk):
 def reject_application(request, pk):
     """Reject an application"""
     try:
-        # Get the application
-        try:
-            application = Application.objects.get(id=pk)
-        except Application.DoesNotExist:
-            print(f"Application with ID {pk} not found")
-            return Response(
-                {'error': 'Application not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        # Check authorization - only the job offer creator or admin can reject application
-        job_offer = application.job_offer
-        is_job_creator = hasattr(job_offer, 'created_by') and job_offer.created_by == request.user
-        
-        if not is_job_creator and not request.user.is_staff:
-            logger.warning(f"User {request.user.id} attempted to reject application {pk}")
-            return Response(
-                {'error': 'You do not have permission to reject this application'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        # Check if application can be rejected (can't reject withdrawn applications)
-        if application.status == 'withdrawn':
-            print(f"Cannot reject withdrawn application")
-            return Response(
-                {'error': 'Cannot reject withdrawn application'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Update application status
-        with transaction.atomic():
-            application.status = 'rejected'
-            
-            # Record feedback if provided
-            if 'feedback' in request.data:
-                application.feedback = request.data['feedback']
-            
-            # Record reviewer info
-            application.reviewed_by = request.user
-            application.reviewed_at = timezone.now()
-            
-            application.save()
+        # Only the job offer creator or admin can reject the application, and only
+        # from a status listed in transitions.ALLOWED_FROM['rejected']
+        application = transition(
+            pk,
+            'rejected',
+            owner=None if request.user.is_staff else request.user,
+            reviewer=request.user,
+            feedback=request.data.get('feedback'),
+        )
             
         print(f"Application {pk} rejected by user {request.user.id}")
         
@@ -690,6 +485,9 @@ def reject_application(request, pk):
             'updated_at': application.updated_at
         }, status=status.HTTP_200_OK)
         
+    except TransitionError as e:
+        logger.warning(f"User {request.user.id} could not reject application {pk}: {e}")
+        return Response({'error': str(e)}, status=e.status_code)
     except Exception as e:
         logger.exception(f"Error rejecting application: {str(e)}")
         return Response(
@@ -703,48 +501,15 @@ def reject_application(request, pk):
 def shortlist_application(request, pk):
     """Shortlist an application"""
     try:
-        # Get the application
-        try:
-            application = Application.objects.get(id=pk)
-        except Application.DoesNotExist:
-            print(f"Application with ID {pk} not found")
-            return Response(
-                {'error': 'Application not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        # Check authorization - only the job offer creator or admin can shortlist application
-        job_offer = application.job_offer
-        is_job_creator = hasattr(job_offer, 'created_by') and job_offer.created_by == request.user
-        
-        if not is_job_creator and not request.user.is_staff:
-            logger.warning(f"User {request.user.id} attempted to shortlist application {pk}")
-            return Response(
-                {'error': 'You do not have permission to shortlist this application'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        # Check if application can be shortlisted (can't shortlist withdrawn or rejected applications)
-        if application.status in ['withdrawn', 'rejected']:
-            print(f"Cannot shortlist application with status {application.status}")
-            return Response(
-                {'error': f'Cannot shortlist application with status {application.status}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Update application status
-        with transaction.atomic():
-            application.status = 'shortlisted'
-            
-            # Record feedback if provided
-            if 'feedback' in request.data:
-                application.feedback = request.data['feedback']
-            
-            # Record reviewer info
-            application.reviewed_by = request.user
-            application.reviewed_at = timezone.now()
-            
-            application.save()
+        # Only the job offer creator or admin can shortlist the application, and only
+        # from a status listed in transitions.ALLOWED_FROM['shortlisted']
+        application = transition(
+            pk,
+            'shortlisted',
+            owner=None if request.user.is_staff else request.user,
+            reviewer=request.user,
+            feedback=request.data.get('feedback'),
+        )
             
         print(f"Application {pk} shortlisted by user {request.user.id}")
         
@@ -754,6 +519,9 @@ def shortlist_application(request, pk):
             'updated_at': application.updated_at
         }, status=status.HTTP_200_OK)
         
+    except TransitionError as e:
+        logger.warning(f"User {request.user.id} could not shortlist application {pk}: {e}")
+        return Response({'error': str(e)}, status=e.status_code)
     except Exception as e:
         logger.exception(f"Error shortlisting application: {str(e)}")
         return Response(
@@ -767,35 +535,8 @@ def shortlist_application(request, pk):
 def withdraw_application(request, pk):
     """Withdraw an application"""
     try:
-        # Get the application
-        try:
-            application = Application.objects.get(id=pk)
-        except Application.DoesNotExist:
-            print(f"Application with ID {pk} not found")
-            return Response(
-                {'error': 'Application not found'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        # Check authorization - only the applicant can withdraw their application
-        if application.user != request.user:
-            logger.warning(f"User {request.user.id} attempted to withdraw application {pk} belonging to user {application.user.id}")
-            return Response(
-                {'error': 'You do not have permission to withdraw this application'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        # Check if application can be withdrawn (can't withdraw if already accepted or rejected)
-        if application.status in ['accepted', 'rejected', 'withdrawn']:
-            print(f"Cannot withdraw application with status {application.status}")
-            return Response(
-                {'error': f'Cannot withdraw application with status {application.status}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Update application status
-        application.status = 'withdrawn'
-        application.save()
+        # Only the applicant can withdraw, and only before a final decision
+        application = transition(pk, 'withdrawn', applicant=request.user)
         
         print(f"Application {pk} withdrawn by user {request.user.id}")
         
@@ -805,6 +546,9 @@ def withdraw_application(request, pk):
             'updated_at': application.updated_at
         }, status=status.HTTP_200_OK)
         
+    except TransitionError as e:
+        logger.warning(f"User {request.user.id} could not withdraw application {pk}: {e}")
+        return Response({'error': str(e)}, status=e.status_code)
     except Exception as e:
         logger.exception(f"Error withdrawing application: {str(e)}")
         return Response(
@@ -852,39 +596,46 @@ def get_my_applications(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_my_job_offer_applications(request):
-    """Get all applications for job offers created by the authenticated user"""
+    """
+    Applicant inbox across the job offers created by the authenticated user, newest first.
+
+    Query parameters: job_offer (one of the user's offers), status, cursor, page_size.
+    Each job offer on the page is listed once under job_offers; counts are
+    per status over every application of the (filtered) offers.
+    """
     try:
-        # Optional filter by status
-        status_filter = request.query_params.get('status')
         job_offer_filter = request.query_params.get('job_offer')
         
-        # Get job offers created by the user
-        job_offers = JobOffer.objects.filter(created_by=request.user)
+        applications = Application.objects.filter(job_offer__created_by=request.user)
         
-        # Get applications for those job offers
-        applications = Application.objects.filter(job_offer__in=job_offers)
-        
-        # Apply status filter if provided
-        if status_filter and status_filter.lower() != 'all':
-            applications = applications.filter(status=status_filter)
-            
-        # Apply job offer filter if provided
         if job_offer_filter:
+            if not job_offer_filter.isdigit():
+                return Response(
+                    {'error': 'job_offer must be a job offer id'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             applications = applications.filter(job_offer_id=job_offer_filter)
         
-        # Order by most recent first
-        applications = applications.order_by('-applied_at')
+        rows, next_cursor, page_size, counts, count = inbox_page(applications, request.query_params)
         
-        # Serialize the data
-        serializer = ApplicationSerializer(applications, many=True)
-        
-        # print(f"Retrieved {applications.count()} applications for job offers created by user {request.user.id}")
+        # The page's job offers in one query, sent once instead of in every row
+        job_offers = JobOffer.objects.select_related(
+            'created_by', 'job_category', 'job_type'
+        ).defer('created_by__profile_picture', 'search_vector').in_bulk(
+            {application.job_offer_id for application in rows}
+        )
         
         return Response({
-            'count': applications.count(),
-            'results': serializer.data
+            'job_offers': JobOfferFeedSerializer(list(job_offers.values()), many=True).data,
+            'counts': counts,
+            'count': count,
+            'results': ApplicationInboxSerializer(rows, many=True).data,
+            'next_cursor': next_cursor,
+            'page_size': page_size
         })
         
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         logger.exception(f"Error retrieving job offer applications: {str(e)}")
         return Response(
@@ -896,11 +647,19 @@ def get_my_job_offer_applications(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_job_offer_applications(request, job_offer_id):
-    """Get all applications for a specific job offer"""
+    """
+    Applicant inbox of one job offer, newest first.
+
+    Query parameters: status, cursor, page_size.
+    The job offer is sent once in the envelope; counts are per status over
+    all of its applications.
+    """
     try:
         # Get job offer
         try:
-            job_offer = JobOffer.objects.get(id=job_offer_id)
+            job_offer = JobOffer.objects.select_related(
+                'created_by', 'job_category', 'job_type'
+            ).defer('created_by__profile_picture', 'search_vector').get(id=job_offer_id)
         except JobOffer.DoesNotExist:
             print(f"Job offer with ID {job_offer_id} not found")
             return Response(
@@ -909,7 +668,7 @@ def get_job_offer_applications(request, job_offer_id):
             )
         
         # Check authorization - only the job offer creator or admin can view applications
-        is_job_creator = hasattr(job_offer, 'created_by') and job_offer.created_by == request.user
+        is_job_creator = job_offer.created_by_id == request.user.id
         
         if not is_job_creator and not request.user.is_staff:
             logger.warning(f"User {request.user.id} attempted to view applications for job offer {job_offer_id}")
@@ -918,224 +677,74 @@ def get_job_offer_applications(request, job_offer_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Optional filter by status
-        status_filter = request.query_params.get('status')
-        
-        # Get applications
         applications = Application.objects.filter(job_offer=job_offer)
-        
-        # Apply status filter if provided
-        if status_filter and status_filter.lower() != 'all':
-            applications = applications.filter(status=status_filter)
-        
-        # Order by most recent first
-        applications = applications.order_by('-applied_at')
-        
-        # Serialize the data
-        serializer = ApplicationSerializer(applications, many=True)
-        
-        # print(f"Retrieved {applications.count()} applications for job offer {job_offer_id}")
+        rows, next_cursor, page_size, counts, count = inbox_page(applications, request.query_params)
         
         return Response({
-            'count': applications.count(),
-            'results': serializer.data
+            'job_offer': JobOfferFeedSerializer(job_offer).data,
+            'counts': counts,
+            'count': count,
+            'results': ApplicationInboxSerializer(rows, many=True).data,
+            'next_cursor': next_cursor,
+            'page_size': page_size
         })
         
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         logger.exception(f"Error retrieving job offer applications: {str(e)}")
         return Response(
             {'error': 'An error occurred while retrieving job offer applications'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from django.utils import timezone
-from django.core.mail import send_mail
-from django.conf import settings
-from .models import Application
-from .serializers import ApplicationSerializer
-import logging
 
-# Set up logger
-logger = logging.getLogger(__name__)
 
-@api_view(['PATCH'])
+@api_view(['POST'])
 @permission_classes([IsAuthenticated])
-def update_application_status(request, application_id):
+def bulk_update_application_status(request):
     """
-    Update an application's status and send email notification to the applicant
-    if they have an email address.
+    Move many applications to one status.
+
+    Body: {"application_ids": [...], "status": "...", "feedback": "..." (optional)}
+    Only applications of the user's own job offers (any, for staff) are
+    changed. Each id gets its own result; see transitions.bulk_transition.
     """
     try:
-        # Check if the user has permission to update application status
-        # Only admins and employees should be able to update application status
-        if request.user.role not in ['admin', 'employee']:
+        new_status = request.data.get('status')
+        if new_status not in EMPLOYER_STATUSES:
             return Response(
-                {"error": "You don't have permission to update application status"},
-                status=status.HTTP_403_FORBIDDEN
+                {"error": f"Invalid status. Allowed values are: {', '.join(EMPLOYER_STATUSES)}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get the application
-        application = Application.objects.get(id=application_id)
-        
-        # Get the new status from request data
-        new_status = request.data.get('status')
-        if not new_status:
+        application_ids = request.data.get('application_ids')
+        if (not isinstance(application_ids, list) or not application_ids
+                or not all(isinstance(application_id, int) for application_id in application_ids)):
             return Response(
-                {"error": "Status is required"},
+                {"error": "application_ids must be a non-empty list of application ids"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Validate the status
-        valid_statuses = [status[0] for status in Application.STATUS_CHOICES]
-        if new_status not in valid_statuses:
+        # Keep the first occurrence of each id, in request order
+        application_ids = list(dict.fromkeys(application_ids))
+        if len(application_ids) > MAX_BULK_APPLICATIONS:
             return Response(
-                {"error": f"Invalid status. Allowed values are: {', '.join(valid_statuses)}"},
+                {"error": f"At most {MAX_BULK_APPLICATIONS} applications can be updated at once"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get optional feedback
-        feedback = request.data.get('feedback', '')
-        
-        # Update the application
-        application.status = new_status
-        application.feedback = feedback
-        application.reviewed_by = request.user
-        application.reviewed_at = timezone.now()
-        application.save()
-        
-        # Check if the applicant has an email address
-        applicant_user = application.user
-        if applicant_user.email:
-            # Send email notification based on the status
-            job_title = application.job_offer.title
-            
-            # Define email templates based on status
-            email_templates = {
-                'shortlisted': {
-                    'subject': f"Congratulations! You've been shortlisted for {job_title}",
-                    'message': f"""Congratulations!
-                    
-You have been shortlisted for the position of {job_title}. 
-This is a significant step in your application process. 
-We will contact you soon with more details about the next steps.
-
-{feedback if feedback else ''}
-
-Best regards,
-The Recruitment Team
-"""
-                },
-                'accepted': {
-                    'subject': f"Congratulations! Your application for {job_title} has been accepted",
-                    'message': f"""Congratulations!
-                    
-We are pleased to inform you that your application for {job_title} has been accepted.
-We believe your skills and experience make you an excellent fit for this position.
-
-{feedback if feedback else ''}
-
-Best regards,
-The Recruitment Team
-"""
-                },
-                'rejected': {
-                    'subject': f"Update on your application for {job_title}",
-                    'message': f"""Dear Applicant,
-                    
-Thank you for your interest in the {job_title} position. After careful consideration,
-we regret to inform you that we have decided to pursue other candidates whose qualifications
-better match our current needs.
-
-{feedback if feedback else ''}
-
-We encourage you to apply for future positions that match your skills and experience.
-
-Best regards,
-The Recruitment Team
-"""
-                },
-                'reviewing': {
-                    'subject': f"Your application for {job_title} is being reviewed",
-                    'message': f"""Dear Applicant,
-                    
-Your application for {job_title} is currently under review.
-We appreciate your patience during this process.
-
-{feedback if feedback else ''}
-
-Best regards,
-The Recruitment Team
-"""
-                }
-            }
-            
-            # If there's a template for the status, send the email
-            if new_status in email_templates:
-                template = email_templates[new_status]
-                try:
-                    send_mail(
-                        subject=template['subject'],
-                        message=template['message'],
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[applicant_user.email],
-                        fail_silently=False,
-                    )
-                    print(f"Email notification sent to {applicant_user.email} for application {application_id}")
-                except Exception as e:
-                    print(f"Failed to send email notification: {str(e)}")
+        results = bulk_transition(request.user, application_ids, new_status, request.data.get('feedback'))
+        updated = sum(1 for result in results if result['result'] == 'updated')
         
-        # Return the updated application
-        serializer = ApplicationSerializer(application)
-        return Response(serializer.data)
+        return Response({
+            'message': f'{updated} application(s) updated to {new_status}',
+            'status': new_status,
+            'updated': updated,
+            'results': results
+        }, status=status.HTTP_200_OK)
     
-    except Application.DoesNotExist:
-        return Response(
-            {"error": "Application not found"},
-            status=status.HTTP_404_NOT_FOUND
-        )
     except Exception as e:
-        print(f"Error updating application status: {str(e)}")
+        logger.exception(f"Error bulk updating application status: {str(e)}")
         return Response(
-            {"error": f"An error occurred: {str(e)}"},
+            {"error": "An error occurred while updating the applications"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
-        
-        
-        
\ No newline at end of file
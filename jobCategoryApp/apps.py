@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class JobcategoryappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jobCategoryApp'
+
+    def ready(self):
+        from backend.response_cache import track_model_versions
+        track_model_versions(self.get_model('JobCategory'), self.get_model('JobType'))
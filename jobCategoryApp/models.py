@@ -7,6 +7,7 @@ class JobCategory(models.Model):
     description = models.TextField(blank=True, null=True)
     created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='job_categories')
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name
@@ -19,6 +20,7 @@ class JobType(models.Model):
     description = models.TextField(blank=True, null=True)
     created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='job_types')
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -1,3 +1,116 @@
-from django.test import TestCase
+import tempfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.response_cache import bump_version, get_versions
+from userApp.models import CustomUser
+from .models import JobCategory
+
+
+SHARED_CACHE_DIR = tempfile.mkdtemp(prefix='anaweza-cache-')
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': SHARED_CACHE_DIR,
+}})
+class CachedCategoryListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(phone_number='0780000001', role='admin', password='secret')
+        JobCategory.objects.create(name='Engineering', created_by=self.user)
+
+    def test_matching_etag_gets_304(self):
+        first = self.client.get('/category/categories/')
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        second = self.client.get('/category/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], etag)
+
+    def test_write_changes_etag_and_body(self):
+        etag = self.client.get('/category/categories/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            JobCategory.objects.create(name='Design', created_by=self.user)
+
+        response = self.client.get('/category/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual({category['name'] for category in response.data}, {'Engineering', 'Design'})
+
+    def test_bump_after_queryset_update(self):
+        etag = self.client.get('/category/categories/')['ETag']
+        JobCategory.objects.update(name='Renamed')
+        bump_version(JobCategory)
+
+        response = self.client.get('/category/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['name'], 'Renamed')
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': SHARED_CACHE_DIR,
+}})
+class VersionBumpTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(phone_number='0780000003', role='admin', password='secret')
+
+    def test_bumped_once_committed(self):
+        before = get_versions([JobCategory])
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            JobCategory.objects.create(name='Engineering', created_by=self.user)
+        self.assertEqual(get_versions([JobCategory]), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_versions([JobCategory]), before)
+
+    def test_users_only_bump_on_shown_fields(self):
+        user = CustomUser.objects.get(id=self.user.id)
+        before = get_versions([CustomUser])
+        with self.captureOnCommitCallbacks(execute=True):
+            user.set_password('changed')
+            user.save()
+            user.last_login = timezone.now()
+            user.save(update_fields=['last_login'])
+        self.assertEqual(get_versions([CustomUser]), before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.email = 'new@example.com'
+            user.save()
+        self.assertNotEqual(get_versions([CustomUser]), before)
+
+
+class ProcessLocalCacheTests(TestCase):
+    """
+    Without a shared cache (the default LocMem) ETags come from the database stamp
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(phone_number='0780000002', role='admin', password='secret')
+        self.category = JobCategory.objects.create(name='Engineering', created_by=self.user)
+
+    def test_matching_etag_gets_304(self):
+        etag = self.client.get('/category/categories/')['ETag']
+        self.assertEqual(self.client.get('/category/categories/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_writes_of_other_processes_change_the_etag(self):
+        etag = self.client.get('/category/categories/')['ETag']
+        # No signal reaches this process; only the row changes
+        JobCategory.objects.filter(id=self.category.id).update(name='Renamed', updated_at=timezone.now())
+
+        response = self.client.get('/category/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['name'], 'Renamed')
+        etag = response['ETag']
+
+        JobCategory.objects.filter(id=self.category.id).delete()
+        response = self.client.get('/category/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.data), (200, []))
@@ -6,11 +6,14 @@ from .models import JobCategory, JobType
 from .serializers import JobCategorySerializer, JobTypeSerializer
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
+from backend.response_cache import cached_response
+from userApp.models import CustomUser
 
 # Job Category Views
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('job_categories', [JobCategory, CustomUser])
 def list_job_categories(request):
     job_categories = JobCategory.objects.all()
     serializer = JobCategorySerializer(job_categories, many=True, context={'request': request})
@@ -121,6 +124,7 @@ def create_job_type(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('job_types', [JobType, CustomUser])
 def list_job_types(request):
     job_types = JobType.objects.all()
     serializer = JobTypeSerializer(job_types, many=True, context={'request': request})
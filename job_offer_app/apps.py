@@ -8,3 +8,5 @@ class JobOfferAppConfig(AppConfig):
     
     def ready(self):
         import job_offer_app.signals  # Import signals
+        from backend.response_cache import track_model_versions
+        track_model_versions(self.get_model('JobOffer'))
@@ -0,0 +1,91 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Min
+from django.db.models.functions import Trim
+from backend.response_cache import version_stamp
+from jobCategoryApp.models import JobCategory, JobType
+from .filters import facet_filter, location_key, parse_offer_filters
+from .models import JobOffer
+from .salary import filter_by_salary
+
+
+# Facet name -> (grouped column or expression, label column)
+FACET_COLUMNS = {
+    'job_category': ('job_category_id', 'job_category__name'),
+    'job_type': ('job_type_id', 'job_type__name'),
+    'experience_level': ('experience_level', None),
+    'offer_type': ('offer_type', None),
+    'status': ('status', None),
+    'location': (location_key, Trim('location')),
+}
+
+
+def compute_job_offer_facets(params):
+    """
+    Bucket counts of every facet for the given filters, one GROUP BY per facet.
+
+    Each facet is counted with the filters of the other facets only, so the
+    client can see how many offers it would get by picking another value of a
+    facet it already filters on.
+    """
+    selected = parse_offer_filters(params)
+    queryset = filter_by_salary(JobOffer.objects.all(), params).order_by()
+    filters = {name: facet_filter(name, values) for name, values in selected.items()}
+
+    total = queryset
+    for query in filters.values():
+        total = total.filter(query)
+
+    choices = {
+        'experience_level': dict(JobOffer.EXPERIENCE_LEVEL_CHOICES),
+        'offer_type': dict(JobOffer.OFFER_TYPE_CHOICES),
+        'status': dict(JobOffer.STATUS_CHOICES),
+    }
+    facets = {}
+    for name, (column, label) in FACET_COLUMNS.items():
+        rows = queryset
+        for other, query in filters.items():
+            if other != name:
+                rows = rows.filter(query)
+        annotations = {'count': Count('id')}
+        if label is not None:
+            annotations['label'] = Min(label)
+        rows = rows.values(key=column() if callable(column) else F(column)).annotate(**annotations)
+
+        buckets = [
+            {
+                'value': row['key'],
+                'label': choices[name].get(row['key'], row['key']) if name in choices else row['label'],
+                'count': row['count'],
+                'selected': row['key'] in selected.get(name, ()),
+            }
+            for row in rows
+        ]
+        buckets.sort(key=lambda bucket: (-bucket['count'], str(bucket['label'])))
+        facets[name] = buckets
+
+    return {'total': total.count(), 'facets': facets}
+
+
+def get_job_offer_facets(params):
+    """
+    Cached compute_job_offer_facets, keyed by the version_stamp of JobOffer,
+    JobCategory and JobType
+    """
+    relevant = sorted(
+        (name, params.get(name)) for name in (
+            'status', 'offer_type', 'experience_level', 'experience', 'category',
+            'job_category', 'job_type', 'type', 'location', 'salary_gte', 'salary_lte',
+        ) if params.get(name)
+    )
+    digest = hashlib.md5(json.dumps(relevant).encode('utf-8')).hexdigest()
+    key = f'job_offer_facets:{version_stamp([JobOffer, JobCategory, JobType])}:{digest}'
+
+    result = cache.get(key)
+    if result is None:
+        result = compute_job_offer_facets(params)
+        cache.set(key, result, settings.RESPONSE_CACHE_TIMEOUT)
+    return result
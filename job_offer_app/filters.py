@@ -0,0 +1,98 @@
+from django.core.exceptions import ValidationError
+from django.db.models import CharField, Q
+from django.db.models.functions import Lower, Trim
+from django.db.models.lookups import In
+from .models import JobOffer
+from .salary import filter_by_salary
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _parse_ids(value, name):
+    try:
+        return [int(item) for item in _split(value)]
+    except ValueError:
+        raise ValidationError(f"{name} must be a comma-separated list of IDs.")
+
+
+def _parse_choices(value, name, choices):
+    allowed = [choice[0] for choice in choices]
+    values = _split(value)
+    for item in values:
+        if item not in allowed:
+            raise ValidationError(f"Invalid {name} '{item}'. Must be one of {allowed}")
+    return values
+
+
+def normalize_location(value):
+    """
+    Same normalization as location_key(), for values given in query parameters
+    """
+    return (value or '').strip(' ').lower()
+
+
+def location_key():
+    """
+    Location as filtered and grouped on: trimmed and lowercased in SQL
+    """
+    return Lower(Trim('location'), output_field=CharField())
+
+
+def parse_offer_filters(params):
+    """
+    Read the facet filters from query parameters.
+    Returns: {facet name: list of selected values}, only for facets present
+    """
+    selected = {}
+
+    if params.get('status'):
+        selected['status'] = _parse_choices(params['status'], 'status', JobOffer.STATUS_CHOICES)
+
+    if params.get('offer_type'):
+        selected['offer_type'] = _parse_choices(params['offer_type'], 'offer_type', JobOffer.OFFER_TYPE_CHOICES)
+
+    experience = params.get('experience_level') or params.get('experience')
+    if experience:
+        selected['experience_level'] = _parse_choices(
+            experience, 'experience_level', JobOffer.EXPERIENCE_LEVEL_CHOICES
+        )
+
+    category = params.get('category') or params.get('job_category')
+    if category:
+        selected['job_category'] = _parse_ids(category, 'category')
+
+    job_type = params.get('job_type') or params.get('type')
+    if job_type:
+        selected['job_type'] = _parse_ids(job_type, 'job_type')
+
+    if params.get('location'):
+        selected['location'] = [normalize_location(item) for item in _split(params['location'])]
+
+    return selected
+
+
+def facet_filter(name, values):
+    """
+    Q object restricting job offers to the selected values of one facet
+    """
+    if name in ('job_category', 'job_type'):
+        return Q(**{f'{name}_id__in': values})
+    if name == 'location':
+        return Q(In(location_key(), values))
+    return Q(**{f'{name}__in': values})
+
+
+def filter_job_offers(queryset, params):
+    """
+    Apply the job offer listing filters taken from query parameters.
+    Every filter accepts a single value or a comma-separated list.
+
+    Supported parameters: status, offer_type, experience_level, category, job_type,
+    location, salary_gte, salary_lte
+    """
+    for name, values in parse_offer_filters(params).items():
+        queryset = queryset.filter(facet_filter(name, values))
+
+    return filter_by_salary(queryset, params)
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from job_offer_app.models import JobOffer
+from job_offer_app.salary import salary_bounds, SALARY_FIELDS
+from job_seeker.models import JobSeeker
+
+
+class Command(BaseCommand):
+    help = 'Fill salary_min / salary_max / salary_currency from salary_range for job offers and job seekers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows parsed and written per transaction',
+        )
+        parser.add_argument(
+            '--model',
+            choices=['all', 'offers', 'seekers'],
+            default='all',
+            help='Which table to backfill',
+        )
+        parser.add_argument(
+            '--only-missing',
+            action='store_true',
+            help='Skip rows whose salary_min is already filled',
+        )
+
+    def handle(self, *args, **options):
+        models = {
+            'offers': [JobOffer],
+            'seekers': [JobSeeker],
+            'all': [JobOffer, JobSeeker],
+        }[options['model']]
+
+        for model in models:
+            updated = self.backfill(model, options['batch_size'], options['only_missing'])
+            self.stdout.write(
+                self.style.SUCCESS(f'Updated salary columns of {updated} {model._meta.verbose_name_plural}')
+            )
+
+    def backfill(self, model, batch_size, only_missing):
+        queryset = model.objects.exclude(salary_range__isnull=True).exclude(salary_range='')
+        if only_missing:
+            queryset = queryset.filter(salary_min__isnull=True)
+
+        updated = 0
+        last_id = 0
+        while True:
+            # Walk the table by primary key so every batch is an indexed range scan
+            batch = list(
+                queryset.filter(id__gt=last_id)
+                .order_by('id')
+                .only('id', 'salary_range', *SALARY_FIELDS)[:batch_size]
+            )
+            if not batch:
+                break
+
+            changed = []
+            for row in batch:
+                bounds = salary_bounds(row.salary_range)
+                if bounds != (row.salary_min, row.salary_max, row.salary_currency):
+                    row.salary_min, row.salary_max, row.salary_currency = bounds
+                    changed.append(row)
+
+            if changed:
+                with transaction.atomic():
+                    model.objects.bulk_update(changed, SALARY_FIELDS)
+
+            updated += len(changed)
+            last_id = batch[-1].id
+            self.stdout.write(f'{model.__name__}: processed up to id {last_id}')
+
+        return updated
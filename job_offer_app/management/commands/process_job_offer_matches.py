@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from job_offer_app.matching import (
+    DEFAULT_BATCH_SIZE, MAX_ATTEMPTS, claim_task, claimable_tasks, process_match_task,
+)
+from job_offer_app.models import JobOfferMatchTask
+
+
+class Command(BaseCommand):
+    help = 'Queue emails to job seekers matching newly created job offers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Job seekers queued per transaction',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='Give up on a task after this many failed runs',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new tasks instead of exiting when the queue is empty',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between polls with --loop',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.run_once(options['batch_size'], options['max_attempts'])
+            if not options['loop']:
+                break
+            if not processed:
+                time.sleep(options['sleep'])
+
+    def run_once(self, batch_size, max_attempts):
+        task_ids = list(
+            claimable_tasks(max_attempts).order_by('created_at').values_list('id', flat=True)
+        )
+
+        processed = 0
+        for task_id in task_ids:
+            if not claim_task(task_id, max_attempts):
+                continue
+            task = JobOfferMatchTask.objects.select_related('job_offer').get(id=task_id)
+            try:
+                queued = process_match_task(task, batch_size=batch_size, stdout=self.stdout)
+            except Exception as e:
+                task.status = 'failed'
+                task.attempts += 1
+                task.last_error = str(e)
+                task.save(update_fields=['status', 'attempts', 'last_error', 'updated_at'])
+                self.stderr.write(f'Match task {task_id} failed: {e}')
+                continue
+            processed += 1
+            self.stdout.write(self.style.SUCCESS(f'Queued {queued} emails for job offer {task.job_offer_id}'))
+
+        return processed
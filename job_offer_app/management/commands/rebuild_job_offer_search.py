@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from job_offer_app.models import JobOffer
+from job_offer_app.search import offer_index, update_search_vector, uses_database_search
+
+
+class Command(BaseCommand):
+    help = 'Fill JobOffer.search_vector on PostgreSQL (run once after migrating, or after changing search weights)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of job offers updated per statement',
+        )
+        parser.add_argument(
+            '--only-missing',
+            action='store_true',
+            help='Skip job offers that already have a search vector',
+        )
+
+    def handle(self, *args, **options):
+        if not uses_database_search():
+            offer_index.reset()
+            offer_index.build()
+            self.stdout.write(self.style.SUCCESS(f'Indexed {len(offer_index.doc_lengths)} job offers in process'))
+            return
+
+        queryset = JobOffer.objects.all()
+        if options['only_missing']:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                queryset.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            updated += update_search_vector(JobOffer.objects.filter(id__in=ids))
+            last_id = ids[-1]
+            self.stdout.write(f'Updated search vectors up to job offer id {last_id}')
+
+        self.stdout.write(self.style.SUCCESS(f'Updated search vectors of {updated} job offers'))
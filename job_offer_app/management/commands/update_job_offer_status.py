@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from job_offer_app.models import JobOffer
+from backend.response_cache import bump_version
 
 class Command(BaseCommand):
     help = 'Update job offer statuses based on deadlines'
@@ -12,7 +13,11 @@ class Command(BaseCommand):
             status__in=['active', 'draft']
         )
         
-        updated_count = expired_offers.update(status='expired')
+        # updated_at moves the database stamp used without a shared cache
+        updated_count = expired_offers.update(status='expired', updated_at=timezone.now())
+        if updated_count:
+            # queryset.update() sends no post_save, so invalidate cached offer lists here
+            bump_version(JobOffer)
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,149 @@
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape
+from datetime import timedelta
+from job_seeker.models import JobSeeker, JobSeekerSkill, normalize_skill_name
+from mailApp.mail_queue import enqueue_emails, new_email
+from .models import JobOfferMatchTask, JobOfferNotificationLog
+
+
+SITE_URL = 'https://www.anaweza.com'
+DEFAULT_BATCH_SIZE = 200
+MAX_ATTEMPTS = 5
+# A running task untouched for this long is assumed to belong to a dead worker
+STALE_AFTER = timedelta(minutes=15)
+
+# Stands in for the job seeker's first name while the template is rendered
+FIRST_NAME_PLACEHOLDER = '__ANAWEZA_FIRST_NAME__'
+
+
+class OfferEmail:
+    """
+    Subject, plain text and HTML of a job notification, rendered once per offer
+    and personalised per recipient with a plain string substitution.
+    """
+
+    def __init__(self, job_offer):
+        self.subject = f"New Job Opportunity Matching Your Skills: {job_offer.title}"
+        self.html = render_to_string('job_notification_email.html', {
+            'job_seeker': {'first_name': FIRST_NAME_PLACEHOLDER},
+            'job_offer': job_offer,
+            'site_url': SITE_URL,
+        })
+        self.text = f"""
+    Hello {FIRST_NAME_PLACEHOLDER},
+
+    A new job opportunity matching your skills has been posted on Anaweza:
+
+    Job Title: {job_offer.title}
+    Company: {job_offer.company_name or 'N/A'}
+    Location: {job_offer.location}
+    Deadline: {job_offer.deadline}
+
+    Visit {SITE_URL} to apply!
+    """
+
+    def email_for(self, job_seeker):
+        """
+        An unsaved OutgoingEmail for job_seeker; see mailApp.mail_queue.enqueue_emails
+        """
+        first_name = job_seeker.first_name or ''
+        return new_email(
+            self.subject,
+            self.text.replace(FIRST_NAME_PLACEHOLDER, first_name),
+            job_seeker.user.email,
+            html_body=self.html.replace(FIRST_NAME_PLACEHOLDER, escape(first_name)),
+        )
+
+
+def enqueue_match_task(job_offer):
+    task, _ = JobOfferMatchTask.objects.get_or_create(job_offer=job_offer)
+    return task
+
+
+def claimable_tasks(max_attempts=MAX_ATTEMPTS):
+    """
+    Pending tasks, failed tasks that may be retried, and running tasks whose
+    worker stopped reporting progress
+    """
+    stale = timezone.now() - STALE_AFTER
+    return JobOfferMatchTask.objects.filter(
+        Q(status='pending')
+        | Q(status='failed', attempts__lt=max_attempts)
+        | Q(status='running', updated_at__lt=stale)
+    )
+
+
+def claim_task(task_id, max_attempts=MAX_ATTEMPTS):
+    """
+    Move a task to running. Returns False when another worker got it first.
+    """
+    return claimable_tasks(max_attempts).filter(id=task_id).update(
+        status='running', updated_at=timezone.now()
+    ) == 1
+
+
+def process_match_task(task, batch_size=DEFAULT_BATCH_SIZE, stdout=None):
+    """
+    Queue an email for every active job seeker with a skill the offer requires.
+
+    Candidates come from the JobSeekerSkill index (normalized_name), walked
+    by job seeker id in batches of batch_size. Each batch's emails, its
+    JobOfferNotificationLog rows and the task's last id are written in one
+    transaction, so a retry neither restarts from the beginning nor queues
+    anyone twice. The send_queued_emails worker delivers the emails.
+
+    Returns: number of emails queued
+    """
+    job_offer = task.job_offer
+    requirements = {
+        normalize_skill_name(requirement)
+        for requirement in (job_offer.requirements or [])
+        if str(requirement).strip()
+    }
+    if not requirements:
+        task.status = 'done'
+        task.save(update_fields=['status', 'updated_at'])
+        return 0
+
+    email = OfferEmail(job_offer)
+    candidates = (
+        JobSeeker.objects.filter(user__status=True)
+        .exclude(user__email__isnull=True).exclude(user__email='')
+        .filter(id__in=JobSeekerSkill.objects.filter(normalized_name__in=requirements).values('job_seeker_id'))
+        .select_related('user')
+        .only('id', 'first_name', 'user__email')
+        .order_by('id')
+    )
+
+    queued = 0
+    while True:
+        batch = list(candidates.filter(id__gt=task.last_job_seeker_id)[:batch_size])
+        if not batch:
+            break
+
+        already_sent = set(
+            JobOfferNotificationLog.objects.filter(
+                job_offer=job_offer, job_seeker_id__in=[seeker.id for seeker in batch]
+            ).values_list('job_seeker_id', flat=True)
+        )
+        recipients = [seeker for seeker in batch if seeker.id not in already_sent]
+
+        with transaction.atomic():
+            enqueue_emails([email.email_for(seeker) for seeker in recipients])
+            JobOfferNotificationLog.objects.bulk_create(
+                [JobOfferNotificationLog(job_offer=job_offer, job_seeker=seeker) for seeker in recipients],
+                ignore_conflicts=True,
+            )
+            task.last_job_seeker_id = batch[-1].id
+            task.save(update_fields=['last_job_seeker_id', 'updated_at'])
+        queued += len(recipients)
+        if stdout:
+            stdout.write(f'Offer {job_offer.id}: {len(recipients)} emails queued, up to job seeker {task.last_job_seeker_id}')
+
+    task.status = 'done'
+    task.last_error = ''
+    task.save(update_fields=['status', 'last_error', 'updated_at'])
+    return queued
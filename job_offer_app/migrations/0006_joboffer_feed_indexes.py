@@ -0,0 +1,21 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_offer_app', '0005_joboffer_employees_needed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['-created_at', '-id'], name='joboffer_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='joboffer_status_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_seeker', '0012_salary_bounds'),
+        ('job_offer_app', '0007_salary_bounds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobOfferNotificationLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('job_offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_logs', to='job_offer_app.joboffer')),
+                ('job_seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_offer_notifications', to='job_seeker.jobseeker')),
+            ],
+            options={
+                'unique_together': {('job_offer', 'job_seeker')},
+            },
+        ),
+        migrations.CreateModel(
+            name='JobOfferMatchTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('last_job_seeker_id', models.PositiveBigIntegerField(default=0)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job_offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='match_task', to='job_offer_app.joboffer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='joboffermatch_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:41
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # GIN index for full-text search; other databases use the in-process index
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS joboffer_search_vector_idx '
+            'ON job_offer_app_joboffer USING gin (search_vector)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS joboffer_search_vector_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_offer_app', '0008_job_offer_match_tasks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joboffer',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
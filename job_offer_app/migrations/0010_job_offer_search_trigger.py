@@ -0,0 +1,52 @@
+from django.db import migrations
+
+
+# Must produce the same document as search.search_vector_expression()
+CREATE_TRIGGER = '''
+CREATE OR REPLACE FUNCTION joboffer_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.company_name, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.location, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.requirements::text, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(NEW.responsibilities::text, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS joboffer_search_vector_trigger ON job_offer_app_joboffer;
+CREATE TRIGGER joboffer_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, company_name, location, requirements, responsibilities, description
+    ON job_offer_app_joboffer
+    FOR EACH ROW EXECUTE PROCEDURE joboffer_search_vector_update();
+'''
+
+DROP_TRIGGER = '''
+DROP TRIGGER IF EXISTS joboffer_search_vector_trigger ON job_offer_app_joboffer;
+DROP FUNCTION IF EXISTS joboffer_search_vector_update();
+'''
+
+
+def create_search_trigger(apps, schema_editor):
+    # search_vector is written by the same INSERT / UPDATE as the offer; other
+    # databases use the in-process index
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_offer_app', '0009_job_offer_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -1,9 +1,11 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 from userApp.models import CustomUser
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from jobCategoryApp.models import JobType, JobCategory
+from .salary import sync_salary_fields
 
 class JobOffer(models.Model):
     EXPERIENCE_LEVEL_CHOICES = [
@@ -38,6 +40,10 @@ class JobOffer(models.Model):
     job_category = models.ForeignKey(JobCategory, on_delete=models.CASCADE, related_name='job_category', default=1)
     experience_level = models.CharField(max_length=20, choices=EXPERIENCE_LEVEL_CHOICES)
     salary_range = models.CharField(max_length=100, null=True, blank=True)
+    # Parsed from salary_range on save (see salary.py); NULL max means open-ended
+    salary_min = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    salary_max = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    salary_currency = models.CharField(max_length=3, blank=True, default='')
     
     # Detailed Information (Stored as JSON lists)
     description = models.TextField()
@@ -52,6 +58,8 @@ class JobOffer(models.Model):
     created_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='job_offers')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted full-text document, maintained on PostgreSQL only (see search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         if self.offer_type == 'company':
@@ -62,6 +70,10 @@ class JobOffer(models.Model):
         if self.offer_type == 'company' and not self.company_name:
             raise models.ValidationError({'company_name': 'Company name is required for company job offers'})
 
+    def save(self, *args, **kwargs):
+        kwargs['update_fields'] = sync_salary_fields(self, kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
+
     def update_status_based_on_deadline(self):
         """Update status based on deadline"""
         today = timezone.now().date()
@@ -72,6 +84,12 @@ class JobOffer(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the public feed
+            models.Index(fields=['-created_at', '-id'], name='joboffer_feed_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='joboffer_status_feed_idx'),
+            models.Index(fields=['salary_min', 'salary_max'], name='joboffer_salary_idx'),
+        ]
 
 # Signal to handle status updates before saving
 @receiver(pre_save, sender=JobOffer)
@@ -80,3 +98,48 @@ def check_deadline_status(sender, instance, **kwargs):
         today = timezone.now().date()
         if instance.deadline < today:
             instance.status = 'expired'
+
+
+class JobOfferMatchTask(models.Model):
+    """
+    Background job that emails job seekers matching a newly created offer.
+    Processed in chunks by the process_job_offer_matches management command.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    job_offer = models.OneToOneField(JobOffer, on_delete=models.CASCADE, related_name='match_task')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Highest JobSeeker id already handled, so a retried task resumes where it stopped
+    last_job_seeker_id = models.PositiveBigIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Match task for {self.job_offer_id} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='joboffermatch_status_idx'),
+        ]
+
+
+class JobOfferNotificationLog(models.Model):
+    """
+    One row per job seeker already emailed about a job offer
+    """
+    job_offer = models.ForeignKey(JobOffer, on_delete=models.CASCADE, related_name='notification_logs')
+    job_seeker = models.ForeignKey('job_seeker.JobSeeker', on_delete=models.CASCADE, related_name='job_offer_notifications')
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Offer {self.job_offer_id} sent to seeker {self.job_seeker_id}"
+
+    class Meta:
+        unique_together = ['job_offer', 'job_seeker']
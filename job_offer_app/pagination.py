@@ -0,0 +1,81 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, pk):
+    """
+    Encode the (timestamp, id) of the last row of a page into an opaque cursor
+    """
+    raw = json.dumps([value.isoformat(), pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+    Returns: (datetime, int)
+    """
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        timestamp = parse_datetime(value)
+        if timestamp is None:
+            raise ValueError(value)
+        return timestamp, int(pk)
+    except (TypeError, ValueError, UnicodeError):
+        raise InvalidCursor("Invalid cursor.")
+
+
+def get_page_size(params, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Read the page_size query parameter, clamped to [1, maximum]
+    """
+    value = params.get('page_size')
+    if not value:
+        return default
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        raise InvalidCursor("page_size must be a positive integer.")
+    return max(1, min(page_size, maximum))
+
+
+def paginate_keyset(queryset, params, field='created_at', default_page_size=DEFAULT_PAGE_SIZE):
+    """
+    Keyset pagination over (field, id) in descending order.
+
+    Instead of OFFSET, every page after the first continues strictly after the
+    last row of the previous one, so the cost of a page does not grow with the
+    size of the table as long as an index on (field, id) exists.
+
+    Returns: (rows, next_cursor, page_size)
+    """
+    page_size = get_page_size(params, default=default_page_size)
+    queryset = queryset.order_by(f'-{field}', '-id')
+
+    cursor = params.get('cursor')
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk})
+        )
+
+    # Fetch one extra row to know whether another page exists
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+
+    return rows, next_cursor, page_size
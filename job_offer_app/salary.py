@@ -0,0 +1,183 @@
+import logging
+from decimal import Decimal, InvalidOperation
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+import re
+
+logger = logging.getLogger(__name__)
+
+
+CURRENCY_ALIASES = [
+    ('RWF', ['frw', 'rwf']),
+    ('USD', ['usd', '$', 'dollar']),
+    ('EUR', ['€', 'euros', 'eur']),
+    ('GBP', ['£', 'pounds', 'gbp']),
+]
+
+
+def parse_salary_range(salary_range_str):
+    """
+    Parse a salary range string into minimum and maximum values.
+
+    Handles various formats:
+    - Fixed number: "1000", "1,000"
+    - Range with hyphen: "1000-2000", "1,000-100,000"
+    - Range with currency: "1000 frw", "1,000 frw - 100,000 frw"
+    - Mixed formats: "1000 - 100,000", "1,000frw-100,000frw"
+
+    Returns:
+    tuple: (min_value, max_value) as floats
+    """
+    if not salary_range_str:
+        return (0, float('inf'))
+
+    # Convert to lowercase for consistent processing
+    salary_str = salary_range_str.lower().strip()
+
+    # Step 1: Remove all currency indicators (frw, $, €, £, etc.)
+    currency_patterns = ['frw', 'rwf', 'usd', '$', '€', '£', 'dollar', 'euros', 'pounds']
+    for pattern in currency_patterns:
+        salary_str = salary_str.replace(pattern, '')
+
+    # Step 2: Remove all spaces
+    salary_str = salary_str.replace(' ', '')
+
+    # Step 3: Remove all commas in numbers
+    salary_str = salary_str.replace(',', '')
+
+    # Step 4: Check if it's a range (contains hyphen or dash)
+    if '-' in salary_str:
+        try:
+            # Split by hyphen
+            parts = salary_str.split('-')
+
+            # Extract min and max values
+            min_str = parts[0].strip()
+            max_str = parts[1].strip()
+
+            # Convert to float
+            min_value = float(min_str) if min_str else 0
+            max_value = float(max_str) if max_str else float('inf')
+
+            return (min_value, max_value)
+        except (ValueError, IndexError) as e:
+            logger.debug("Error parsing salary range with hyphen: %s, error: %s", salary_range_str, e)
+            # Fall back to using regex for more complex cases
+
+    # Step 5: If not a clear range or the above parsing failed, try regex to extract numbers
+    number_pattern = r'\d+\.?\d*'
+    numbers = re.findall(number_pattern, salary_str)
+
+    if len(numbers) == 0:
+        # No numbers found, return default
+        logger.debug("No numbers found in salary string: %s", salary_range_str)
+        return (0, float('inf'))
+    elif len(numbers) == 1:
+        # Single number - use as min and max
+        value = float(numbers[0])
+        return (value, value)
+    else:
+        # Multiple numbers - assume first is min, last is max
+        min_value = float(numbers[0])
+        max_value = float(numbers[-1])
+        return (min_value, max_value)
+
+
+def detect_salary_currency(salary_range_str):
+    """
+    Return the ISO code of the first currency mentioned in a salary string, or ''
+    """
+    if not salary_range_str:
+        return ''
+    salary_str = salary_range_str.lower()
+    for code, aliases in CURRENCY_ALIASES:
+        if any(alias in salary_str for alias in aliases):
+            return code
+    return ''
+
+
+# salary_min / salary_max are DecimalField(max_digits=14, decimal_places=2)
+SALARY_LIMIT = Decimal(10) ** 12
+
+
+def _in_column_range(value):
+    return value.is_finite() and abs(value) < SALARY_LIMIT
+
+
+def _to_decimal(value):
+    """
+    A parsed bound as stored, or None when it is open-ended or does not fit the columns
+    """
+    if value is None:
+        return None
+    try:
+        value = Decimal(str(value))
+        if not value.is_finite():
+            return None
+        value = value.quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None
+    return value if _in_column_range(value) else None
+
+
+def salary_bounds(salary_range_str):
+    """
+    Normalize a free-text salary range into the stored numeric columns.
+    An open upper bound ("50000+", "50000-") is stored as None.
+    Returns: (salary_min, salary_max, salary_currency)
+    """
+    if not salary_range_str or not re.search(r'\d', salary_range_str):
+        return None, None, detect_salary_currency(salary_range_str)
+
+    min_value, max_value = parse_salary_range(salary_range_str)
+    if '+' in salary_range_str:
+        max_value = float('inf')
+    return _to_decimal(min_value), _to_decimal(max_value), detect_salary_currency(salary_range_str)
+
+
+def filter_by_salary(queryset, params):
+    """
+    Apply salary_gte / salary_lte query parameters to a queryset of a model with
+    salary_min / salary_max columns. A row matches when its range overlaps the
+    requested one; rows without a parsed salary never match a salary filter.
+    """
+    def _param(name):
+        value = params.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            value = Decimal(str(value).replace(',', ''))
+        except InvalidOperation:
+            raise ValidationError(f"{name} must be a number.")
+        if not _in_column_range(value):
+            raise ValidationError(f"{name} must be a finite number below {SALARY_LIMIT:,}.")
+        return value
+
+    salary_gte = _param('salary_gte')
+    salary_lte = _param('salary_lte')
+
+    if salary_gte is not None:
+        queryset = queryset.filter(
+            Q(salary_max__gte=salary_gte) | Q(salary_max__isnull=True, salary_min__isnull=False)
+        )
+    if salary_lte is not None:
+        queryset = queryset.filter(salary_min__lte=salary_lte)
+    return queryset
+
+
+SALARY_FIELDS = ['salary_min', 'salary_max', 'salary_currency']
+
+
+def sync_salary_fields(instance, update_fields=None):
+    """
+    Refresh instance.salary_min / salary_max / salary_currency from its
+    salary_range before saving. Returns the update_fields to pass on to save().
+    """
+    if update_fields is not None and 'salary_range' not in update_fields:
+        return update_fields
+
+    instance.salary_min, instance.salary_max, instance.salary_currency = salary_bounds(instance.salary_range)
+
+    if update_fields is not None:
+        update_fields = set(update_fields) | set(SALARY_FIELDS)
+    return update_fields
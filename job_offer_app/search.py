@@ -0,0 +1,270 @@
+"""
+Full-text search over job offers.
+
+On PostgreSQL the weighted JobOffer.search_vector column (GIN indexed) is
+queried with websearch_to_tsquery, ranked with ts_rank and highlighted with
+ts_headline. A BEFORE INSERT / UPDATE trigger (migration 0010) computes the
+column in the same statement that writes the offer.
+
+Other databases (SQLite in development) use OfferIndex, an in-process
+inverted index built on first use and kept current one document at a time by
+the JobOffer post_save / post_delete signals once their transaction commits.
+It only sees the writes of its own process, which is what a development
+server runs as.
+"""
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils.html import escape
+from .models import JobOffer
+
+
+SEARCH_CONFIG = 'simple'
+MAX_QUERY_LENGTH = 200
+SNIPPET_WORDS = 30
+# Deepest result reachable through paging; ranking is not meant for crawling
+MAX_SEARCH_OFFSET = 1000
+
+# Fields indexed for search with their weight: (field, postgres weight, in-process weight).
+# The PostgreSQL trigger of migration 0010 repeats the fields and weights.
+SEARCH_FIELDS = [
+    ('title', 'A', 4.0),
+    ('company_name', 'B', 2.0),
+    ('location', 'B', 2.0),
+    ('requirements', 'C', 1.5),
+    ('responsibilities', 'C', 1.5),
+    ('description', 'D', 1.0),
+]
+SEARCH_FIELD_NAMES = [field for field, _, _ in SEARCH_FIELDS]
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def uses_database_search():
+    return connection.vendor == 'postgresql'
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def field_text(value):
+    """
+    Text of a search field; JSON lists are joined item by item
+    """
+    if not value:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value)
+    return str(value)
+
+
+def search_vector_expression():
+    parts = []
+    for field, weight, _ in SEARCH_FIELDS:
+        expression = F(field)
+        if field in ('requirements', 'responsibilities'):
+            expression = Cast(field, TextField())
+        parts.append(SearchVector(Coalesce(expression, Value('')), weight=weight, config=SEARCH_CONFIG))
+    vector = parts[0]
+    for part in parts[1:]:
+        vector = vector + part
+    return vector
+
+
+def update_search_vector(queryset):
+    """
+    Recompute search_vector for the offers of queryset (PostgreSQL only).
+    Saves keep it current through the trigger; this backfills existing rows.
+    """
+    return queryset.update(search_vector=search_vector_expression())
+
+
+class OfferIndex:
+    """
+    In-process inverted index: term -> {offer id: weighted term frequency}.
+    Scored with BM25 over the weighted frequencies; every query term must match.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every document; the index is built again on next use
+        """
+        with self.lock:
+            self.postings = defaultdict(dict)
+            self.doc_terms = {}
+            self.doc_lengths = {}
+            self.total_length = 0.0
+            self.built = False
+
+    def build(self):
+        with self.lock:
+            if self.built:
+                return
+            rows = JobOffer.objects.values_list('id', *SEARCH_FIELD_NAMES).order_by('id')
+            for row in rows.iterator(chunk_size=2000):
+                self._add(row[0], dict(zip(SEARCH_FIELD_NAMES, row[1:])))
+            self.built = True
+
+    def _add(self, offer_id, values):
+        frequencies = defaultdict(float)
+        for field, _, weight in SEARCH_FIELDS:
+            for term in tokenize(field_text(values.get(field))):
+                frequencies[term] += weight
+        length = sum(frequencies.values())
+        for term, frequency in frequencies.items():
+            self.postings[term][offer_id] = frequency
+        self.doc_terms[offer_id] = list(frequencies)
+        self.doc_lengths[offer_id] = length
+        self.total_length += length
+
+    def _remove(self, offer_id):
+        for term in self.doc_terms.pop(offer_id, []):
+            documents = self.postings.get(term)
+            if documents is not None:
+                documents.pop(offer_id, None)
+                if not documents:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(offer_id, 0.0)
+
+    def update(self, offer_id, values):
+        """
+        Replace the document of one offer; values: {search field: value}
+        """
+        with self.lock:
+            if self.built:
+                self._remove(offer_id)
+                self._add(offer_id, values)
+
+    def remove(self, offer_id):
+        with self.lock:
+            if self.built:
+                self._remove(offer_id)
+
+    def search(self, terms):
+        """
+        Returns: [(offer id, score)] best first
+        """
+        self.build()
+        with self.lock:
+            if not terms or not self.doc_lengths:
+                return []
+            term_postings = [self.postings.get(term, {}) for term in terms]
+            if not all(term_postings):
+                return []
+
+            count = len(self.doc_lengths)
+            average_length = self.total_length / count or 1.0
+            # Intersect starting from the rarest term
+            term_postings.sort(key=len)
+            candidates = set(term_postings[0])
+            for documents in term_postings[1:]:
+                candidates &= documents.keys()
+
+            scores = []
+            for offer_id in candidates:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[offer_id] / average_length)
+                score = 0.0
+                for documents in term_postings:
+                    frequency = documents[offer_id]
+                    idf = math.log(1 + (count - len(documents) + 0.5) / (len(documents) + 0.5))
+                    score += idf * frequency * (self.k1 + 1) / (frequency + norm)
+                scores.append((offer_id, score))
+        scores.sort(key=lambda item: (-item[1], -item[0]))
+        return scores
+
+
+offer_index = OfferIndex()
+
+
+def make_snippet(terms, *texts):
+    """
+    HTML-escaped excerpt of the first text containing a query term, with the
+    matching words wrapped in <b>, mirroring ts_headline on PostgreSQL
+    """
+    terms = set(terms)
+    for text in texts:
+        words = text.split()
+        for position, word in enumerate(words):
+            if set(tokenize(word)) & terms:
+                start = max(0, position - SNIPPET_WORDS // 3)
+                excerpt = words[start:start + SNIPPET_WORDS]
+                return ' '.join(
+                    f'<b>{escape(item)}</b>' if set(tokenize(item)) & terms else escape(item)
+                    for item in excerpt
+                )
+    return escape(' '.join(texts[0].split()[:SNIPPET_WORDS])) if texts else ''
+
+
+def _database_search(queryset, query, offset, limit):
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    ranked = list(
+        queryset.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F('search_vector'), search_query))
+        .order_by('-rank', '-id')
+        .values_list('id', 'rank')[offset:offset + limit]
+    )
+    # Headlines are computed only for the rows of the page. Control characters
+    # mark the matches so the description itself can be HTML-escaped.
+    snippets = dict(
+        JobOffer.objects.filter(id__in=[offer_id for offer_id, _ in ranked])
+        .annotate(snippet=SearchHeadline(
+            'description', search_query, config=SEARCH_CONFIG,
+            start_sel='\x02', stop_sel='\x03', max_words=SNIPPET_WORDS, min_words=SNIPPET_WORDS // 2,
+        ))
+        .values_list('id', 'snippet')
+    )
+    return [
+        (offer_id, rank, escape(snippets.get(offer_id) or '').replace('\x02', '<b>').replace('\x03', '</b>'))
+        for offer_id, rank in ranked
+    ]
+
+
+def _index_search(queryset, query, offset, limit, filtered):
+    terms = list(dict.fromkeys(tokenize(query)))
+    ranked = offer_index.search(terms)
+    if filtered:
+        # Keep only offers allowed by the filters, checking candidates in chunks
+        allowed = []
+        for start in range(0, len(ranked), 500):
+            chunk = ranked[start:start + 500]
+            ids = set(queryset.filter(id__in=[offer_id for offer_id, _ in chunk]).values_list('id', flat=True))
+            allowed.extend(item for item in chunk if item[0] in ids)
+            if len(allowed) >= offset + limit:
+                break
+        ranked = allowed
+    ranked = ranked[offset:offset + limit]
+
+    texts = {
+        row[0]: row[1:]
+        for row in JobOffer.objects.filter(id__in=[offer_id for offer_id, _ in ranked])
+        .values_list('id', 'description', 'title')
+    }
+    return [
+        (offer_id, score, make_snippet(terms, *texts.get(offer_id, ('',))))
+        for offer_id, score in ranked
+    ]
+
+
+def rank_job_offers(queryset, query, offset, limit, filtered=False):
+    """
+    Relevance-ranked ids of the offers of queryset matching query.
+    filtered tells whether queryset is narrower than all offers.
+    Returns: [(offer id, rank, snippet)]
+    """
+    query = query[:MAX_QUERY_LENGTH]
+    if uses_database_search():
+        return _database_search(queryset, query, offset, limit)
+    return _index_search(queryset, query, offset, limit, filtered)
@@ -1,12 +1,13 @@
 from rest_framework import serializers
 from .models import JobOffer
 from userApp.models import CustomUser
+from userApp.serializers import ProfilePictureSerializerMixin
 from jobCategoryApp.models import JobCategory, JobType
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ProfilePictureSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
-        fields = ['id', 'phone_number', 'email', 'role', 'status', 'created_at', 'profile_picture', 'is_active']
+        fields = ['id', 'phone_number', 'email', 'role', 'status', 'created_at', 'profile_picture', 'profile_picture_thumbnail', 'is_active']
         read_only_fields = ['id', 'created_at', 'is_active']
 
 class JobCategorySerializer(serializers.ModelSerializer):
@@ -66,4 +67,46 @@ class JobOfferSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context['request'].user
         job_offer = JobOffer.objects.create(created_by=user, **validated_data)
-        return job_offer
\ No newline at end of file
+        return job_offer
+
+
+class JobOfferCreatorSerializer(serializers.ModelSerializer):
+    """Creator info for the public feed, without the profile picture"""
+    class Meta:
+        model = CustomUser
+        fields = ['id', 'phone_number', 'email', 'role']
+
+
+class JobCategoryBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobCategory
+        fields = ['id', 'name', 'description']
+
+
+class JobTypeBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobType
+        fields = ['id', 'name', 'description']
+
+
+class JobOfferFeedSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for the paginated job offer feed.
+    Expects created_by, job_category and job_type to be loaded with select_related.
+    """
+    created_by = JobOfferCreatorSerializer(read_only=True)
+    job_category = JobCategoryBriefSerializer(read_only=True)
+    job_type = JobTypeBriefSerializer(read_only=True)
+
+    class Meta:
+        model = JobOffer
+        fields = [
+            'id', 'title', 'offer_type', 'company_name',
+            'location', 'job_type', 'job_category',
+            'experience_level', 'salary_range', 'salary_min', 'salary_max',
+            'salary_currency', 'employees_needed',
+            'description', 'requirements', 'responsibilities',
+            'benefits', 'deadline', 'status',
+            'created_by', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
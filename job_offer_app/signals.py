@@ -1,58 +1,38 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.conf import settings
 from .models import JobOffer
-from job_seeker.models import JobSeeker
+from .matching import enqueue_match_task
+from .search import SEARCH_FIELD_NAMES, offer_index, uses_database_search
+
 
 @receiver(post_save, sender=JobOffer)
 def notify_matching_job_seekers(sender, instance, created, **kwargs):
+    """
+    Queue the matching job seekers notification for a new offer.
+    The emails are sent by the process_job_offer_matches management command.
+    """
     if created:  # Only trigger for newly created JobOffer
-        job_requirements = set(instance.requirements)  # Convert requirements to a set for easier comparison
-        
-        # Find job seekers whose skills match the job requirements
-        matching_job_seekers = JobSeeker.objects.filter(
-            user__status=True,  # Only active users
-            skills__isnull=False,  # Ensure skills are not empty
-        )
-        
-        for job_seeker in matching_job_seekers:
-            seeker_skills = {skill.strip().lower() for skill in job_seeker.skills.split(',')}
-            
-            # Check if any skill matches the job requirements
-            if seeker_skills.intersection({req.lower() for req in job_requirements}):
-                send_job_notification_email(job_seeker, instance)
+        enqueue_match_task(instance)
+
 
-def send_job_notification_email(job_seeker, job_offer):
-    subject = f"New Job Opportunity Matching Your Skills: {job_offer.title}"
-    
-    # Render HTML email template (optional)
-    message = render_to_string('job_notification_email.html', {
-        'job_seeker': job_seeker,
-        'job_offer': job_offer,
-        'site_url': 'https://www.anaweza.com',
-    })
-    
-    # Plain text fallback
-    plain_message = f"""
-    Hello {job_seeker.first_name},
-    
-    A new job opportunity matching your skills has been posted on Anaweza:
-    
-    Job Title: {job_offer.title}
-    Company: {job_offer.company_name or 'N/A'}
-    Location: {job_offer.location}
-    Deadline: {job_offer.deadline}
-    
-    Visit https://www.anaweza.com to apply!
+@receiver(post_save, sender=JobOffer)
+def update_job_offer_search(sender, instance, update_fields=None, **kwargs):
+    """
+    Re-index the saved offer in the in-process index once the save commits.
+    On PostgreSQL the trigger of migration 0010 already updated search_vector.
     """
-    
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [job_seeker.user.email],  # Send to job seeker's email
-        html_message=message,
-        fail_silently=False,
-    )
\ No newline at end of file
+    if uses_database_search():
+        return
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELD_NAMES):
+        return
+    offer_id = instance.pk
+    values = {field: getattr(instance, field) for field in SEARCH_FIELD_NAMES}
+    transaction.on_commit(lambda: offer_index.update(offer_id, values))
+
+
+@receiver(post_delete, sender=JobOffer)
+def remove_job_offer_from_search(sender, instance, **kwargs):
+    if not uses_database_search():
+        offer_id = instance.pk
+        transaction.on_commit(lambda: offer_index.remove(offer_id))
@@ -1,3 +1,236 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from jobCategoryApp.models import JobCategory, JobType
+from job_seeker.models import JobSeeker
+from mailApp.models import OutgoingEmail
+from userApp.models import CustomUser
+from .facets import compute_job_offer_facets
+from .filters import filter_job_offers
+from .matching import process_match_task
+from .models import JobOffer, JobOfferNotificationLog
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, paginate_keyset
+from .salary import filter_by_salary, parse_salary_range, salary_bounds
+from .search import offer_index
+
+
+class ParseSalaryRangeTests(SimpleTestCase):
+    def test_formats(self):
+        cases = {
+            '1000': (1000, 1000),
+            '1,000': (1000, 1000),
+            '1000-2000': (1000, 2000),
+            '1,000 frw - 100,000 frw': (1000, 100000),
+            '1,000frw-100,000frw': (1000, 100000),
+            '$ 1500.50 - 2000': (1500.5, 2000),
+            '50000-': (50000, float('inf')),
+            'between 300 and 500 USD': (300, 500),
+            '': (0, float('inf')),
+            'negotiable': (0, float('inf')),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_salary_range(text), expected)
+
+
+class SalaryBoundsTests(SimpleTestCase):
+    def test_bounds_and_currency(self):
+        self.assertEqual(salary_bounds('100,000 - 200,000 RWF'), (Decimal('100000.00'), Decimal('200000.00'), 'RWF'))
+        self.assertEqual(salary_bounds('50000+ USD'), (Decimal('50000.00'), None, 'USD'))
+        self.assertEqual(salary_bounds('negotiable'), (None, None, ''))
+        self.assertEqual(salary_bounds(None), (None, None, ''))
+
+    def test_values_outside_the_columns_are_dropped(self):
+        self.assertEqual(salary_bounds('1000 - 1' + '0' * 40), (Decimal('1000.00'), None, ''))
+        self.assertEqual(salary_bounds('1' + '0' * 400), (None, None, ''))
+        self.assertEqual(salary_bounds('999999999999.999'), (None, None, ''))
+        self.assertEqual(salary_bounds('999999999999.99')[0], Decimal('999999999999.99'))
+
+
+class FilterBySalaryTests(SimpleTestCase):
+    def test_rejects_non_finite_and_oversized_values(self):
+        for value in ('NaN', 'Infinity', '-inf', 'sNaN', '1e30', 'abc'):
+            with self.subTest(value=value), self.assertRaises(ValidationError):
+                filter_by_salary(JobOffer.objects.all(), {'salary_gte': value})
+
+    def test_accepts_grouped_numbers(self):
+        queryset = filter_by_salary(JobOffer.objects.all(), {'salary_gte': '1,000', 'salary_lte': '5000'})
+        self.assertIn('salary_min', str(queryset.query))
+
+
+class JobOfferTestCase(TestCase):
+    def setUp(self):
+        employer = CustomUser.objects.create_user(phone_number='0780000500', role='job_offer')
+        category = JobCategory.objects.create(name='Engineering', created_by=employer)
+        job_type = JobType.objects.create(name='Full time', created_by=employer)
+        self.defaults = {
+            'location': 'Kigali',
+            'job_type': job_type,
+            'job_category': category,
+            'experience_level': 'entry',
+            'deadline': timezone.now().date() + timedelta(days=30),
+            'created_by': employer,
+        }
+
+    def create(self, title, description='', **fields):
+        return JobOffer.objects.create(title=title, description=description, **dict(self.defaults, **fields))
+
+
+class KeysetPaginationTests(JobOfferTestCase):
+    def test_pages_cover_every_offer_once_across_equal_timestamps(self):
+        created_at = timezone.now()
+        for number in range(7):
+            offer = self.create(f'Offer {number}')
+            # created_at is auto_now_add; groups of three share a timestamp
+            JobOffer.objects.filter(id=offer.id).update(created_at=created_at - timedelta(minutes=number // 3))
+        offers = list(JobOffer.objects.all())
+        self.assertEqual(len({offer.created_at for offer in offers}), 3)
+
+        seen, params = [], {'page_size': '3'}
+        while True:
+            rows, next_cursor, page_size = paginate_keyset(JobOffer.objects.all(), params)
+            self.assertEqual(page_size, 3)
+            seen += [offer.id for offer in rows]
+            if next_cursor is None:
+                break
+            params = {'page_size': '3', 'cursor': next_cursor}
+
+        expected = sorted(offers, key=lambda offer: (offer.created_at, offer.id), reverse=True)
+        self.assertEqual(seen, [offer.id for offer in expected])
+
+    def test_cursor_round_trip(self):
+        value = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(value, 42)), (value, 42))
+
+    def test_invalid_cursor(self):
+        for cursor in ('', 'not base64!', encode_cursor(timezone.now(), 1)[:-4], 'WyJub3QgYSBkYXRlIiwgMV0=', 'e30='):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_invalid_cursor_is_a_bad_request(self):
+        response = self.client.get(reverse('get_all_job_offers'), {'cursor': 'not base64!'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid cursor.'})
+
+
+class FacetTests(JobOfferTestCase):
+    def setUp(self):
+        super().setUp()
+        self.create('One', location='Kigali')
+        self.create('Two', location=' kigali ', experience_level='mid')
+        self.create('Three', location='Musanze', experience_level='mid')
+        self.create('Four', location='Kigali  City')
+
+    def buckets(self, result, name):
+        return {bucket['value']: bucket['count'] for bucket in result['facets'][name]}
+
+    def test_one_grouped_query_per_facet(self):
+        with self.assertNumQueries(7):
+            result = compute_job_offer_facets({})
+        self.assertEqual(result['total'], 4)
+        self.assertEqual(self.buckets(result, 'location'), {'kigali': 2, 'musanze': 1, 'kigali  city': 1})
+        self.assertEqual(self.buckets(result, 'experience_level'), {'entry': 2, 'mid': 2})
+
+    def test_location_counts_match_the_filtered_listing(self):
+        result = compute_job_offer_facets({'location': ' KIGALI', 'experience_level': 'mid'})
+        self.assertEqual(result['total'], 1)
+        # Each facet is counted with the other facets' filters only
+        self.assertEqual(self.buckets(result, 'location'), {'kigali': 1, 'musanze': 1})
+        self.assertEqual(self.buckets(result, 'experience_level'), {'entry': 1, 'mid': 1})
+
+        for value, count in self.buckets(compute_job_offer_facets({}), 'location').items():
+            with self.subTest(location=value):
+                self.assertEqual(filter_job_offers(JobOffer.objects.all(), {'location': value}).count(), count)
+
+
+class MatchTaskTests(JobOfferTestCase):
+    def seeker(self, number, skills, email=True):
+        user = CustomUser.objects.create_user(
+            phone_number=f'078000060{number}', role='job_seeker',
+            email=f'seeker{number}@example.com' if email else '',
+        )
+        return JobSeeker.objects.create(
+            user=user, first_name=f'Seeker {number}', last_name='Test', gender='female',
+            skills=json.dumps([{'name': name, 'experience': '1-3'} for name in skills]),
+        )
+
+    def test_matching_seekers_are_queued_once_from_the_skill_index(self):
+        matching = [self.seeker(1, ['Python']), self.seeker(2, ['  django ', 'Excel'])]
+        self.seeker(3, ['Accounting'])
+        self.seeker(4, ['Python'], email=False)
+        offer = self.create('Backend developer', requirements=['python', 'Django'])
+        task = offer.match_task
+
+        self.assertEqual(process_match_task(task, batch_size=1), 2)
+        self.assertEqual(task.status, 'done')
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            sorted(email.to for email in OutgoingEmail.objects.all()),
+            [['seeker1@example.com'], ['seeker2@example.com']],
+        )
+        self.assertEqual(
+            set(JobOfferNotificationLog.objects.values_list('job_seeker_id', flat=True)),
+            {seeker.id for seeker in matching},
+        )
+
+        # A retry from the start queues nobody twice
+        task.last_job_seeker_id = 0
+        self.assertEqual(process_match_task(task), 0)
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+
+
+class OfferIndexTests(JobOfferTestCase):
+    def setUp(self):
+        super().setUp()
+        offer_index.reset()
+        self.addCleanup(offer_index.reset)
+
+    def search(self, text):
+        return [offer_id for offer_id, _ in offer_index.search(text.split())]
+
+    def test_title_outranks_description(self):
+        in_description = self.create('Backend developer', 'Python and Django, some accounting')
+        in_title = self.create('Accountant', 'Bookkeeping')
+        self.assertEqual(self.search('accountant'), [in_title.id])
+        self.assertEqual(self.search('python django'), [in_description.id])
+        self.assertEqual(self.search('python accountant'), [])
+
+    def test_saves_and_deletes_update_one_document_on_commit(self):
+        offer = self.create('Backend developer', 'Python')
+        self.assertEqual(self.search('python'), [offer.id])
+
+        offer.title, offer.description = 'Plumber', 'Pipes'
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.save()
+            # Not re-indexed before the save commits
+            self.assertEqual(self.search('python'), [offer.id])
+        self.assertEqual(self.search('python'), [])
+        self.assertEqual(self.search('plumber'), [offer.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other = self.create('Plumber assistant', 'Pipes')
+        self.assertEqual(set(self.search('plumber')), {offer.id, other.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.delete()
+        self.assertEqual(self.search('plumber'), [other.id])
+        self.assertNotIn('python', offer_index.postings)
+
+    def test_saves_outside_the_search_fields_are_not_reindexed(self):
+        offer = self.create('Backend developer', 'Python')
+        self.search('python')
+        with self.captureOnCommitCallbacks() as callbacks:
+            offer.save(update_fields=['status'])
+        self.assertEqual(callbacks, [])
+
+    def test_searches_do_not_query_the_database_once_built(self):
+        self.create('Backend developer', 'Python')
+        self.search('python')
+        with self.assertNumQueries(0):
+            self.search('python')
@@ -5,6 +5,8 @@ from .views import get_job_offers_by_category, get_job_offers_by_job_type, get_j
 urlpatterns = [
     path('create/', views.create_job_offer, name='create_job_offer'),
     path('offers/', views.get_all_job_offers, name='get_all_job_offers'),
+    path('search/', views.search_job_offers, name='search_job_offers'),
+    path('facets/', views.get_job_offer_facets_view, name='job_offer_facets'),
     path('<int:job_id>/', views.get_job_offer_by_id, name='get_job_offer_by_id'),
     path('update/<int:job_id>/', views.update_job_offer, name='update_job_offer'),
     path('delete/<int:job_id>/', views.delete_job_offer, name='delete_job_offer'),
@@ -90,7 +90,13 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from .models import JobOffer
-from .serializers import JobOfferSerializer
+from .serializers import JobOfferSerializer, JobOfferFeedSerializer
+from .filters import filter_job_offers
+from .pagination import paginate_keyset, get_page_size, InvalidCursor
+from .search import rank_job_offers, MAX_SEARCH_OFFSET
+from .facets import get_job_offer_facets
+from backend.response_cache import cached_response
+from userApp.models import CustomUser
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.db import DatabaseError
 from django.utils import timezone
@@ -197,11 +203,31 @@ def get_job_offer_by_id(request, job_id):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('job_offers', [JobOffer, CustomUser, JobCategory, JobType])
 def get_all_job_offers(request):
+    """
+    Paginated job offer feed, newest first.
+    Query parameters:
+    - cursor: value of next_cursor from the previous page
+    - page_size: number of offers per page (default 20, max 100)
+    - status, offer_type, experience_level, category, job_type, location: optional filters
+    - salary_gte, salary_lte: only offers whose salary range overlaps these bounds
+    """
     try:
-        job_offers = JobOffer.objects.all()
-        serializer = JobOfferSerializer(job_offers, many=True)
-        return Response(serializer.data)
+        job_offers = JobOffer.objects.select_related(
+            'created_by', 'job_category', 'job_type'
+        ).defer('created_by__profile_picture', 'search_vector')
+        job_offers = filter_job_offers(job_offers, request.query_params)
+        rows, next_cursor, page_size = paginate_keyset(job_offers, request.query_params)
+        serializer = JobOfferFeedSerializer(rows, many=True)
+        return Response({
+            'results': serializer.data,
+            'next_cursor': next_cursor,
+            'page_size': page_size,
+        })
+    except (ValidationError, InvalidCursor) as e:
+        message = e.messages[0] if isinstance(e, ValidationError) else str(e)
+        return Response({"error": message}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         # Log the error for debugging
         print(f"Error fetching job offers: {str(e)}")
@@ -211,6 +237,83 @@ def get_all_job_offers(request):
         )
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_job_offers(request):
+    """
+    Relevance-ranked full-text search over title, company name, location,
+    description, requirements and responsibilities.
+    Query parameters:
+    - q: search terms (required)
+    - page, page_size: 1-based page number and offers per page (default 20, max 100)
+    - status, offer_type, experience_level, category, job_type, location, salary_gte, salary_lte: optional filters
+    Every result carries its rank and an HTML snippet with the matched words in <b>.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({"error": "q parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page_size = get_page_size(request.query_params)
+        page = int(request.query_params.get('page') or 1)
+        if page < 1:
+            raise ValueError(page)
+    except (InvalidCursor, ValueError):
+        return Response({"error": "page and page_size must be positive integers."}, status=status.HTTP_400_BAD_REQUEST)
+    offset = (page - 1) * page_size
+    if offset >= MAX_SEARCH_OFFSET:
+        return Response({"error": "Page is too deep, refine the search instead."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        job_offers = filter_job_offers(JobOffer.objects.all(), request.query_params)
+    except ValidationError as e:
+        return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+    filtered = any(
+        request.query_params.get(name) for name in (
+            'status', 'offer_type', 'experience_level', 'experience', 'category',
+            'job_category', 'job_type', 'type', 'location', 'salary_gte', 'salary_lte',
+        )
+    )
+
+    # One extra hit tells whether a next page exists
+    hits = rank_job_offers(job_offers, query, offset, page_size + 1, filtered=filtered)
+    has_more = len(hits) > page_size
+    hits = hits[:page_size]
+
+    offers = JobOffer.objects.select_related(
+        'created_by', 'job_category', 'job_type'
+    ).defer('created_by__profile_picture', 'search_vector').in_bulk([offer_id for offer_id, _, _ in hits])
+    results = []
+    for offer_id, rank, snippet in hits:
+        if offer_id not in offers:
+            continue
+        data = JobOfferFeedSerializer(offers[offer_id]).data
+        data['rank'] = round(float(rank), 6)
+        data['snippet'] = snippet
+        results.append(data)
+
+    return Response({
+        'results': results,
+        'page': page,
+        'page_size': page_size,
+        'has_more': has_more,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_job_offer_facets_view(request):
+    """
+    Offer counts per job_category, job_type, experience_level, offer_type,
+    status and location for the filters in the query string (same parameters
+    as the offer feed). Every facet is counted without its own filter.
+    """
+    try:
+        return Response(get_job_offer_facets(request.query_params))
+    except ValidationError as e:
+        return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+
 
 
 @api_view(['PUT'])
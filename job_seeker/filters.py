@@ -0,0 +1,60 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from .models import JobSeeker, JobSeekerSkill, normalize_skill_name
+
+
+MATCH_CHOICES = ['prefix', 'exact']
+MODE_CHOICES = ['any', 'all']
+
+
+def _skill_lookup(term, match):
+    if match == 'exact':
+        return {'normalized_name': term}
+    return {'normalized_name__startswith': term}
+
+
+def filter_by_skills(queryset, params):
+    """
+    Restrict a JobSeeker queryset using the JobSeekerSkill index.
+
+    Parameters:
+    - skills (or skill_name): comma-separated skill names
+    - match: 'prefix' (default) or 'exact'
+    - mode: 'any' (default, OR) or 'all' (AND)
+    - min_experience: experience bucket such as '3-5' or '5+'; the skill must
+      have at least that many years
+    """
+    raw = params.get('skills') or params.get('skill_name') or ''
+    terms = []
+    for item in raw.split(','):
+        term = normalize_skill_name(item)
+        if term and term not in terms:
+            terms.append(term)
+    if not terms:
+        raise ValidationError("skills parameter is required")
+
+    match = params.get('match') or 'prefix'
+    if match not in MATCH_CHOICES:
+        raise ValidationError(f"Invalid match '{match}'. Must be one of {MATCH_CHOICES}")
+    mode = params.get('mode') or 'any'
+    if mode not in MODE_CHOICES:
+        raise ValidationError(f"Invalid mode '{mode}'. Must be one of {MODE_CHOICES}")
+
+    skill_rows = JobSeekerSkill.objects.all()
+    min_experience = params.get('min_experience')
+    if min_experience:
+        years = JobSeeker()._parse_experience_range(min_experience)
+        skill_rows = skill_rows.filter(experience_years__gte=years)
+
+    if mode == 'all':
+        # One indexed semi-join per skill
+        for term in terms:
+            queryset = queryset.filter(
+                id__in=skill_rows.filter(**_skill_lookup(term, match)).values('job_seeker_id')
+            )
+        return queryset
+
+    any_term = Q()
+    for term in terms:
+        any_term |= Q(**_skill_lookup(term, match))
+    return queryset.filter(id__in=skill_rows.filter(any_term).values('job_seeker_id'))
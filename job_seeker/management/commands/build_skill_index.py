@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from job_seeker.models import JobSeeker
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the JobSeekerSkill index from the skills JSON of every job seeker'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of job seekers loaded per query',
+        )
+        parser.add_argument(
+            '--after-id',
+            type=int,
+            default=0,
+            help='Resume after this job seeker id (printed as progress by a previous run)',
+        )
+        parser.add_argument(
+            '--only-missing',
+            action='store_true',
+            help='Skip job seekers that already have JobSeekerSkill rows',
+        )
+
+    def handle(self, *args, **options):
+        queryset = JobSeeker.objects.exclude(skills='').only('id', 'skills')
+        if options['only_missing']:
+            queryset = queryset.filter(job_seeker_skills__isnull=True)
+
+        last_id = options['after_id']
+        synced = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).order_by('id')[:options['batch_size']])
+            if not batch:
+                break
+            for job_seeker in batch:
+                # Each job seeker is synced in its own transaction, so an
+                # interrupted run can resume from the last printed id
+                job_seeker.sync_skill_index()
+            synced += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f'Indexed skills up to job seeker id {last_id}')
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed skills of {synced} job seekers'))
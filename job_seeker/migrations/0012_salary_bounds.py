@@ -0,0 +1,32 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_seeker', '0011_alter_jobseeker_experience'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseeker',
+            name='salary_currency',
+            field=models.CharField(blank=True, default='', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='jobseeker',
+            name='salary_max',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobseeker',
+            name='salary_min',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobseeker',
+            index=models.Index(fields=['salary_min', 'salary_max'], name='jobseeker_salary_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_seeker', '0012_salary_bounds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseekerskill',
+            name='experience_years',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobseekerskill',
+            name='normalized_name',
+            field=models.CharField(db_index=True, default='', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='jobseeker',
+            index=models.Index(fields=['-created_at', '-id'], name='jobseeker_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobseekerskill',
+            index=models.Index(fields=['normalized_name', 'experience_years'], name='jobseekerskill_lookup_idx'),
+        ),
+    ]
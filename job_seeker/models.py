@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils.timezone import now
 from userApp.models import CustomUser
+from job_offer_app.salary import sync_salary_fields
 import json
 import re
 
@@ -41,6 +42,10 @@ class JobSeeker(models.Model):
     education_sector = models.CharField(max_length=100, blank=True, null=True, help_text="Field of study (if applicable)")
     resume = models.FileField(upload_to='resumes/', blank=True, null=True)
     salary_range = models.CharField(max_length=50, blank=True)
+    # Parsed from salary_range on save; NULL max means open-ended
+    salary_min = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    salary_max = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    salary_currency = models.CharField(max_length=3, blank=True, default='')
     registration_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     renewal_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='created_job_seekers')
@@ -105,6 +110,8 @@ class JobSeeker(models.Model):
         
         # Auto-calculate overall experience
         self.experience = self.calculate_overall_experience()
+        # Rebuild the JobSeekerSkill rows on the next save
+        self._skills_changed = True
     
     def get_skills_with_experience(self):
         """
@@ -138,37 +145,128 @@ class JobSeeker(models.Model):
                 formatted_skills.append(f"{skill['name']} ({skill['experience']} years)")
         return ", ".join(formatted_skills)
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Skills as loaded, so save() can tell whether the JobSeekerSkill rows are stale
+        instance._loaded_skills = instance.__dict__.get('skills')
+        return instance
+
+    def skills_changed(self, update_fields=None):
+        """
+        Whether the skills JSON differs from what the JobSeekerSkill rows were built from
+        """
+        if update_fields is not None and 'skills' not in update_fields:
+            return False
+        if getattr(self, '_skills_changed', False):
+            return True
+        if 'skills' not in self.__dict__:
+            return False
+        if self._state.adding:
+            return bool(self.skills)
+        return self.skills != getattr(self, '_loaded_skills', None)
+
     def save(self, *args, **kwargs):
         """
-        Override save method to auto-calculate experience before saving
+        Override save method to auto-calculate experience before saving,
+        and rebuild the JobSeekerSkill rows whenever the skills changed
         """
         # Auto-calculate overall experience if skills are set
         if self.skills:
             self.experience = self.calculate_overall_experience()
+        kwargs['update_fields'] = sync_salary_fields(self, kwargs.get('update_fields'))
+        skills_changed = self.skills_changed(kwargs.get('update_fields'))
         super().save(*args, **kwargs)
+        if skills_changed:
+            self.sync_skill_index()
+    
+    def sync_skill_index(self):
+        """
+        Make the JobSeekerSkill rows match the skills JSON.
+        Uses bulk queries so JobSeekerSkill.save/delete (which re-save the job
+        seeker) are not triggered once per skill.
+        """
+        desired = {}
+        for skill in self.get_skills_with_experience():
+            name = str(skill.get('name') or '').strip()[:100] if isinstance(skill, dict) else ''
+            if not name:
+                continue
+            experience = str(skill.get('experience') or '')[:20]
+            desired[normalize_skill_name(name)] = (name, experience, self._parse_experience_range(experience))
+
+        to_update, to_delete = [], []
+        with transaction.atomic():
+            for row in self.job_seeker_skills.all():
+                key = normalize_skill_name(row.skill_name)
+                if key not in desired:
+                    to_delete.append(row.id)
+                    continue
+                name, experience, years = desired.pop(key)
+                if (row.skill_name, row.normalized_name, row.experience_level, row.experience_years) != (name, key, experience, years):
+                    row.skill_name, row.normalized_name = name, key
+                    row.experience_level, row.experience_years = experience, years
+                    to_update.append(row)
+
+            if to_delete:
+                JobSeekerSkill.objects.filter(id__in=to_delete).delete()
+            if to_update:
+                JobSeekerSkill.objects.bulk_update(
+                    to_update, ['skill_name', 'normalized_name', 'experience_level', 'experience_years']
+                )
+            JobSeekerSkill.objects.bulk_create([
+                JobSeekerSkill(
+                    job_seeker=self, skill_name=name, normalized_name=key,
+                    experience_level=experience, experience_years=years,
+                )
+                for key, (name, experience, years) in desired.items()
+            ])
+        self._skills_changed = False
+        self._loaded_skills = self.skills
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.user.phone_number})"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['salary_min', 'salary_max'], name='jobseeker_salary_idx'),
+            models.Index(fields=['-created_at', '-id'], name='jobseeker_created_idx'),
+        ]
+
+
+def normalize_skill_name(name):
+    """
+    Key used by the skill index: lower case with collapsed whitespace
+    """
+    return ' '.join(str(name).lower().split())
+
 
-# Alternative approach: Separate Skill model for more normalized data
+# Normalized skills table, used as the index for skill search
 class JobSeekerSkill(models.Model):
     """
-    Alternative normalized approach - separate table for skills
-    Use this if you prefer normalized database design
+    One row per skill of a job seeker, mirrored from JobSeeker.skills by
+    JobSeeker.sync_skill_index and queried by search_job_seekers_by_skill
     """
     job_seeker = models.ForeignKey(JobSeeker, on_delete=models.CASCADE, related_name='job_seeker_skills')
     skill_name = models.CharField(max_length=100)
+    # Lookup key for skill search, see normalize_skill_name
+    normalized_name = models.CharField(max_length=100, db_index=True, default='')
     experience_level = models.CharField(max_length=20, help_text="e.g., '0-1', '1-3', '3-5', '5-8', '8+'")
+    # Upper bound of experience_level in years, as in JobSeeker._parse_experience_range
+    experience_years = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(default=now)
     
     class Meta:
         unique_together = ['job_seeker', 'skill_name']
+        indexes = [
+            models.Index(fields=['normalized_name', 'experience_years'], name='jobseekerskill_lookup_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         """
         Override save method to update JobSeeker's overall experience
         """
+        self.normalized_name = normalize_skill_name(self.skill_name)
+        self.experience_years = self.job_seeker._parse_experience_range(self.experience_level)
         super().save(*args, **kwargs)
         # Recalculate JobSeeker's overall experience
         self.job_seeker.experience = self.job_seeker.calculate_overall_experience_from_skills()
@@ -1,12 +1,13 @@
 from rest_framework import serializers
 from job_seeker.models import JobSeeker, JobSeekerSkill
 from userApp.models import CustomUser
+from userApp.serializers import ProfilePictureSerializerMixin
 import json
 
-class CustomUserSerializer(serializers.ModelSerializer):
+class CustomUserSerializer(ProfilePictureSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
-        fields = ['id', 'phone_number', 'email', 'role', 'status', 'created_at', 'profile_picture']
+        fields = ['id', 'phone_number', 'email', 'role', 'status', 'created_at', 'profile_picture', 'profile_picture_thumbnail']
 
 
 class JobSeekerSkillSerializer(serializers.ModelSerializer):
@@ -34,6 +35,7 @@ class JobSeekerSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobSeeker
         exclude = ['user']
+        read_only_fields = ['salary_min', 'salary_max', 'salary_currency']  # Derived from salary_range
         extra_kwargs = {
             'skills': {'write_only': True}  # Hide the raw JSON field from API responses
         }
@@ -117,19 +119,20 @@ class JobSeekerCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobSeeker
         exclude = ['user', 'created_by']
+        read_only_fields = ['salary_min', 'salary_max', 'salary_currency']
     
     def create(self, validated_data):
         # Handle skills_with_experience field
         skills_with_exp = validated_data.pop('skills_with_experience', [])
         
-        # Create the job seeker instance
-        job_seeker = JobSeeker.objects.create(**validated_data)
+        # Create the job seeker instance; save() builds the JobSeekerSkill rows
+        job_seeker = JobSeeker(**validated_data)
         
         # Set skills with experience
         if skills_with_exp:
             job_seeker.set_skills_with_experience(skills_with_exp)
-            job_seeker.save()
         
+        job_seeker.save()
         return job_seeker
     
     def update(self, instance, validated_data):
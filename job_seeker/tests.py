@@ -1,3 +1,53 @@
+import json
+
 from django.test import TestCase
 
-# Create your tests here.
+from userApp.models import CustomUser
+from .models import JobSeeker
+from .serializers import JobSeekerCreateUpdateSerializer
+
+
+class SkillIndexTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(phone_number='0780000700', role='job_seeker')
+
+    def indexed(self, job_seeker):
+        return dict(job_seeker.job_seeker_skills.values_list('normalized_name', 'experience_level'))
+
+    def test_serializer_create_and_update_sync_the_index(self):
+        serializer = JobSeekerCreateUpdateSerializer(data={
+            'first_name': 'Ana', 'last_name': 'Uwase', 'gender': 'female',
+            'skills_with_experience': [{'name': 'Python', 'experience': '3-5'}],
+        })
+        serializer.is_valid(raise_exception=True)
+        job_seeker = serializer.save(user=self.user)
+        self.assertEqual(self.indexed(job_seeker), {'python': '3-5'})
+
+        serializer = JobSeekerCreateUpdateSerializer(
+            job_seeker, data={'skills': json.dumps([{'name': 'Django', 'experience': '1-3'}])}, partial=True,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(self.indexed(job_seeker), {'django': '1-3'})
+
+    def test_skills_written_directly_are_indexed(self):
+        job_seeker = JobSeeker.objects.create(
+            user=self.user, first_name='Ana', last_name='Uwase', gender='female',
+            skills=json.dumps([{'name': 'Excel', 'experience': '0-1'}]),
+        )
+        self.assertEqual(self.indexed(job_seeker), {'excel': '0-1'})
+
+        job_seeker = JobSeeker.objects.get(id=job_seeker.id)
+        job_seeker.skills = json.dumps([{'name': 'Excel', 'experience': '5+'}])
+        job_seeker.save()
+        self.assertEqual(self.indexed(job_seeker), {'excel': '5+'})
+
+    def test_unchanged_skills_are_not_resynced(self):
+        job_seeker = JobSeeker.objects.create(
+            user=self.user, first_name='Ana', last_name='Uwase', gender='female',
+            skills=json.dumps([{'name': 'Excel', 'experience': '0-1'}]),
+        )
+        job_seeker = JobSeeker.objects.get(id=job_seeker.id)
+        job_seeker.first_name = 'Anne'
+        with self.assertNumQueries(1):
+            job_seeker.save()
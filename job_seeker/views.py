@@ -5,6 +5,9 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
 from job_seeker.models import JobSeeker
 from job_seeker.serializers import JobSeekerSerializer, JobSeekerCreateUpdateSerializer
+from job_offer_app.salary import filter_by_salary
+from job_offer_app.pagination import paginate_keyset, InvalidCursor
+from job_seeker.filters import filter_by_skills
 from userApp.models import CustomUser
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
@@ -203,7 +206,15 @@ def create_job_seeker(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_all_job_seekers(request):
+    """
+    List job seekers
+    Optional query parameters: salary_gte, salary_lte (expected salary overlaps these bounds)
+    """
     job_seekers = JobSeeker.objects.all()
+    try:
+        job_seekers = filter_by_salary(job_seekers, request.query_params)
+    except ValidationError as e:
+        return Response({"error": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
     serializer = JobSeekerSerializer(job_seekers, many=True)
     return Response(serializer.data)
 
@@ -512,31 +523,31 @@ def update_job_seeker_skills(request):
 @permission_classes([AllowAny])
 def search_job_seekers_by_skill(request):
     """
-    Search job seekers by skill name
-    Query parameter: skill_name
+    Search active job seekers by skill through the JobSeekerSkill index
+    Query parameters:
+    - skills (or skill_name): comma-separated skill names
+    - match: prefix (default) or exact
+    - mode: any (default) or all
+    - min_experience: minimum experience bucket, e.g. 3-5
+    - page_size, cursor: keyset pagination, newest job seekers first
     """
-    skill_name = request.GET.get('skill_name', '').strip()
-    
-    if not skill_name:
-        return Response({'error': 'skill_name parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
-    
+    job_seekers = (
+        JobSeeker.objects.filter(status=True)
+        .select_related('user')
+        .prefetch_related('job_seeker_skills')
+    )
     try:
-        # Get all job seekers and filter by skill
-        job_seekers = JobSeeker.objects.filter(status=True)
-        matching_job_seekers = []
-        
-        for job_seeker in job_seekers:
-            skills = job_seeker.get_skills_list()
-            # Case-insensitive search
-            if any(skill_name.lower() in skill.lower() for skill in skills):
-                matching_job_seekers.append(job_seeker)
-        
-        serializer = JobSeekerSerializer(matching_job_seekers, many=True)
-        return Response({
-            'count': len(matching_job_seekers),
-            'results': serializer.data
-        }, status=status.HTTP_200_OK)
-        
-    except Exception as e:
-        print(f"Error searching job seekers by skill: {str(e)}")
-        return Response({'error': 'An unexpected error occurred.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        job_seekers = filter_by_skills(job_seekers, request.query_params)
+        count = job_seekers.count()
+        results, next_cursor, page_size = paginate_keyset(job_seekers, request.query_params)
+    except (ValidationError, InvalidCursor) as e:
+        message = e.messages[0] if isinstance(e, ValidationError) else str(e)
+        return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = JobSeekerSerializer(results, many=True)
+    return Response({
+        'count': count,
+        'results': serializer.data,
+        'next_cursor': next_cursor,
+        'page_size': page_size,
+    }, status=status.HTTP_200_OK)
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'to', 'last_error']
+    readonly_fields = ['created_at', 'updated_at', 'sent_at']
+    actions = ['requeue']
+
+    @admin.action(description='Queue selected emails for another attempt')
+    def requeue(self, request, queryset):
+        queryset.exclude(status='sent').update(status='queued', attempts=0, next_attempt_at=timezone.now())
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class MailappConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'mailApp'
+    verbose_name = 'Outgoing Mail'
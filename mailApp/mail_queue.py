@@ -0,0 +1,201 @@
+"""
+Persistent mail queue.
+
+Views call enqueue_email (or enqueue_template_email, or enqueue_emails for a
+batch), which only inserts OutgoingEmail rows, in the caller's transaction
+when there is one, so a slow or failing SMTP server never holds up a request.
+The send_queued_emails command claims due rows and sends them over one SMTP
+connection that it keeps open between batches. Each email is marked 'sent'
+as soon as it went out, and rows a crashed worker left in 'sending' are
+claimed again once STALE_AFTER has passed, alongside the due queued rows.
+
+A failed send is retried after RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+seconds, capped at RETRY_MAX_SECONDS. After max_attempts the row is marked
+'dead' and left for an admin to inspect or requeue.
+
+Bodies come from templates under templates/emails/, compiled once per
+process. Set EMAIL_BACKEND to the console or file backend to see the mail
+locally instead of sending it.
+"""
+import logging
+import smtplib
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+from .models import OutgoingEmail
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+# A row left in 'sending' this long belongs to a worker that died mid-batch
+STALE_AFTER = timedelta(minutes=10)
+
+
+@lru_cache(maxsize=None)
+def compiled_template(template_name):
+    return get_template(template_name)
+
+
+def render_email(template_name, context):
+    return compiled_template(template_name).render(context)
+
+
+def new_email(subject, body, to, from_email=None, html_body='', reply_to=None):
+    """
+    An unsaved OutgoingEmail; see enqueue_email
+    """
+    if isinstance(to, str):
+        to = [to]
+    if isinstance(reply_to, str):
+        reply_to = [reply_to]
+    return OutgoingEmail(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        reply_to=list(reply_to or []),
+    )
+
+
+def new_template_email(subject, template_name, context, to, from_email=None, html_template_name=None, reply_to=None):
+    """
+    An unsaved OutgoingEmail whose body (and optional HTML alternative) are rendered from templates
+    """
+    return new_email(
+        subject,
+        render_email(template_name, context),
+        to,
+        from_email=from_email,
+        html_body=render_email(html_template_name, context) if html_template_name else '',
+        reply_to=reply_to,
+    )
+
+
+def enqueue_email(subject, body, to, from_email=None, html_body='', reply_to=None):
+    """
+    Queue an email for the send_queued_emails worker.
+    to, reply_to: an address or a list of addresses
+    Returns: the OutgoingEmail row
+    """
+    email = new_email(subject, body, to, from_email=from_email, html_body=html_body, reply_to=reply_to)
+    email.save()
+    return email
+
+
+def enqueue_template_email(subject, template_name, context, to, from_email=None, html_template_name=None, reply_to=None):
+    """
+    Queue an email whose body (and optional HTML alternative) are rendered from templates
+    """
+    email = new_template_email(
+        subject, template_name, context, to,
+        from_email=from_email, html_template_name=html_template_name, reply_to=reply_to,
+    )
+    email.save()
+    return email
+
+
+def enqueue_emails(emails):
+    """
+    Queue unsaved OutgoingEmail rows (from new_email / new_template_email) with one INSERT
+    """
+    return OutgoingEmail.objects.bulk_create(emails)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def claim_due_emails(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move up to batch_size due emails to 'sending': queued rows whose time has
+    come, and rows a dead worker left in 'sending' for longer than STALE_AFTER.
+    Returns: the claimed rows, oldest first
+    """
+    current = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                Q(status='queued', next_attempt_at__lte=current)
+                | Q(status='sending', updated_at__lt=current - STALE_AFTER)
+            ).order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            status='sending', updated_at=current
+        )
+    return emails
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body,
+        email.from_email,
+        email.to,
+        reply_to=email.reply_to or None,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def record_failure(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'dead'
+        logger.error(f"Giving up on email {email.id} after {email.attempts} attempts: {error}")
+    else:
+        email.status = 'queued'
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+
+
+def send_due_emails(connection=None, batch_size=DEFAULT_BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Send one batch of due emails over connection (opened if needed and left
+    open for the next batch).
+    Returns: (number sent, number failed)
+    """
+    emails = claim_due_emails(batch_size)
+    if not emails:
+        return 0, 0
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            record_failure(email, e, max_attempts)
+        return 0, len(emails)
+
+    sent = 0
+    failed = 0
+    for email in emails:
+        try:
+            try:
+                build_message(email, connection).send()
+            except smtplib.SMTPServerDisconnected:
+                # The server dropped the idle connection; reconnect once
+                connection.close()
+                connection.open()
+                build_message(email, connection).send()
+        except Exception as e:
+            failed += 1
+            record_failure(email, e, max_attempts)
+            continue
+        # Recorded right away so a crash later in the batch does not resend it
+        current = timezone.now()
+        OutgoingEmail.objects.filter(id=email.id).update(status='sent', sent_at=current, updated_at=current)
+        sent += 1
+    return sent, failed
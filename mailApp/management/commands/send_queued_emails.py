@@ -0,0 +1,50 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from mailApp.mail_queue import DEFAULT_BATCH_SIZE, MAX_ATTEMPTS, send_due_emails
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails over one reused SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Emails claimed per batch',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='Mark an email dead after this many failed sends',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new emails instead of exiting when the queue is empty',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls with --loop',
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        try:
+            while True:
+                sent, failed = send_due_emails(connection, options['batch_size'], options['max_attempts'])
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent} emails, {failed} failed')
+                    continue
+                # Idle: do not keep an SMTP session open the server would time out anyway
+                connection.close()
+                if not options['loop']:
+                    break
+                time.sleep(options['sleep'])
+        finally:
+            connection.close()
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+from django.utils import timezone
+
+from .mail_queue import STALE_AFTER, claim_due_emails, enqueue_email, send_due_emails
+from .models import OutgoingEmail
+
+
+class FailingBackend(EmailBackend):
+    """
+    Locmem backend that raises once `fail_after` messages were sent
+    """
+
+    def __init__(self, fail_after, error=RuntimeError('SMTP down'), **kwargs):
+        super().__init__(**kwargs)
+        self.fail_after = fail_after
+        self.error = error
+
+    def send_messages(self, messages):
+        if len(mail.outbox) >= self.fail_after:
+            raise self.error
+        return super().send_messages(messages)
+
+
+class MailQueueTests(TestCase):
+    def queue(self, count):
+        return [enqueue_email(f'Subject {index}', 'Body', f'user{index}@example.com') for index in range(count)]
+
+    def test_sends_due_emails(self):
+        self.queue(2)
+        self.assertEqual(send_due_emails(get_connection()), (2, 0))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['user0@example.com', 'user1@example.com'])
+        self.assertEqual(OutgoingEmail.objects.filter(status='sent', sent_at__isnull=False).count(), 2)
+        self.assertEqual(send_due_emails(get_connection()), (0, 0))
+
+    def test_failure_is_retried_with_backoff(self):
+        email, = self.queue(1)
+        self.assertEqual(send_due_emails(FailingBackend(fail_after=0)), (0, 1))
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.last_error), ('queued', 1, 'SMTP down'))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        # Not due yet
+        self.assertEqual(send_due_emails(get_connection()), (0, 0))
+
+        OutgoingEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_due_emails(get_connection()), (1, 0))
+
+    def test_dead_letter_after_max_attempts(self):
+        email, = self.queue(1)
+        for _ in range(2):
+            OutgoingEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+            send_due_emails(FailingBackend(fail_after=0), max_attempts=2)
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('dead', 2))
+        OutgoingEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_due_emails(get_connection()), (0, 0))
+
+    def test_sent_emails_survive_a_crash_mid_batch(self):
+        self.queue(3)
+        with self.assertRaises(KeyboardInterrupt):
+            send_due_emails(FailingBackend(fail_after=1, error=KeyboardInterrupt()))
+
+        self.assertEqual(OutgoingEmail.objects.filter(status='sent').count(), 1)
+        self.assertEqual(OutgoingEmail.objects.filter(status='sending').count(), 2)
+
+    def test_stale_sending_rows_are_claimed_with_due_rows(self):
+        stale, due = self.queue(2)
+        OutgoingEmail.objects.filter(id=stale.id).update(
+            status='sending', updated_at=timezone.now() - STALE_AFTER - timedelta(minutes=1)
+        )
+        fresh, = self.queue(1)
+        OutgoingEmail.objects.filter(id=fresh.id).update(status='sending', updated_at=timezone.now())
+
+        claimed = claim_due_emails()
+        self.assertEqual({email.id for email in claimed}, {stale.id, due.id})
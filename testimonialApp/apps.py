@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TestimonialappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'testimonialApp'
+
+    def ready(self):
+        from backend.response_cache import track_model_versions
+        track_model_versions(self.get_model('Testimonial'))
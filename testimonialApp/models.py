@@ -16,6 +16,7 @@ class Testimonial(models.Model):
     first_name = models.CharField(max_length=50, blank=True, null=True)
     last_name = models.CharField(max_length=50, blank=True, null=True)
     created_at = models.DateTimeField(default=now)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         if hasattr(self.created_by, 'job_seeker'):
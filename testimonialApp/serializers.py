@@ -2,11 +2,12 @@
 from rest_framework import serializers
 from .models import Testimonial
 from userApp.models import CustomUser
+from userApp.serializers import ProfilePictureSerializerMixin
 
-class CustomUserSerializer(serializers.ModelSerializer):
+class CustomUserSerializer(ProfilePictureSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
-        fields = ['id', 'phone_number', 'email', 'role', 'status',  'created_at', 'profile_picture']
+        fields = ['id', 'phone_number', 'email', 'role', 'status',  'created_at', 'profile_picture', 'profile_picture_thumbnail']
 
 class TestimonialSerializer(serializers.ModelSerializer):
     created_by_details = serializers.SerializerMethodField()
@@ -6,6 +6,8 @@ from rest_framework import status
 from django.shortcuts import get_object_or_404
 from .models import Testimonial
 from .serializers import TestimonialSerializer
+from backend.response_cache import cached_response
+from userApp.models import CustomUser
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -23,6 +25,7 @@ def create_testimonial(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response('testimonials', [Testimonial, CustomUser])
 def get_all_testimonials(request):
     """
     Retrieve all testimonials.
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class UserappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'userApp'
+
+    def ready(self):
+        import userApp.signals  # Import signals
+        from backend.response_cache import track_model_versions
+        # Fields of the nested users in cached responses; logins and password changes do not count
+        track_model_versions(self.get_model('CustomUser'), fields=[
+            'phone_number', 'email', 'role', 'status', 'is_active', 'created_at',
+            'profile_picture', 'avatar', 'avatar_thumbnail',
+        ])
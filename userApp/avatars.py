@@ -0,0 +1,144 @@
+"""
+Profile pictures stored as files with a generated thumbnail.
+
+CustomUser.profile_picture used to hold the picture as base64 text, and every
+nested user in a listing carried it. Pictures now live in default storage
+under a name derived from their SHA-256; responses only carry URLs. Identical
+pictures share one file, so a replaced or deleted picture is only removed
+from storage once the change is committed and no other user points at it.
+"""
+import base64
+import binascii
+import hashlib
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from PIL import Image, UnidentifiedImageError
+
+
+AVATAR_DIRECTORY = 'avatars'
+THUMBNAIL_SIZE = (128, 128)
+MAX_PICTURE_BYTES = 10 * 1024 * 1024
+# A few kilobytes of compressed data can declare billions of pixels
+MAX_PICTURE_PIXELS = 40 * 1000 * 1000
+
+FORMAT_EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+
+
+def decode_picture(value):
+    """
+    Bytes of a picture sent as base64 text (optionally a data: URL) or as an uploaded file
+    """
+    if hasattr(value, 'read'):
+        if value.size > MAX_PICTURE_BYTES:
+            raise ValidationError("Profile picture is too large.")
+        return value.read()
+    if isinstance(value, str):
+        if value.startswith('data:') and ',' in value:
+            value = value.split(',', 1)[1]
+        try:
+            data = base64.b64decode(value, validate=False)
+        except (binascii.Error, ValueError):
+            raise ValidationError("Profile picture must be base64 encoded.")
+        if len(data) > MAX_PICTURE_BYTES:
+            raise ValidationError("Profile picture is too large.")
+        return data
+    raise ValidationError("Invalid profile picture.")
+
+
+def _save(name, content):
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(content))
+    return name
+
+
+def store_picture(data):
+    """
+    Store the original picture and a thumbnail.
+    Returns: (original name, thumbnail name)
+    """
+    try:
+        image = Image.open(BytesIO(data))
+        if image.width * image.height > MAX_PICTURE_PIXELS:
+            raise ValidationError("Profile picture dimensions are too large.")
+        image.load()
+    except Image.DecompressionBombError:
+        raise ValidationError("Profile picture dimensions are too large.")
+    except (UnidentifiedImageError, OSError):
+        raise ValidationError("Profile picture is not a valid image.")
+
+    digest = hashlib.sha256(data).hexdigest()
+    extension = FORMAT_EXTENSIONS.get(image.format, '.img')
+    original = _save(f'{AVATAR_DIRECTORY}/{digest[:2]}/{digest}{extension}', data)
+
+    thumbnail = image.copy()
+    thumbnail.thumbnail(THUMBNAIL_SIZE)
+    buffer = BytesIO()
+    if thumbnail.mode in ('RGBA', 'LA', 'P'):
+        thumbnail.convert('RGBA').save(buffer, format='PNG', optimize=True)
+        thumbnail_extension = '.png'
+    else:
+        thumbnail.convert('RGB').save(buffer, format='JPEG', quality=85, optimize=True)
+        thumbnail_extension = '.jpg'
+    thumbnail_name = _save(
+        f'{AVATAR_DIRECTORY}/thumbnails/{digest[:2]}/{digest}_{THUMBNAIL_SIZE[0]}{thumbnail_extension}',
+        buffer.getvalue(),
+    )
+    return original, thumbnail_name
+
+
+def picture_names(user):
+    return [field.name for field in (user.avatar, user.avatar_thumbnail) if field]
+
+
+def set_profile_picture(user, value):
+    """
+    Replace the picture of user (not saved). An empty value removes it.
+    The files it replaces are released once the user is saved (see signals).
+    Returns: the update_fields touched
+    """
+    previous = picture_names(user)
+    if value in (None, ''):
+        user.avatar = None
+        user.avatar_thumbnail = None
+    else:
+        user.avatar, user.avatar_thumbnail = store_picture(decode_picture(value))
+    user.profile_picture = None
+
+    current = picture_names(user)
+    replaced = getattr(user, '_replaced_pictures', [])
+    user._replaced_pictures = replaced + [name for name in previous if name not in current]
+    return ['avatar', 'avatar_thumbnail', 'profile_picture']
+
+
+def release_picture(name):
+    """
+    Delete a stored picture unless a user still points at it
+    """
+    from .models import CustomUser
+
+    if not name:
+        return
+    if not CustomUser.objects.filter(Q(avatar=name) | Q(avatar_thumbnail=name)).exists():
+        default_storage.delete(name)
+
+
+def file_url(field_file, request=None):
+    if not field_file:
+        return None
+    name = getattr(field_file, 'name', field_file)
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def profile_picture_urls(user, request=None):
+    """
+    Returns: {'profile_picture': url, 'profile_picture_thumbnail': url}
+    """
+    return {
+        'profile_picture': file_url(user.avatar, request),
+        'profile_picture_thumbnail': file_url(user.avatar_thumbnail, request),
+    }
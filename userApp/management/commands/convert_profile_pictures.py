@@ -0,0 +1,49 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from userApp.avatars import set_profile_picture
+from userApp.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Convert base64 profile pictures stored on users into avatar files with thumbnails'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of users loaded per query',
+        )
+        parser.add_argument(
+            '--clear-invalid',
+            action='store_true',
+            help='Drop pictures that cannot be decoded instead of leaving them in place',
+        )
+
+    def handle(self, *args, **options):
+        pending = CustomUser.objects.exclude(profile_picture__isnull=True).exclude(profile_picture='')
+        converted = failed = 0
+        last_id = 0
+        while True:
+            batch = list(
+                pending.filter(id__gt=last_id).order_by('id')
+                .only('id', 'profile_picture', 'avatar', 'avatar_thumbnail')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            for user in batch:
+                try:
+                    update_fields = set_profile_picture(user, user.profile_picture)
+                except ValidationError as e:
+                    failed += 1
+                    self.stderr.write(f'User {user.id}: {e.messages[0]}')
+                    if not options['clear_invalid']:
+                        continue
+                    user.profile_picture = None
+                    update_fields = ['profile_picture']
+                user.save(update_fields=update_fields)
+                converted += 1
+            last_id = batch[-1].id
+            self.stdout.write(f'Processed users up to id {last_id}')
+
+        self.stdout.write(self.style.SUCCESS(f'Converted {converted} profile pictures, {failed} could not be decoded'))
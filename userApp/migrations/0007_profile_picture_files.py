@@ -0,0 +1,23 @@
+# Generated by Django 4.2.17 on 2026-10-16 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userApp', '0006_customuser_profile_picture_alter_customuser_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='avatar',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='avatar_thumbnail',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to=''),
+        ),
+    ]
@@ -3,6 +3,10 @@ from django.db import models
 from django.utils.timezone import now
 
 class CustomUserManager(BaseUserManager):
+    def get_queryset(self):
+        # The legacy base64 picture column is only read by the conversion command
+        return super().get_queryset().defer('profile_picture')
+
     def create_user(self, phone_number, role, email=None, password=None, status=True, profile_picture=None):
         if not phone_number:
             raise ValueError("The phone number must be provided")
@@ -22,7 +26,8 @@ class CustomUserManager(BaseUserManager):
             user.email = email
             
         if profile_picture:
-            user.profile_picture = profile_picture
+            from .avatars import set_profile_picture
+            set_profile_picture(user, profile_picture)
             
         user.set_password(password)
         user.save(using=self._db)
@@ -60,7 +65,11 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     status = models.BooleanField(default=True)
     created_at = models.DateTimeField(default=now)
-    profile_picture = models.TextField(null=True, blank=True)  # Store base64 encoded image
+    updated_at = models.DateTimeField(auto_now=True)
+    # Deprecated base64 picture, converted to avatar files by the convert_profile_pictures command
+    profile_picture = models.TextField(null=True, blank=True)
+    avatar = models.FileField(max_length=255, null=True, blank=True)
+    avatar_thumbnail = models.FileField(max_length=255, null=True, blank=True)
 
     USERNAME_FIELD = 'phone_number'
     REQUIRED_FIELDS = ['email']  # Required only for createsuperuser command
@@ -1,8 +1,24 @@
 from rest_framework import serializers
 from .models import CustomUser
+from .avatars import file_url
 from django.core.mail import send_mail
 
 
+class ProfilePictureSerializerMixin(serializers.Serializer):
+    """
+    URLs of the user's picture and thumbnail, for user serializers.
+    Declare 'profile_picture' and 'profile_picture_thumbnail' in Meta.fields.
+    """
+    profile_picture = serializers.SerializerMethodField()
+    profile_picture_thumbnail = serializers.SerializerMethodField()
+
+    def get_profile_picture(self, obj):
+        return file_url(obj.avatar, self.context.get('request'))
+
+    def get_profile_picture_thumbnail(self, obj):
+        return file_url(obj.avatar_thumbnail, self.context.get('request'))
+
+
 
 from django.contrib.auth import authenticate
 from rest_framework import serializers
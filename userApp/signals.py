@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .avatars import picture_names, release_picture
+from .models import CustomUser
+
+
+def _release_on_commit(names):
+    def release():
+        for name in names:
+            release_picture(name)
+    transaction.on_commit(release)
+
+
+@receiver(post_save, sender=CustomUser)
+def release_replaced_pictures(sender, instance, **kwargs):
+    """
+    Remove the files set_profile_picture replaced once the new ones are committed
+    """
+    names = instance.__dict__.pop('_replaced_pictures', None)
+    if names:
+        _release_on_commit(names)
+
+
+@receiver(post_delete, sender=CustomUser)
+def delete_user_pictures(sender, instance, **kwargs):
+    names = picture_names(instance)
+    if names:
+        _release_on_commit(names)
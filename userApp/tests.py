@@ -1,3 +1,78 @@
-from django.test import TestCase
+import base64
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from . import avatars
+from .avatars import set_profile_picture, store_picture
+from .models import CustomUser
+
+
+def picture_bytes(color, size=(200, 200)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def picture_base64(color):
+    return base64.b64encode(picture_bytes(color)).decode()
+
+
+class ProfilePictureTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = CustomUser.objects.create_user(phone_number='0780000600', role='job_seeker')
+
+    def change_picture(self, user, value):
+        with self.captureOnCommitCallbacks(execute=True):
+            set_profile_picture(user, value)
+            user.save()
+
+    def test_replaced_picture_is_released(self):
+        self.change_picture(self.user, picture_base64('red'))
+        old = avatars.picture_names(self.user)
+        self.assertTrue(all(default_storage.exists(name) for name in old))
+
+        self.change_picture(self.user, picture_base64('blue'))
+        self.assertFalse(any(default_storage.exists(name) for name in old))
+        self.assertTrue(all(default_storage.exists(name) for name in avatars.picture_names(self.user)))
+
+    def test_shared_picture_is_kept(self):
+        other = CustomUser.objects.create_user(phone_number='0780000601', role='job_seeker')
+        self.change_picture(self.user, picture_base64('red'))
+        self.change_picture(other, picture_base64('red'))
+        shared = avatars.picture_names(self.user)
+
+        self.change_picture(self.user, '')
+        self.assertTrue(all(default_storage.exists(name) for name in shared))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertFalse(any(default_storage.exists(name) for name in shared))
+
+    def test_rolled_back_change_keeps_the_old_picture(self):
+        self.change_picture(self.user, picture_base64('red'))
+        old = avatars.picture_names(self.user)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            set_profile_picture(self.user, picture_base64('blue'))
+            self.user.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertTrue(all(default_storage.exists(name) for name in old))
+
+    def test_oversized_dimensions_are_rejected(self):
+        with mock.patch.object(avatars, 'MAX_PICTURE_PIXELS', 100 * 100), self.assertRaises(ValidationError):
+            store_picture(picture_bytes('red'))
+
+    def test_decompression_bomb_is_a_validation_error(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 100), self.assertRaises(ValidationError):
+            store_picture(picture_bytes('red'))
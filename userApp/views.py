@@ -16,6 +16,9 @@ from rest_framework.permissions import AllowAny
 from rest_framework.authentication import BasicAuthentication
 from django.contrib.auth.hashers import check_password
 from django.shortcuts import get_object_or_404
+from django.core.exceptions import ValidationError
+from .avatars import file_url, profile_picture_urls, set_profile_picture
+from mailApp.mail_queue import enqueue_template_email
 import random
 import string
 
@@ -170,19 +173,14 @@ def register_user(request):
 
 ###################################
         # Send the password to the user's email if email is provided
+        # (queued; delivered by the send_queued_emails worker)
         if email:
-            message = (
-                "Hello,\n\nYour account has been created in ANAWEZA app.\n"
-                f"Your password is: {password}\n\n"
-            )
-            if is_admin_creating:
-                message += "This is a system-generated password. Please change it after your first login."
-            
-            send_mail(
-                subject="Your Account Password",
-                message=message,
+            enqueue_template_email(
+                "Your Account Password",
+                'emails/account_password.txt',
+                {'password': password, 'generated': is_admin_creating},
+                email,
                 from_email="no-reply@anaweza.com",
-                recipient_list=[email],
             )
 
         response_data = {"message": "User registered successfully."}
@@ -238,7 +236,7 @@ def login_user(request):
             "role": user.role,
             "status": "Active" if user.status else "Non-Active",
             "created_at": user.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            "profile_picture": user.profile_picture,
+            **profile_picture_urls(user, request),
             "token": {
                 "refresh": str(refresh),
                 "access": str(refresh.access_token),
@@ -294,12 +292,13 @@ def reset_password(request):
         user.set_password(new_password)
         user.save()
 
-        # Send the new password to the user's email
-        send_mail(
-            subject="Your New Password",
-            message=f"Your password has been reset to anaweza app.\n Your new password is: {new_password}",
+        # Send the new password to the user's email (queued)
+        enqueue_template_email(
+            "Your New Password",
+            'emails/password_reset.txt',
+            {'password': new_password},
+            user.email,
             from_email="no-reply@anaweza.com",
-            recipient_list=[user.email],
         )
         
         print('Password Changed successfully and can now login')
@@ -364,7 +363,8 @@ def update_user(request, user_id):
     phone_number = request.data.get('phone_number')
     email = request.data.get('email')
     role = request.data.get('role')
-    profile_picture = request.data.get('profile_picture')  # Get profile picture from request
+    # Base64 text or a multipart file; an empty string removes the picture
+    profile_picture = request.FILES.get('profile_picture') or request.data.get('profile_picture')
     
     # Get status from request data
     status = request.data.get('status')
@@ -397,7 +397,10 @@ def update_user(request, user_id):
         
         # Update profile picture if provided
         if profile_picture is not None:  # Check for None to allow empty string (removing picture)
-            user.profile_picture = profile_picture
+            try:
+                set_profile_picture(user, profile_picture)
+            except ValidationError as e:
+                return Response({"message": e.messages[0]}, status=400)
             
         user.save()
 
@@ -409,7 +412,7 @@ def update_user(request, user_id):
             "role": user.role,
             "status": "Active" if user.status else "Non-Active",
             "created_at": user.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            "profile_picture": user.profile_picture,
+            **profile_picture_urls(user, request),
             "message": "User updated successfully."
         }, status=200)
 
@@ -425,17 +428,20 @@ def update_user(request, user_id):
 def list_all_users(request):
     # Retrieve all users
     users = CustomUser.objects.all().values(
-        'id', 'phone_number', 'email', 'role', 'status', 'created_at', 'profile_picture',
+        'id', 'phone_number', 'email', 'role', 'status', 'created_at', 'avatar', 'avatar_thumbnail',
     )
 
-    # Convert status field to "Active" or "Non-Active"
-    formatted_users = [
-        {
+    # Convert status field to "Active" or "Non-Active" and picture files to URLs
+    formatted_users = []
+    for user in users:
+        avatar = user.pop('avatar')
+        avatar_thumbnail = user.pop('avatar_thumbnail')
+        formatted_users.append({
             **user,
-            "status": "Active" if user["status"] else "Non-Active"  # Convert boolean to string
-        }
-        for user in users
-    ]
+            "status": "Active" if user["status"] else "Non-Active",  # Convert boolean to string
+            "profile_picture": file_url(avatar, request),
+            "profile_picture_thumbnail": file_url(avatar_thumbnail, request),
+        })
 
     return Response({"users": formatted_users}, status=200)
 
@@ -453,7 +459,7 @@ def get_user_by_id(request, user_id):
             "role": user.role,
             "status": "Active" if user.status else "Non-Active",
             "created_at": user.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            "profile_picture": user.profile_picture,
+            **profile_picture_urls(user, request),
         }, status=200)
     except ObjectDoesNotExist:
         return Response({"error": "User with the given ID does not exist."}, status=404)
@@ -481,7 +487,7 @@ def get_user_by_email(request):
             "role": user.role,
             "status": "Active" if user.status else "Non-Active",
             "created_at": user.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            "profile_picture": user.profile_picture,
+            **profile_picture_urls(user, request),
         }, status=200)
     except ObjectDoesNotExist:
         return Response({"error": "User with the given email does not exist."}, status=404)
@@ -510,7 +516,7 @@ def get_user_by_phone(request):
             "role": user.role,
             "status": "Active" if user.status else "Non-Active",
             "created_at": user.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            "profile_picture": user.profile_picture,
+            **profile_picture_urls(user, request),
         }, status=200)
     except ObjectDoesNotExist:
         return Response({"error": "User with the given phone number does not exist."}, status=404)
@@ -607,19 +613,20 @@ def contact_us(request):
             logger.error("Invalid email format: %s", email)
             return Response({"error": "Invalid email format."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Sending email
+        # Queue the email; the send_queued_emails worker delivers it
         try:
-            send_mail(
-                subject=f"Contact Us: {subject}",
-                message=f"Name: {names}\nEmail: {email}\n\nDescription:\n{description}",
+            enqueue_template_email(
+                f"Contact Us: {subject}",
+                'emails/contact_us.txt',
+                {'names': names, 'email': email, 'description': description},
+                ['ltdanaweza@gmail.com'],
                 from_email=email,
-                recipient_list=['ltdanaweza@gmail.com'],
-                fail_silently=False,
+                reply_to=email,
             )
-            logger.info("Email sent successfully to %s", email)
+            logger.info("Email queued for %s", email)
             return Response({"message": "Email sent successfully."}, status=status.HTTP_200_OK)
         except Exception as e:
-            logger.exception("An error occurred while sending email: %s", e)
+            logger.exception("An error occurred while queueing email: %s", e)
             return Response({"error": "Failed to send email."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     logger.error("Invalid serializer data: %s", serializer.errors)